@@ -6,19 +6,47 @@ environment variable overrides, and secure credential management.
 """
 
 import os
+import sys
+import itertools
 import yaml
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, ClassVar, Optional, Tuple, Union
 from pathlib import Path
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
+from agent.transport.http_transmitter import MAX_BATCH_SAMPLES
 from shared.interfaces import ConfigManagerInterface
 
+# Prefer the libyaml-backed loader when available; it is much faster than the
+# pure-Python SafeLoader and has identical safety guarantees.
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 
 logger = logging.getLogger(__name__)
 
+# Parsed YAML documents keyed by (absolute path, mtime_ns, size) so that
+# reloading an unchanged file skips the parse entirely.
+_YAML_CACHE: Dict[tuple, Dict[str, Any]] = {}
+
+# Standard configuration file locations, in priority order
+_CONFIG_CANDIDATES = [
+    "agent_config.yaml",
+    "agent_config.yml",
+    "/etc/monitoring/agent.yaml",
+    "/etc/monitoring/agent.yml",
+    os.path.expanduser("~/.monitoring/agent.yaml"),
+    os.path.expanduser("~/.monitoring/agent.yml")
+]
+
 
-@dataclass
+# dataclass(slots=True) is only available on Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class AgentConfig:
     """Agent configuration data structure."""
     server_url: str = "http://localhost:8000"
@@ -26,12 +54,16 @@ class AgentConfig:
     collection_interval: int = 60
     retry_attempts: int = 3
     retry_backoff: float = 2.0
+    slow_divisor: int = 6
+    batch_size: int = 1
+    batch_max: int = 100
+    flush_interval: int = 300
     server_id: Optional[str] = None
     log_level: str = "INFO"
     config_file: Optional[str] = None
     
-    # Additional fields for validation
-    _required_fields: list = field(default_factory=lambda: ["server_url", "api_key"])
+    # Fields that must be non-empty for the configuration to be valid
+    _REQUIRED_FIELDS: ClassVar[Tuple[str, ...]] = ("server_url", "api_key")
 
 
 class ConfigManager(ConfigManagerInterface):
@@ -60,9 +92,19 @@ class ConfigManager(ConfigManagerInterface):
             "collection_interval": 60,
             "retry_attempts": 3,
             "retry_backoff": 2.0,
+            "slow_divisor": 6,
+            "batch_size": 1,
+            "batch_max": 100,
+            "flush_interval": 300,
             "log_level": "INFO"
         }
         
+        # Environment variable names for known settings, computed once
+        self._env_keys = {key: f"{self._env_prefix}{key.upper()}" for key in self._defaults}
+        
+        # Resolved setting values, cleared on reload
+        self._resolved: Dict[str, Any] = {}
+        
         # Load configuration on initialization
         self._load_configuration()
     
@@ -86,11 +128,22 @@ class ConfigManager(ConfigManagerInterface):
                 logger.warning(f"Configuration file not found: {config_path}")
                 return {}
             
+            st = config_file.stat()
+            cache_key = (str(config_file.resolve()), st.st_mtime_ns, st.st_size)
+            cached = _YAML_CACHE.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Using cached configuration for {config_path}")
+                return dict(cached)
+            
             with open(config_file, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f) or {}
+                config_data = yaml.load(f, Loader=_SafeLoader) or {}
             
+            # Drop entries for older versions of the same file
+            for stale_key in [k for k in _YAML_CACHE if k[0] == cache_key[0]]:
+                del _YAML_CACHE[stale_key]
+            _YAML_CACHE[cache_key] = config_data
             logger.info(f"Loaded configuration from {config_path}")
-            return config_data
+            return dict(config_data)
             
         except yaml.YAMLError as e:
             logger.error(f"Failed to parse YAML configuration: {e}")
@@ -106,6 +159,7 @@ class ConfigManager(ConfigManagerInterface):
         Environment variables are checked first with the format MONITORING_<KEY>.
         If not found, checks the loaded configuration data.
         If still not found, returns the provided default or built-in default.
+        Resolved values are memoized until reload_config() is called.
         
         Args:
             key: Configuration key to retrieve
@@ -114,28 +168,28 @@ class ConfigManager(ConfigManagerInterface):
         Returns:
             Configuration value
         """
+        if key in self._resolved:
+            return self._resolved[key]
+        
         # Check environment variable first (with prefix)
-        env_key = f"{self._env_prefix}{key.upper()}"
+        env_key = self._env_keys.get(key) or f"{self._env_prefix}{key.upper()}"
         env_value = os.getenv(env_key)
         
         if env_value is not None:
             # Try to convert to appropriate type based on defaults
-            return self._convert_env_value(key, env_value)
-        
-        # Check loaded configuration data
-        if key in self._config_data:
-            return self._config_data[key]
-        
-        # Check built-in defaults first
-        built_in_default = self._defaults.get(key)
-        if built_in_default is not None:
-            return built_in_default
-        
-        # Return provided default if no built-in default exists
-        if default is not None:
-            return default
+            value = self._convert_env_value(key, env_value)
+        elif key in self._config_data:
+            # Check loaded configuration data
+            value = self._config_data[key]
+        else:
+            # Check built-in defaults, falling back to the provided default.
+            # Caller-provided defaults are not memoized since they may vary.
+            value = self._defaults.get(key)
+            if value is None:
+                return default
         
-        return None
+        self._resolved[key] = value
+        return value
     
     def get_agent_config(self) -> AgentConfig:
         """
@@ -150,6 +204,10 @@ class ConfigManager(ConfigManagerInterface):
             collection_interval=self.get_setting("collection_interval"),
             retry_attempts=self.get_setting("retry_attempts"),
             retry_backoff=self.get_setting("retry_backoff"),
+            slow_divisor=self.get_setting("slow_divisor"),
+            batch_size=self.get_setting("batch_size"),
+            batch_max=self.get_setting("batch_max"),
+            flush_interval=self.get_setting("flush_interval"),
             server_id=self.get_setting("server_id"),
             log_level=self.get_setting("log_level"),
             config_file=self._config_path
@@ -166,7 +224,7 @@ class ConfigManager(ConfigManagerInterface):
         config = self.get_agent_config()
         
         # Check required fields
-        for field_name in config._required_fields:
+        for field_name in AgentConfig._REQUIRED_FIELDS:
             value = getattr(config, field_name)
             if not value or (isinstance(value, str) and not value.strip()):
                 errors.append(f"Required field '{field_name}' is missing or empty")
@@ -181,6 +239,21 @@ class ConfigManager(ConfigManagerInterface):
         if config.retry_backoff <= 0:
             errors.append("retry_backoff must be positive")
         
+        if config.slow_divisor < 1:
+            errors.append("slow_divisor must be at least 1")
+        
+        if config.batch_size < 1:
+            errors.append("batch_size must be at least 1")
+        
+        if config.batch_max < config.batch_size:
+            errors.append("batch_max must not be smaller than batch_size")
+        
+        if config.batch_max > MAX_BATCH_SAMPLES:
+            errors.append(f"batch_max must not exceed {MAX_BATCH_SAMPLES}")
+        
+        if config.flush_interval < 0:
+            errors.append("flush_interval must be non-negative")
+        
         # Validate server URL format
         if config.server_url and not (config.server_url.startswith('http://') or 
                                      config.server_url.startswith('https://')):
@@ -214,23 +287,29 @@ class ConfigManager(ConfigManagerInterface):
         """
         Find configuration file in standard locations.
         
+        MONITORING_CONFIG_FILE takes precedence when set. Otherwise each
+        candidate directory is listed once rather than stat-ing every path.
+        
         Returns:
             Path to configuration file or None if not found
         """
-        # Standard configuration file locations
-        possible_paths = [
-            "agent_config.yaml",
-            "agent_config.yml",
-            "/etc/monitoring/agent.yaml",
-            "/etc/monitoring/agent.yml",
-            os.path.expanduser("~/.monitoring/agent.yaml"),
-            os.path.expanduser("~/.monitoring/agent.yml")
-        ]
-        
-        for path in possible_paths:
-            if Path(path).exists():
-                logger.info(f"Found configuration file: {path}")
-                return path
+        env_path = os.getenv(f"{self._env_prefix}CONFIG_FILE")
+        if env_path:
+            return env_path
+        
+        for directory, paths in itertools.groupby(_CONFIG_CANDIDATES, key=os.path.dirname):
+            names = [os.path.basename(path) for path in paths]
+            try:
+                with os.scandir(directory or ".") as entries:
+                    present = {entry.name for entry in entries if entry.name in names}
+            except OSError:
+                continue
+            
+            for name in names:
+                if name in present:
+                    path = os.path.join(directory, name)
+                    logger.info(f"Found configuration file: {path}")
+                    return path
         
         return None
     
@@ -266,6 +345,7 @@ class ConfigManager(ConfigManagerInterface):
     
     def reload_config(self):
         """Reload configuration from file and environment variables."""
+        self._resolved.clear()
         self._load_configuration()
         logger.info("Configuration reloaded")
     
@@ -283,5 +363,5 @@ class ConfigManager(ConfigManagerInterface):
         Returns:
             Configuration value from environment variable or default
         """
-        env_key = f"{self._env_prefix}{key.upper()}"
+        env_key = self._env_keys.get(key) or f"{self._env_prefix}{key.upper()}"
         return os.getenv(env_key, default)
\ No newline at end of file
@@ -8,18 +8,49 @@ to the monitoring server via REST API.
 
 import os
 import sys
+import asyncio
 import time
+import gzip
 import json
 import yaml
 import logging
-import requests
-import psutil
+import logging.handlers
+import queue
 import socket
-import subprocess
-from datetime import datetime
-from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+# requests and psutil are imported inside the methods that use them so that
+# importing this module stays cheap until the agent actually starts
+
+# Prefer the libyaml-backed loader when available
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# orjson is optional; it encodes straight to bytes and is much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Payloads larger than this many bytes are gzip-compressed before sending
+GZIP_MIN_SIZE = 1024
+
+
+def _dumps_json(obj: Any) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _loads_json(data: Any) -> Any:
+    """Deserialize JSON from a str or bytes payload."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class MonitoringAgent:
     """Main monitoring agent class."""
@@ -29,6 +60,12 @@ class MonitoringAgent:
         self.config_file = config_file
         self.config = self.load_config()
         self.setup_logging()
+        
+        import psutil
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
         self.session = requests.Session()
         self.session.headers.update({
             'Authorization': f'Bearer {self.config["server"]["api_key"]}',
@@ -36,17 +73,75 @@ class MonitoringAgent:
             'User-Agent': f'MonitoringAgent/1.0 ({socket.gethostname()})'
         })
         
+        # Keep a small pool of persistent connections and let urllib3 retry
+        # transient gateway errors instead of reconnecting from scratch.
+        # POSTs are only retried on connect errors: after a read error or a
+        # gateway status the server may already have stored the sample.
+        server_config = self.config['server']
+        retry_strategy = Retry(
+            total=server_config.get('retry_attempts', 3),
+            backoff_factor=server_config.get('retry_backoff', 2.0),
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET"]
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry_strategy)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
         # Agent identification
         self.server_id = self.config["agent"].get("hostname", socket.gethostname())
         self.hostname = socket.gethostname()
+        self._local_ip = self._detect_local_ip()
+        
+        # Prime non-blocking CPU sampling; the first reading is always 0.0
+        psutil.cpu_percent(interval=None)
+        
+        # Static system information, refreshed periodically rather than per cycle
+        self.cpu_count = psutil.cpu_count()
+        self._partitions: List[Any] = []
+        self._partitions_fetched_at = 0.0
+        self._partitions_ttl = 300
+        
+        # Payload skeleton with a fixed key layout, filled in each cycle
+        self._metrics_template: Dict[str, Any] = {
+            'server_id': self.server_id,
+            'hostname': self.hostname,
+            'timestamp': None,
+            'cpu_usage': 0.0,
+            'cpu_count': self.cpu_count,
+            'memory_total': 0,
+            'memory_used': 0,
+            'memory_percentage': 0.0,
+            'disk_usage': [],
+            'load_1min': 0.0,
+            'load_5min': 0.0,
+            'load_15min': 0.0,
+            'uptime': 0,
+            'network_bytes_sent': 0,
+            'network_bytes_recv': 0,
+            'failed_services': []
+        }
         
         self.logger.info(f"Monitoring agent initialized for server: {self.server_id}")
     
+    def _detect_local_ip(self) -> str:
+        """Find the first non-loopback IPv4 address from the local interfaces."""
+        import psutil
+        
+        try:
+            for addresses in psutil.net_if_addrs().values():
+                for address in addresses:
+                    if address.family == socket.AF_INET and not address.address.startswith('127.'):
+                        return address.address
+        except Exception:
+            pass
+        return "127.0.0.1"
+    
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         try:
             with open(self.config_file, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=_SafeLoader)
             
             # Validate required configuration
             required_keys = ['server', 'metrics', 'logging']
@@ -81,31 +176,46 @@ class MonitoringAgent:
         log_dir = os.path.dirname(log_file)
         os.makedirs(log_dir, exist_ok=True)
         
-        # Configure logging
-        logging.basicConfig(
-            level=log_level,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler(sys.stdout)
-            ]
+        # Configure logging; records are queued and written by a background
+        # listener thread so disk I/O stays off the collection path
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        output_handlers = [
+            logging.FileHandler(log_file),
+            logging.StreamHandler(sys.stdout)
+        ]
+        for handler in output_handlers:
+            handler.setFormatter(formatter)
+        
+        log_queue = queue.Queue(-1)
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, *output_handlers, respect_handler_level=True
         )
+        self._log_listener.start()
+        
+        # The queue handler only merges the message arguments; the listener's
+        # handlers apply the real format
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        
+        logging.basicConfig(level=log_level, handlers=[queue_handler])
         
         self.logger = logging.getLogger('monitoring-agent')
     
-    def collect_system_metrics(self) -> Dict[str, Any]:
+    async def collect_system_metrics(self) -> Dict[str, Any]:
         """Collect system metrics."""
+        import psutil
+        
         try:
             # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_count = psutil.cpu_count()
+            cpu_percent = psutil.cpu_percent(interval=None)
+            cpu_count = self.cpu_count
             
             # Memory metrics
             memory = psutil.virtual_memory()
             
             # Disk metrics
             disk_usage = []
-            for partition in psutil.disk_partitions():
+            for partition in self.get_disk_partitions():
                 try:
                     usage = psutil.disk_usage(partition.mountpoint)
                     disk_usage.append({
@@ -122,71 +232,96 @@ class MonitoringAgent:
                     continue
             
             # Load average
-            load_avg = os.getloadavg()
+            load_avg = self.read_load_average()
             
             # System uptime
-            boot_time = psutil.boot_time()
-            uptime = int(time.time() - boot_time)
+            uptime = self.read_uptime()
             
             # Network metrics (basic)
             network = psutil.net_io_counters()
             
             # Failed services (systemd)
-            failed_services = self.get_failed_services()
+            failed_services = await self.get_failed_services()
             
-            metrics = {
-                'server_id': self.server_id,
-                'hostname': self.hostname,
-                'timestamp': datetime.utcnow().isoformat() + 'Z',
-                'cpu_usage': cpu_percent,
-                'cpu_count': cpu_count,
-                'memory_total': memory.total,
-                'memory_used': memory.used,
-                'memory_percentage': memory.percent,
-                'disk_usage': disk_usage,
-                'load_1min': load_avg[0],
-                'load_5min': load_avg[1],
-                'load_15min': load_avg[2],
-                'uptime': uptime,
-                'network_bytes_sent': network.bytes_sent,
-                'network_bytes_recv': network.bytes_recv,
-                'failed_services': failed_services
-            }
+            metrics = self._metrics_template
+            metrics['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            metrics['cpu_usage'] = cpu_percent
+            metrics['cpu_count'] = cpu_count
+            metrics['memory_total'] = memory.total
+            metrics['memory_used'] = memory.used
+            metrics['memory_percentage'] = memory.percent
+            metrics['disk_usage'] = disk_usage
+            metrics['load_1min'] = load_avg[0]
+            metrics['load_5min'] = load_avg[1]
+            metrics['load_15min'] = load_avg[2]
+            metrics['uptime'] = uptime
+            metrics['network_bytes_sent'] = network.bytes_sent
+            metrics['network_bytes_recv'] = network.bytes_recv
+            metrics['failed_services'] = failed_services
             
             self.logger.debug(f"Collected metrics: CPU={cpu_percent}%, Memory={memory.percent}%")
-            return metrics
+            # Shallow copy, since the previous payload may still be in flight
+            return metrics.copy()
             
         except Exception as e:
             self.logger.error(f"Error collecting system metrics: {e}")
             return {}
     
-    def get_failed_services(self) -> List[str]:
+    def read_load_average(self) -> tuple:
+        """Read the 1, 5 and 15 minute load averages from /proc/loadavg."""
+        try:
+            with open('/proc/loadavg') as f:
+                fields = f.read().split()
+            return float(fields[0]), float(fields[1]), float(fields[2])
+        except OSError:
+            return os.getloadavg()
+    
+    def read_uptime(self) -> int:
+        """Read the system uptime in seconds from /proc/uptime."""
+        try:
+            with open('/proc/uptime') as f:
+                return int(float(f.read().split()[0]))
+        except OSError:
+            import psutil
+            return int(time.time() - psutil.boot_time())
+    
+    def get_disk_partitions(self) -> List[Any]:
+        """Get mounted partitions, re-reading the mount table at most every few minutes."""
+        now = time.monotonic()
+        if not self._partitions or now - self._partitions_fetched_at > self._partitions_ttl:
+            import psutil
+            self._partitions = psutil.disk_partitions()
+            self._partitions_fetched_at = now
+        return self._partitions
+    
+    async def get_failed_services(self) -> List[str]:
         """Get list of failed systemd services."""
         try:
             if not self.config['metrics']['services']['enabled']:
                 return []
             
-            # Run systemctl to get failed services
-            result = subprocess.run(
-                ['systemctl', '--failed', '--no-legend', '--plain'],
-                capture_output=True,
-                text=True,
-                timeout=10
+            # Run systemctl to get failed services as a JSON array of units
+            process = await asyncio.create_subprocess_exec(
+                'systemctl', '--failed', '--output=json',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
+            try:
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout=10)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
             
-            if result.returncode == 0:
-                failed_services = []
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip():
-                        # Extract service name (first column)
-                        service_name = line.split()[0]
-                        failed_services.append(service_name)
-                return failed_services
+            if process.returncode == 0:
+                if not stdout.strip():
+                    return []
+                return [unit['unit'] for unit in _loads_json(stdout)]
             else:
                 self.logger.warning("Failed to get systemd service status")
                 return []
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             self.logger.warning("Timeout getting systemd service status")
             return []
         except Exception as e:
@@ -195,14 +330,24 @@ class MonitoringAgent:
     
     def send_metrics(self, metrics: Dict[str, Any]) -> bool:
         """Send metrics to the monitoring server."""
+        import requests
+        
         try:
             server_config = self.config['server']
             url = f"{server_config['url']}/api/v1/metrics"
             timeout = server_config.get('timeout', 30)
             
+            # The session already sends Content-Type: application/json
+            body = _dumps_json(metrics)
+            headers = None
+            if len(body) > GZIP_MIN_SIZE:
+                body = gzip.compress(body, compresslevel=1)
+                headers = {'Content-Encoding': 'gzip'}
+
             response = self.session.post(
                 url,
-                json=metrics,
+                data=body,
+                headers=headers,
                 timeout=timeout
             )
             
@@ -229,20 +374,10 @@ class MonitoringAgent:
             server_config = self.config['server']
             url = f"{server_config['url']}/api/v1/register"
             
-            # Get local IP address
-            try:
-                # Connect to a remote address to determine local IP
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.connect(("8.8.8.8", 80))
-                local_ip = s.getsockname()[0]
-                s.close()
-            except Exception:
-                local_ip = "127.0.0.1"
-            
             registration_data = {
                 'server_id': self.server_id,
                 'hostname': self.hostname,
-                'ip_address': local_ip,
+                'ip_address': self._local_ip,
                 'agent_version': '1.0.0',
                 'os_info': {
                     'platform': sys.platform,
@@ -267,45 +402,67 @@ class MonitoringAgent:
             self.logger.warning(f"Error registering server: {e}")
             return False
     
-    def run(self):
+    async def _send_in_background(self, metrics: Dict[str, Any]):
+        """Send metrics on a worker thread so the event loop keeps running."""
+        loop = asyncio.get_running_loop()
+        success = await loop.run_in_executor(None, self.send_metrics, metrics)
+        
+        if success:
+            self.logger.debug("Metrics collection and transmission successful")
+        else:
+            self.logger.warning("Failed to send metrics to server")
+    
+    async def run(self):
         """Main agent loop."""
         self.logger.info("Starting monitoring agent...")
+        loop = asyncio.get_running_loop()
         
         # Try to register server on startup
-        self.register_server()
+        await loop.run_in_executor(None, self.register_server)
         
         metrics_config = self.config['metrics']
         collection_interval = metrics_config.get('collection_interval', 60)
         
         self.logger.info(f"Collecting metrics every {collection_interval} seconds")
         
-        while True:
-            try:
-                # Collect metrics
-                metrics = self.collect_system_metrics()
-                
-                if metrics:
-                    # Send metrics to server
-                    success = self.send_metrics(metrics)
+        # At most one transmission is in flight; it overlaps the wait and
+        # the next collection rather than blocking them
+        send_task: Optional[asyncio.Task] = None
+        
+        # Cycles are scheduled against a monotonic deadline so the time spent
+        # collecting and sending does not push every later cycle back
+        next_tick = time.monotonic()
+        
+        try:
+            while True:
+                try:
+                    # Collect metrics
+                    metrics = await self.collect_system_metrics()
                     
-                    if success:
-                        self.logger.debug("Metrics collection and transmission successful")
+                    if metrics:
+                        # Finish the previous transmission before starting the next one
+                        if send_task is not None:
+                            await send_task
+                        send_task = asyncio.ensure_future(self._send_in_background(metrics))
                     else:
-                        self.logger.warning("Failed to send metrics to server")
-                else:
-                    self.logger.warning("No metrics collected")
-                
-                # Wait for next collection interval
-                time.sleep(collection_interval)
-                
-            except KeyboardInterrupt:
-                self.logger.info("Received interrupt signal, shutting down...")
-                break
-            except Exception as e:
-                self.logger.error(f"Unexpected error in main loop: {e}")
-                time.sleep(10)  # Wait before retrying
-        
-        self.logger.info("Monitoring agent stopped")
+                        self.logger.warning("No metrics collected")
+                    
+                    # Wait for next collection deadline
+                    next_tick += collection_interval
+                    await asyncio.sleep(max(0, next_tick - time.monotonic()))
+                    
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Unexpected error in main loop: {e}")
+                    next_tick = time.monotonic() + 10  # Wait before retrying
+                    await asyncio.sleep(10)
+        finally:
+            if send_task is not None and not send_task.done():
+                send_task.cancel()
+            self.logger.info("Monitoring agent stopped")
+            # Flush any queued log records before exiting
+            self._log_listener.stop()
 
 
 def main():
@@ -319,7 +476,7 @@ def main():
     
     try:
         agent = MonitoringAgent(config_file)
-        agent.run()
+        asyncio.run(agent.run())
     except KeyboardInterrupt:
         print("\nShutdown requested by user")
         sys.exit(0)
@@ -5,24 +5,60 @@ This module implements the MetricsCollector class that gathers system metrics
 including CPU usage, memory usage, disk usage, load average, and uptime.
 """
 
+import os
+import time
 import psutil
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from shared.interfaces import MetricsCollectorInterface
 from shared.models import MemoryInfo, DiskUsage, LoadAverage
 
+# How long the partition table is reused before psutil is queried again
+PARTITION_CACHE_TTL = 300.0
+
+# Pseudo and image filesystems that are not worth reporting
+SKIPPED_FSTYPES = frozenset({'squashfs', 'tmpfs', 'devtmpfs', 'overlay'})
+
+# (monotonic timestamp, partitions) of the last psutil.disk_partitions() call
+_partition_cache: Tuple[float, list] = (0.0, [])
+
+
+def _get_disk_partitions() -> list:
+    """
+    Return mounted partitions, re-reading the mount table at most once per TTL.
+    
+    Returns:
+        list: psutil partition tuples
+    """
+    global _partition_cache
+    
+    fetched_at, partitions = _partition_cache
+    now = time.monotonic()
+    if not partitions or now - fetched_at > PARTITION_CACHE_TTL:
+        partitions = psutil.disk_partitions()
+        _partition_cache = (now, partitions)
+    
+    return partitions
+
 
 class MetricsCollector(MetricsCollectorInterface):
     """Collects system metrics using psutil library."""
 
+    def __init__(self):
+        """Initialize the collector and prime non-blocking CPU sampling."""
+        # The first non-blocking call only records a baseline and returns 0.0
+        psutil.cpu_percent(interval=None)
+
     def collect_cpu_usage(self) -> float:
         """
         Collect CPU usage percentage (0-100).
         
+        The value covers the period since the previous call, so no time is
+        spent sleeping inside the collection cycle.
+        
         Returns:
             float: CPU usage percentage as a float between 0 and 100
         """
-        # Use interval=1 to get a meaningful CPU percentage over 1 second
-        return psutil.cpu_percent(interval=1)
+        return psutil.cpu_percent(interval=None)
 
     def collect_memory_usage(self) -> Dict:
         """
@@ -41,41 +77,38 @@ class MetricsCollector(MetricsCollectorInterface):
             'percentage': memory.percent
         }
 
-    def collect_disk_usage(self) -> List[Dict]:
+    def collect_disk_usage(self) -> List[DiskUsage]:
         """
         Collect disk usage for all mounted filesystems.
         
         Returns:
-            List[Dict]: List of dictionaries, each containing:
-                - mountpoint: Mount point path
-                - total: Total disk space in bytes
-                - used: Used disk space in bytes
-                - percentage: Disk usage percentage
+            List[DiskUsage]: One entry per reported mount point
         """
         disk_usage_list = []
         
-        # Get all disk partitions
-        partitions = psutil.disk_partitions()
+        # Get all disk partitions (cached; mounts rarely change)
+        partitions = _get_disk_partitions()
         
         for partition in partitions:
-            try:
-                # Get usage statistics for this partition
-                usage = psutil.disk_usage(partition.mountpoint)
-                
-                disk_info = {
-                    'mountpoint': partition.mountpoint,
-                    'total': usage.total,
-                    'used': usage.used,
-                    'percentage': (usage.used / usage.total) * 100 if usage.total > 0 else 0
-                }
-                disk_usage_list.append(disk_info)
-                
-            except PermissionError:
-                # Skip partitions we can't access (e.g., system partitions on some systems)
+            if partition.fstype in SKIPPED_FSTYPES:
                 continue
+            
+            try:
+                # Single statvfs syscall per mount point
+                stats = os.statvfs(partition.mountpoint)
             except OSError:
-                # Skip invalid or unmounted partitions
+                # Skip inaccessible, invalid or unmounted partitions
                 continue
+            
+            total = stats.f_blocks * stats.f_frsize
+            used = (stats.f_blocks - stats.f_bfree) * stats.f_frsize
+            
+            disk_usage_list.append(DiskUsage(
+                mountpoint=partition.mountpoint,
+                total=total,
+                used=used,
+                percentage=(used / total) * 100 if total > 0 else 0
+            ))
                 
         return disk_usage_list
 
@@ -105,8 +138,6 @@ class MetricsCollector(MetricsCollectorInterface):
         Returns:
             int: System uptime in seconds since boot
         """
-        import time
-        
         # psutil.boot_time() returns timestamp when system was booted
         boot_time = psutil.boot_time()
         current_time = time.time()
@@ -5,25 +5,348 @@ This module implements the SystemdMonitor class that monitors systemd services
 and detects failed services on the system.
 """
 
+import os
 import subprocess
 import json
-from typing import List
+import logging
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional
 from datetime import datetime
 from shared.interfaces import SystemdMonitorInterface
 from shared.models import FailedService
 
+# jeepney is optional; without it failed units are read via systemctl
+try:
+    from jeepney import DBusAddress, DBusErrorResponse, HeaderFields, MatchRule, new_method_call
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+except ImportError:
+    open_dbus_connection = None
+
+# orjson is optional; its C parser is considerably faster than json.loads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+# Timeout in seconds for systemd D-Bus calls
+DBUS_CALL_TIMEOUT = 10
+
+# How often the signal watcher wakes up to check for shutdown
+SIGNAL_POLL_INTERVAL = 1.0
+
+# Exists only when the host was booted with systemd (see sd_booted(3))
+SYSTEMD_RUNTIME_DIR = '/run/systemd/system'
+
+_UNIT_PATH_ESCAPE = re.compile(rb'_([0-9a-fA-F]{2})')
+
+
+def _unit_name_from_path(path: str) -> str:
+    """
+    Decode a systemd unit object path back into the unit name.
+    
+    systemd escapes every byte outside [A-Za-z0-9] in the last path label
+    as ``_xx`` (hex), e.g. ``/org/freedesktop/systemd1/unit/nginx_2eservice``.
+    
+    Args:
+        path: D-Bus object path of the unit
+        
+    Returns:
+        str: The unit name, e.g. ``nginx.service``
+    """
+    label = path.rsplit('/', 1)[-1].encode('ascii')
+    return _UNIT_PATH_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), label).decode('utf-8')
+
+
+def _loads_json(data: str):
+    """
+    Parse JSON text, using orjson when it is installed.
+    
+    Args:
+        data: JSON document
+        
+    Returns:
+        The decoded object
+        
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class SystemdMonitor(SystemdMonitorInterface):
     """Monitors systemd services and detects failed services."""
 
+    def __init__(self):
+        """Initialize the monitor; the D-Bus connection is opened on first use."""
+        self._bus = None
+        self._manager = None
+        self._dbus_available = open_dbus_connection is not None
+        
+        # Failed units maintained from systemd signals by the watcher thread
+        self._failed: Dict[str, FailedService] = {}
+        self._lock = threading.Lock()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        
+        # Probed once; without systemd there is nothing to query each cycle
+        self._has_systemd = os.path.isdir(SYSTEMD_RUNTIME_DIR)
+        if not self._has_systemd:
+            logger.info("systemd not detected - failed service monitoring disabled")
+        
+        if self._dbus_available:
+            self._manager = DBusAddress(
+                '/org/freedesktop/systemd1',
+                bus_name='org.freedesktop.systemd1',
+                interface='org.freedesktop.systemd1.Manager'
+            )
+
+    def _get_bus(self):
+        """
+        Get the cached system D-Bus connection, opening it on first use.
+        
+        Returns:
+            The open connection, or None if the system bus is unavailable
+        """
+        if self._bus is None and self._dbus_available:
+            try:
+                self._bus = open_dbus_connection(bus='SYSTEM')
+            except (OSError, ValueError, KeyError) as e:
+                # No system bus available (containers, non-systemd hosts)
+                logger.debug(f"System D-Bus unavailable, using systemctl: {e}")
+                self._dbus_available = False
+        
+        return self._bus
+
+    def close(self) -> None:
+        """Stop the signal watcher and close the D-Bus connections."""
+        self._stop_watching.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=SIGNAL_POLL_INTERVAL * 2)
+            self._watch_thread = None
+        
+        self._close_bus()
+
+    def _close_bus(self) -> None:
+        """Close the polling D-Bus connection if one is open."""
+        if self._bus is not None:
+            try:
+                self._bus.close()
+            except OSError:
+                pass
+            self._bus = None
+            logger.debug("D-Bus connection closed")
+
     def get_failed_services(self) -> List[FailedService]:
         """
         Get list of failed systemd services.
         
+        When systemd is reachable over D-Bus the failed set is kept up to date
+        from unit signals, so this is just a copy. Otherwise systemd is polled
+        over D-Bus, falling back to parsing systemctl output.
+        
         Returns:
             List[FailedService]: List of failed service objects containing
                 name, status, and optional timestamp information
         """
+        if not self._has_systemd:
+            return []
+        
+        if self._start_watching():
+            with self._lock:
+                return list(self._failed.values())
+        
+        if self._get_bus() is not None:
+            failed_services = self._get_failed_services_dbus()
+            
+            if failed_services is None:
+                # The bus peer may have gone away (e.g. systemd was restarted);
+                # rebuild the connection once before falling back
+                self._close_bus()
+                if self._get_bus() is not None:
+                    failed_services = self._get_failed_services_dbus()
+            
+            if failed_services is not None:
+                return failed_services
+        
+        return self._get_failed_services_systemctl()
+
+    def _start_watching(self) -> bool:
+        """
+        Subscribe to systemd unit signals and start the watcher thread.
+        
+        The watcher uses its own connection. Match rules are installed before
+        the initial ListUnitsFiltered snapshot, so no state change between the
+        snapshot and the first signal is lost.
+        
+        Returns:
+            bool: True if the failed set is being maintained from signals
+        """
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return True
+        if not self._dbus_available:
+            return False
+        
+        try:
+            connection = open_dbus_connection(bus='SYSTEM')
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"System D-Bus unavailable, using systemctl: {e}")
+            self._dbus_available = False
+            return False
+        
+        signals = deque()
+        try:
+            for rule in self._signal_rules():
+                connection.filter(rule, queue=signals)
+                unwrap_msg(connection.send_and_get_reply(
+                    message_bus.AddMatch(rule), timeout=DBUS_CALL_TIMEOUT
+                ))
+            
+            # systemd only emits unit PropertiesChanged signals to subscribers
+            unwrap_msg(connection.send_and_get_reply(
+                new_method_call(self._manager, 'Subscribe'), timeout=DBUS_CALL_TIMEOUT
+            ))
+        except (DBusErrorResponse, OSError, TimeoutError) as e:
+            logger.debug(f"Could not subscribe to systemd signals: {e}")
+            connection.close()
+            return False
+        
+        failed_services = self._get_failed_services_dbus(connection)
+        if failed_services is None:
+            connection.close()
+            return False
+        
+        with self._lock:
+            self._failed = {service.name: service for service in failed_services}
+        
+        self._stop_watching.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_units,
+            args=(connection, signals),
+            name="systemd-unit-watcher",
+            daemon=True
+        )
+        self._watch_thread.start()
+        logger.debug("Watching systemd unit signals for failed services")
+        return True
+
+    def _signal_rules(self) -> List:
+        """
+        Build the match rules for the systemd signals the watcher needs.
+        
+        Returns:
+            List: MatchRule objects for unit state changes and unit removal
+        """
+        state_changes = MatchRule(
+            type='signal',
+            interface='org.freedesktop.DBus.Properties',
+            member='PropertiesChanged',
+            path_namespace='/org/freedesktop/systemd1/unit'
+        )
+        state_changes.add_arg_condition(0, 'org.freedesktop.systemd1.Unit')
+        
+        unit_removed = MatchRule(
+            type='signal',
+            interface='org.freedesktop.systemd1.Manager',
+            member='UnitRemoved',
+            path='/org/freedesktop/systemd1'
+        )
+        
+        return [state_changes, unit_removed]
+
+    def _watch_units(self, connection, signals: deque) -> None:
+        """
+        Apply systemd signals to the failed set until asked to stop.
+        
+        Args:
+            connection: Dedicated D-Bus connection with the match rules installed
+            signals: Queue the connection's filters deliver signals into
+        """
+        try:
+            while not self._stop_watching.is_set():
+                try:
+                    message = connection.recv_until_filtered(signals, timeout=SIGNAL_POLL_INTERVAL)
+                except TimeoutError:
+                    continue
+                self._handle_unit_signal(message)
+        except (OSError, ValueError) as e:
+            # Bus went away; the next collection re-subscribes and re-seeds
+            logger.warning(f"Lost systemd D-Bus signal connection: {e}")
+        finally:
+            connection.close()
+
+    def _handle_unit_signal(self, message) -> None:
+        """
+        Update the failed set from a single systemd signal.
+        
+        Args:
+            message: PropertiesChanged or UnitRemoved signal message
+        """
+        member = message.header.fields.get(HeaderFields.member)
+        
+        if member == 'UnitRemoved':
+            unit_name = message.body[0]
+            with self._lock:
+                self._failed.pop(unit_name, None)
+            return
+        
+        _interface, changed, _invalidated = message.body
+        if 'ActiveState' not in changed:
+            return
+        
+        # Properties arrive as (signature, value) variants
+        active_state = changed['ActiveState'][1]
+        unit_name = _unit_name_from_path(message.header.fields[HeaderFields.path])
+        
+        with self._lock:
+            if active_state == 'failed':
+                self._failed[unit_name] = FailedService(name=unit_name, status=active_state, since=None)
+            else:
+                self._failed.pop(unit_name, None)
+
+    def _get_failed_services_dbus(self, bus=None) -> Optional[List[FailedService]]:
+        """
+        Get failed units from the systemd manager via ListUnitsFiltered.
+        
+        Args:
+            bus: Connection to query; defaults to the polling connection
+        
+        Returns:
+            Optional[List[FailedService]]: Failed services, or None if the
+                D-Bus call failed and the caller should fall back
+        """
+        bus = bus or self._bus
+        try:
+            message = new_method_call(self._manager, 'ListUnitsFiltered', 'as', (['failed'],))
+            reply = bus.send_and_get_reply(message, timeout=DBUS_CALL_TIMEOUT)
+            units = unwrap_msg(reply)[0]
+        except (DBusErrorResponse, OSError, TimeoutError) as e:
+            logger.debug(f"D-Bus ListUnitsFiltered failed, using systemctl: {e}")
+            return None
+        
+        # Each unit is (name, description, load_state, active_state, sub_state,
+        # followed, unit_path, job_id, job_type, job_path)
+        return [
+            FailedService(name=unit[0], status=unit[3], since=None)
+            for unit in units
+            if unit[3] == 'failed'
+        ]
+
+    def _get_failed_services_systemctl(self) -> List[FailedService]:
+        """
+        Get failed services by running systemctl with JSON output.
+        
+        Returns:
+            List[FailedService]: List of failed services
+        """
         failed_services = []
         
         try:
@@ -42,7 +365,7 @@ class SystemdMonitor(SystemdMonitorInterface):
             if result.returncode == 0 and result.stdout.strip():
                 try:
                     # Parse JSON output from systemctl
-                    services_data = json.loads(result.stdout)
+                    services_data = _loads_json(result.stdout)
                     
                     for service_info in services_data:
                         # Extract service information from systemctl output
@@ -59,12 +382,12 @@ class SystemdMonitor(SystemdMonitorInterface):
                             failed_services.append(failed_service)
                             
                 except json.JSONDecodeError:
-                    # If JSON parsing fails, fall back to text parsing
-                    failed_services = self._parse_text_output(result.stdout)
+                    # If JSON parsing fails, fall back to systemctl show
+                    failed_services = self._get_failed_services_show()
                     
             else:
-                # If JSON output fails, try alternative approach with text output
-                failed_services = self._get_failed_services_text()
+                # If JSON output is unsupported, fall back to systemctl show
+                failed_services = self._get_failed_services_show()
                 
         except subprocess.TimeoutExpired:
             # Handle timeout - systemctl might be hanging
@@ -78,9 +401,12 @@ class SystemdMonitor(SystemdMonitorInterface):
             
         return failed_services
 
-    def _get_failed_services_text(self) -> List[FailedService]:
+    def _get_failed_services_show(self) -> List[FailedService]:
         """
-        Fallback method to get failed services using text output.
+        Fallback method to get failed services from ``systemctl show``.
+        
+        Only the Id and ActiveState properties are requested, which avoids
+        the description formatting and journal lookups of list-units.
         
         Returns:
             List[FailedService]: List of failed services
@@ -88,16 +414,15 @@ class SystemdMonitor(SystemdMonitorInterface):
         failed_services = []
         
         try:
-            # Use text output as fallback
             result = subprocess.run(
-                ['systemctl', 'list-units', '--failed', '--no-pager', '--no-legend'],
+                ['systemctl', 'show', '--state=failed', '--property=Id,ActiveState', '*'],
                 capture_output=True,
                 text=True,
                 timeout=10
             )
             
             if result.returncode == 0:
-                failed_services = self._parse_text_output(result.stdout)
+                failed_services = self._parse_show_output(result.stdout)
                 
         except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
             # If all methods fail, return empty list
@@ -105,33 +430,31 @@ class SystemdMonitor(SystemdMonitorInterface):
             
         return failed_services
 
-    def _parse_text_output(self, output: str) -> List[FailedService]:
+    def _parse_show_output(self, output: str) -> List[FailedService]:
         """
-        Parse text output from systemctl to extract failed services.
+        Parse ``systemctl show`` output to extract failed services.
         
         Args:
-            output: Raw text output from systemctl command
+            output: Key=Value records separated by blank lines
             
         Returns:
             List[FailedService]: List of parsed failed services
         """
         failed_services = []
         
-        for line in output.strip().split('\n'):
-            if line.strip():
-                # systemctl output format: UNIT LOAD ACTIVE SUB DESCRIPTION
-                parts = line.split()
-                if len(parts) >= 3:
-                    unit_name = parts[0]
-                    active_state = parts[2]
-                    
-                    # Only include failed services
-                    if active_state == 'failed':
-                        failed_service = FailedService(
-                            name=unit_name,
-                            status=active_state,
-                            since=None
-                        )
-                        failed_services.append(failed_service)
-                        
+        for record in output.strip().split('\n\n'):
+            properties = dict(
+                line.split('=', 1) for line in record.splitlines() if '=' in line
+            )
+            unit_name = properties.get('Id')
+            active_state = properties.get('ActiveState')
+            
+            # Only include failed services
+            if unit_name and active_state == 'failed':
+                failed_services.append(FailedService(
+                    name=unit_name,
+                    status=active_state,
+                    since=None
+                ))
+                
         return failed_services
\ No newline at end of file
@@ -5,23 +5,42 @@ This module implements the AgentService class that coordinates all agent compone
 and provides periodic metric collection scheduling.
 """
 
+import asyncio
 import time
 import logging
 import threading
-from datetime import datetime
-from typing import Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
 import signal
 import sys
 
 from agent.metrics.collector import MetricsCollector
 from agent.metrics.systemd_monitor import SystemdMonitor
-from agent.transport.http_transmitter import HTTPTransmitter
+from agent.transport.http_transmitter import (
+    HTTPTransmitter, MAX_BATCH_SAMPLES, MetricsRejectedError
+)
 from agent.config.manager import ConfigManager, AgentConfig
-from shared.models import SystemMetrics, MemoryInfo, DiskUsage, LoadAverage
+from shared.models import SystemMetrics, MemoryInfo, DiskUsage, LoadAverage, FailedService
 
 
 logger = logging.getLogger(__name__)
 
+# Consecutive cycles without idle time before warning that collection is over budget
+OVERRUN_WARNING_CYCLES = 3
+
+# Sends allowed to be outstanding against a slow server before the oldest is dropped
+MAX_QUEUED_SENDS = 10
+
+# Seconds stop() waits for outstanding sends before cancelling them
+SEND_DRAIN_TIMEOUT = 10
+
+# Threads used to run the individual metric collectors concurrently
+COLLECT_WORKERS = 4
+
+# UTC sample timestamp; second precision is ample for the collection interval
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
 
 class AgentService:
     """
@@ -45,6 +64,14 @@ class AgentService:
         self._collection_thread: Optional[threading.Thread] = None
         self._shutdown_event = threading.Event()
         
+        # Slow-changing metrics (disk usage, failed services) are only
+        # re-collected every slow_divisor ticks; cached values fill the gaps.
+        # The cached lists are replaced, never mutated, so buffered samples
+        # share one list per slow tick rather than holding their own copies
+        self._tick = 0
+        self._last_disk: List[DiskUsage] = []
+        self._last_failed: List[FailedService] = []
+        
         # Initialize configuration manager
         self.config_manager = ConfigManager(config_path)
         self.config: AgentConfig = self.config_manager.get_agent_config()
@@ -56,14 +83,42 @@ class AgentService:
             logger.error(error_msg)
             raise ValueError(error_msg)
         
+        # Resolved once; the hostname does not change while the agent runs
+        self._server_id = self.config.server_id or self._generate_server_id()
+        
+        # Samples waiting to be sent as one batch; the oldest are dropped
+        # once batch_max is reached while the server is unreachable. Failed
+        # batches are put back from the send thread, hence the lock
+        self._pending: deque = deque(maxlen=self.config.batch_max)
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._batch_future: Optional[Future] = None
+        
+        # Sends run as coroutines on a private event loop, so neither server
+        # latency nor retry backoff holds up the collection loop or parks a
+        # thread per request. The loop is started on the first send
+        self._send_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._send_thread: Optional[threading.Thread] = None
+        self._send_queue: deque = deque()
+        
+        # The collectors read /proc, call statvfs and may spawn systemctl;
+        # running them side by side bounds a cycle by the slowest one
+        self._collect_pool = ThreadPoolExecutor(
+            max_workers=COLLECT_WORKERS,
+            thread_name_prefix="collect"
+        )
+        
         # Initialize components
         self.metrics_collector = MetricsCollector()
         self.systemd_monitor = SystemdMonitor()
         self.http_transmitter = HTTPTransmitter(
             server_url=self.config.server_url,
             max_retries=self.config.retry_attempts,
-            backoff_factor=self.config.retry_backoff
+            backoff_factor=self.config.retry_backoff,
+            # Outlive the idle gap between cycles so the connection is reused
+            keepalive_expiry=2 * self.config.collection_interval
         )
+        self.http_transmitter.set_api_key(self.config.api_key)
         
         # Set up logging level
         logging.getLogger().setLevel(getattr(logging, self.config.log_level.upper()))
@@ -113,6 +168,8 @@ class AgentService:
         """
         if not self._running:
             logger.warning("Agent service is not running")
+            # Sends may still have been made without start()
+            self._stop_send_loop()
             return
         
         logger.info("Stopping agent service...")
@@ -129,8 +186,16 @@ class AgentService:
             if self._collection_thread.is_alive():
                 logger.warning("Collection thread did not stop gracefully")
         
-        # Clean up HTTP transmitter
+        # Send whatever is still buffered before shutting down
+        self._flush_pending(max_attempts=1)
+        
+        self._stop_send_loop()
+        
+        self._collect_pool.shutdown(wait=True)
+        
+        # Clean up HTTP transmitter and D-Bus connection
         self.http_transmitter.close()
+        self.systemd_monitor.close()
         
         logger.info("Agent service stopped")
 
@@ -144,9 +209,9 @@ class AgentService:
         try:
             self.start()
             
-            # Block main thread until shutdown
-            while self._running:
-                time.sleep(1)
+            # Block main thread until a signal requests shutdown
+            while self._running and not self._shutdown_event.wait(timeout=1):
+                pass
                 
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt")
@@ -160,19 +225,48 @@ class AgentService:
         """
         Collect system metrics and send them to the central server.
         
+        The sample (or, in batch mode, a full batch) is queued on the
+        background send worker and the outcome is logged once the request
+        completes.
+        
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if the sample was collected and queued or buffered, False otherwise
         """
         try:
             logger.debug("Starting metrics collection...")
             
-            # Collect all metrics
-            cpu_usage = self.metrics_collector.collect_cpu_usage()
-            memory_data = self.metrics_collector.collect_memory_usage()
-            disk_data = self.metrics_collector.collect_disk_usage()
-            load_data = self.metrics_collector.collect_load_average()
-            uptime = self.metrics_collector.collect_uptime()
-            failed_services = self.systemd_monitor.get_failed_services()
+            # Collect fast-changing metrics every tick
+            collectors: Dict[str, Callable[[], Any]] = {
+                'cpu': self.metrics_collector.collect_cpu_usage,
+                'memory': self.metrics_collector.collect_memory_usage,
+                'load_average': self.metrics_collector.collect_load_average,
+                'uptime': self.metrics_collector.collect_uptime,
+            }
+            
+            # Collect slow-changing metrics every slow_divisor ticks
+            if self._tick % self.config.slow_divisor == 0:
+                collectors['disk'] = self.metrics_collector.collect_disk_usage
+                collectors['failed_services'] = self.systemd_monitor.get_failed_services
+            self._tick += 1
+            
+            results = self._run_collectors(collectors)
+            
+            # A failed slow collector keeps reporting its last good value
+            self._last_disk = results.get('disk', self._last_disk)
+            self._last_failed = results.get('failed_services', self._last_failed)
+            disk_usage = self._last_disk
+            failed_services = self._last_failed
+            
+            missing = [name for name in ('cpu', 'memory', 'load_average', 'uptime')
+                       if name not in results]
+            if missing:
+                logger.error(f"Skipping metrics sample; failed to collect: {', '.join(missing)}")
+                return False
+            
+            cpu_usage = results['cpu']
+            memory_data = results['memory']
+            load_data = results['load_average']
+            uptime = results['uptime']
             
             # Create data model objects
             memory = MemoryInfo(
@@ -181,16 +275,6 @@ class AgentService:
                 percentage=memory_data['percentage']
             )
             
-            disk_usage = [
-                DiskUsage(
-                    mountpoint=disk['mountpoint'],
-                    total=disk['total'],
-                    used=disk['used'],
-                    percentage=disk['percentage']
-                )
-                for disk in disk_data
-            ]
-            
             load_average = LoadAverage(
                 one_min=load_data['1min'],
                 five_min=load_data['5min'],
@@ -199,8 +283,8 @@ class AgentService:
             
             # Create complete SystemMetrics object
             metrics = SystemMetrics(
-                server_id=self.config.server_id or self._generate_server_id(),
-                timestamp=datetime.utcnow().isoformat() + "Z",
+                server_id=self._server_id,
+                timestamp=time.strftime(TIMESTAMP_FORMAT, time.gmtime()),
                 cpu_usage=cpu_usage,
                 memory=memory,
                 disk_usage=disk_usage,
@@ -212,23 +296,215 @@ class AgentService:
             logger.debug(f"Collected metrics: CPU={cpu_usage:.1f}%, Memory={memory.percentage:.1f}%, "
                         f"Disks={len(disk_usage)}, Failed Services={len(failed_services)}")
             
-            # Send metrics to server
-            success = self.http_transmitter.send_with_exponential_backoff(
-                metrics, 
-                self.config.api_key
-            )
-            
-            if success:
-                logger.info("Metrics sent successfully")
-            else:
-                logger.error("Failed to send metrics after all retry attempts")
+            if self.config.batch_size > 1:
+                return self._queue_for_batch(metrics)
             
-            return success
+            self._submit_send(metrics)
+            return True
             
         except Exception as e:
             logger.error(f"Error during metrics collection and transmission: {e}")
             return False
 
+    def _run_collectors(self, collectors: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """
+        Run metric collectors concurrently and gather their results.
+        
+        Args:
+            collectors: Mapping of metric name to collector callable
+            
+        Returns:
+            Dict[str, Any]: Results keyed by metric name; collectors that
+            raised are logged and left out
+        """
+        futures = {
+            name: self._collect_pool.submit(collector)
+            for name, collector in collectors.items()
+        }
+        
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to collect {name}: {e}")
+        return results
+
+    def _submit_send(self, metrics: SystemMetrics) -> None:
+        """
+        Start sending a sample on the background event loop.
+        
+        When MAX_QUEUED_SENDS sends are already outstanding, the oldest one
+        is cancelled.
+        
+        Args:
+            metrics: Newly collected sample
+        """
+        self._send_queue = deque(future for future in self._send_queue if not future.done())
+        
+        if len(self._send_queue) >= MAX_QUEUED_SENDS:
+            if self._send_queue.popleft().cancel():
+                logger.warning("Send queue full - dropped oldest outstanding metrics sample")
+        
+        future = self._schedule_send(
+            self.http_transmitter.send_metrics_async(metrics, self.config.api_key)
+        )
+        future.add_done_callback(self._on_send_done)
+
+    def _schedule_send(self, coro) -> Future:
+        """
+        Run a send coroutine on the background event loop, starting it if needed.
+        
+        Args:
+            coro: Send coroutine to run
+            
+        Returns:
+            Future: Future of the send, tracked until shutdown
+        """
+        if self._send_loop is None:
+            self._send_loop = asyncio.new_event_loop()
+            self._send_thread = threading.Thread(
+                target=self._send_loop.run_forever,
+                name="http-send",
+                daemon=True
+            )
+            self._send_thread.start()
+        
+        future = asyncio.run_coroutine_threadsafe(coro, self._send_loop)
+        self._send_queue.append(future)
+        return future
+
+    def _stop_send_loop(self) -> None:
+        """
+        Drain outstanding sends and shut down the background event loop.
+        
+        Sends still running after SEND_DRAIN_TIMEOUT seconds are cancelled.
+        Does nothing if no send was ever made.
+        """
+        if self._send_loop is None:
+            return
+        
+        if self._send_queue:
+            _, not_done = wait(list(self._send_queue), timeout=SEND_DRAIN_TIMEOUT)
+            dropped = sum(1 for future in not_done if future.cancel())
+            if dropped:
+                logger.warning(f"Dropped {dropped} outstanding metrics samples on shutdown")
+            self._send_queue.clear()
+        
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self.http_transmitter.aclose(), self._send_loop
+            ).result(timeout=SEND_DRAIN_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Error closing async HTTP client: {e}")
+        
+        self._send_loop.call_soon_threadsafe(self._send_loop.stop)
+        self._send_thread.join(timeout=SEND_DRAIN_TIMEOUT)
+        if not self._send_thread.is_alive():
+            self._send_loop.close()
+        self._send_loop = None
+
+    def _on_send_done(self, future: Future) -> None:
+        """
+        Log the outcome of a background send.
+        
+        Args:
+            future: Completed send future
+        """
+        if future.cancelled():
+            return
+        
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Error sending metrics: {error}")
+        elif future.result():
+            logger.info("Metrics sent successfully")
+        else:
+            logger.error("Failed to send metrics after all retry attempts")
+
+    def _queue_for_batch(self, metrics: SystemMetrics) -> bool:
+        """
+        Buffer a sample and start sending the batch once it is full or due.
+        
+        Args:
+            metrics: Newly collected sample
+            
+        Returns:
+            bool: True; the outcome of the send is logged by the send worker
+        """
+        with self._pending_lock:
+            self._pending.append(metrics)
+            pending = len(self._pending)
+        
+        batch_full = pending >= self.config.batch_size
+        flush_due = time.monotonic() - self._last_flush >= self.config.flush_interval
+        if not (batch_full or flush_due):
+            logger.debug(f"Buffered metrics sample ({pending}/{self.config.batch_size})")
+            return True
+        
+        self._flush_pending()
+        return True
+
+    def _flush_pending(self, max_attempts: Optional[int] = None) -> None:
+        """
+        Start sending the buffered samples, oldest first, in a single request.
+        
+        At most MAX_BATCH_SAMPLES go in one request; the rest are sent with
+        the next flush. Only one batch is in flight at a time; samples keep
+        buffering while it is. A batch that failed to reach the server is put
+        back so it is retried with the next flush.
+        
+        Args:
+            max_attempts: Override default max retry attempts
+        """
+        if self._batch_future is not None and not self._batch_future.done():
+            logger.debug("Previous metrics batch still in flight; keeping samples buffered")
+            return
+        
+        with self._pending_lock:
+            if not self._pending:
+                return
+            count = min(len(self._pending), MAX_BATCH_SAMPLES)
+            batch = [self._pending.popleft() for _ in range(count)]
+        
+        self._last_flush = time.monotonic()
+        self._batch_future = self._schedule_send(self._send_batch(batch, max_attempts))
+
+    async def _send_batch(self, batch: List[SystemMetrics], max_attempts: Optional[int]) -> bool:
+        """
+        Send a batch on the background event loop and requeue it on failure.
+        
+        A batch the server permanently rejects is dropped, since resending
+        it would only be rejected again.
+        
+        Args:
+            batch: Samples to send in one request
+            max_attempts: Override default max retry attempts
+            
+        Returns:
+            bool: True if the batch was sent
+        """
+        try:
+            sent = await self.http_transmitter.send_metrics_async(
+                batch, self.config.api_key, max_attempts=max_attempts
+            )
+        except MetricsRejectedError as e:
+            logger.error(f"Dropping batch of {len(batch)} metrics samples: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Error sending metrics batch: {e}")
+            sent = False
+        
+        if sent:
+            logger.info(f"Sent batch of {len(batch)} metrics samples")
+            return True
+        
+        logger.error(f"Failed to send batch of {len(batch)} metrics samples; keeping it for retry")
+        # Older samples go back in front; the oldest are dropped beyond batch_max
+        with self._pending_lock:
+            self._pending = deque(batch + list(self._pending), maxlen=self.config.batch_max)
+        return False
+
     def _collection_loop(self) -> None:
         """
         Main collection loop that runs in a background thread.
@@ -238,13 +514,34 @@ class AgentService:
         """
         logger.info("Metrics collection loop started")
         
+        # Schedule against a monotonic deadline so collection time does not
+        # accumulate into the interval
+        deadline = time.monotonic()
+        overrun_cycles = 0
+        
         while self._running and not self._shutdown_event.is_set():
             try:
                 # Collect and send metrics
                 self.collect_and_send_metrics()
                 
-                # Wait for next collection interval or shutdown signal
-                if self._shutdown_event.wait(timeout=self.config.collection_interval):
+                deadline += self.config.collection_interval
+                now = time.monotonic()
+                sleep_for = max(0.0, deadline - now)
+                
+                if sleep_for == 0.0:
+                    overrun_cycles += 1
+                    if overrun_cycles == OVERRUN_WARNING_CYCLES:
+                        logger.warning(
+                            f"Metrics collection exceeded the {self.config.collection_interval}s "
+                            f"interval for {overrun_cycles} consecutive cycles"
+                        )
+                    # Skip missed ticks rather than collecting back-to-back
+                    deadline = now
+                else:
+                    overrun_cycles = 0
+                
+                # Wait for next collection deadline or shutdown signal
+                if self._shutdown_event.wait(timeout=sleep_for):
                     # Shutdown was signaled
                     break
                     
@@ -253,7 +550,9 @@ class AgentService:
                 # Continue running even if individual collection fails
                 
                 # Wait a bit before retrying to avoid tight error loops
-                if self._shutdown_event.wait(timeout=min(30, self.config.collection_interval)):
+                retry_delay = min(30, self.config.collection_interval)
+                deadline = time.monotonic() + retry_delay
+                if self._shutdown_event.wait(timeout=retry_delay):
                     break
         
         logger.info("Metrics collection loop stopped")
@@ -276,6 +575,8 @@ class AgentService:
         """
         Generate a server ID if not configured.
         
+        Only called during initialization; the result is cached in _server_id.
+        
         Returns:
             str: Generated server ID based on hostname
         """
@@ -298,7 +599,8 @@ class AgentService:
         signal_name = signal_names.get(signum, f"Signal {signum}")
         
         logger.info(f"Received {signal_name}, initiating graceful shutdown...")
-        self.stop()
+        # Only signal here; run() performs the actual shutdown via stop()
+        self._shutdown_event.set()
 
     def get_status(self) -> dict:
         """
@@ -309,7 +611,7 @@ class AgentService:
         """
         return {
             "running": self._running,
-            "server_id": self.config.server_id or self._generate_server_id(),
+            "server_id": self._server_id,
             "server_url": self.config.server_url,
             "collection_interval": self.config.collection_interval,
             "retry_attempts": self.config.retry_attempts,
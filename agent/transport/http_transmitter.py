@@ -5,14 +5,36 @@ This module implements the HTTPTransmitter class that handles:
 - Secure HTTP communication with API key authentication
 - Exponential backoff retry mechanism for network failures
 - JSON serialization of metrics data
+- A persistent, pooled connection (HTTP/2 when the ``h2`` package is installed)
+- zstd or gzip compression of larger request bodies
+- Non-blocking sends with asyncio-based backoff via send_metrics_async
 """
 
+import asyncio
+import gzip
+import importlib.util
 import time
+import json
 import logging
-from typing import Optional
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from dataclasses import asdict
+
+# httpx is imported inside the methods that use it so that importing this
+# module stays cheap until a transmitter is actually created
+if TYPE_CHECKING:
+    import httpx
+
+# orjson is optional; it serializes dataclasses natively and much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# zstandard is optional; without it larger bodies are gzip-compressed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 from shared.interfaces import HTTPTransmitterInterface
 from shared.models import SystemMetrics
@@ -20,6 +42,42 @@ from shared.models import SystemMetrics
 
 logger = logging.getLogger(__name__)
 
+# httpx only negotiates HTTP/2 when the optional h2 package is importable
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Request bodies larger than this many bytes are compressed before sending
+COMPRESS_MIN_SIZE = 512
+
+# Most samples the server's batch endpoint accepts in one request
+MAX_BATCH_SAMPLES = 1000
+
+# 4xx statuses that may succeed on a later attempt; any other 4xx means the
+# server will keep rejecting the same payload
+RETRYABLE_CLIENT_STATUSES = (408, 429)
+
+
+class MetricsRejectedError(Exception):
+    """Raised when the server permanently rejects a metrics payload."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Server rejected metrics with status {status_code}")
+        self.status_code = status_code
+
+
+def _dumps_json(obj) -> bytes:
+    """
+    Serialize metrics (or a structure containing them) to compact JSON.
+    
+    Args:
+        obj: Dataclass instance, or dict/list containing them
+        
+    Returns:
+        bytes: UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=asdict, separators=(',', ':')).encode('utf-8')
+
 
 class HTTPTransmitter(HTTPTransmitterInterface):
     """
@@ -38,7 +96,8 @@ class HTTPTransmitter(HTTPTransmitterInterface):
         timeout: int = 30,
         max_retries: int = 3,
         backoff_factor: float = 2.0,
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        keepalive_expiry: float = 120.0
     ):
         """
         Initialize HTTP transmitter.
@@ -49,95 +108,375 @@ class HTTPTransmitter(HTTPTransmitterInterface):
             max_retries: Maximum number of retry attempts
             backoff_factor: Exponential backoff multiplier
             verify_ssl: Whether to verify SSL certificates
+            keepalive_expiry: Seconds an idle pooled connection is kept open;
+                should exceed the collection interval so each cycle reuses it
         """
         self.server_url = server_url.rstrip('/')
+        
+        # Endpoint URLs are fixed for the transmitter's lifetime
+        self._metrics_url = f"{self.server_url}/api/v1/metrics"
+        self._batch_url = f"{self.server_url}/api/v1/metrics/batch"
+        self._health_url = f"{self.server_url}/api/v1/health"
+        
+        # Authentication headers for the key registered via set_api_key
+        self._api_key: Optional[str] = None
+        self._auth_headers: Dict[str, str] = {}
         self.timeout = timeout
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
         self.verify_ssl = verify_ssl
         
-        # Create session with retry strategy
-        self.session = requests.Session()
+        import httpx
         
-        # Configure retry strategy for connection errors, timeouts, and 5xx errors
-        retry_strategy = Retry(
-            total=max_retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["POST", "GET"]
+        # One long-lived client keeps its connection open across collection
+        # cycles (httpx would otherwise drop it after 5 idle seconds). The
+        # transport retries failed connection attempts; status based retries
+        # are handled by send_with_exponential_backoff.
+        self._limits = httpx.Limits(
+            max_connections=4,
+            max_keepalive_connections=1,
+            keepalive_expiry=keepalive_expiry
+        )
+        transport = httpx.HTTPTransport(
+            verify=verify_ssl,
+            http2=HTTP2_AVAILABLE,
+            retries=max_retries,
+            limits=self._limits
+        )
+        self.client = httpx.Client(
+            transport=transport,
+            timeout=timeout,
+            headers={
+                'Content-Type': 'application/json',
+                'User-Agent': 'LinuxServerMonitor-Agent/1.0'
+            }
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # Created on first use by send_metrics_async, on the caller's event loop
+        self._async_client: Optional["httpx.AsyncClient"] = None
         
-        # Set default headers
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'LinuxServerMonitor-Agent/1.0'
-        })
+        # Dropped in favour of gzip if the server refuses zstd bodies
+        self._zstd = zstandard.ZstdCompressor(level=3) if zstandard is not None else None
 
-    def send_metrics(self, data: SystemMetrics, api_key: str) -> bool:
+    def set_api_key(self, api_key: str) -> None:
+        """
+        Precompute the authentication headers for the agent's API key.
+        
+        Calls made with this key reuse the cached headers; other keys still
+        work but have their headers built per request.
+        
+        Args:
+            api_key: API key for authentication
+        """
+        self._api_key = api_key
+        self._auth_headers = self._build_auth_headers(api_key)
+
+    def send_metrics(self, data: Union[SystemMetrics, List[SystemMetrics]], api_key: str) -> bool:
         """
         Send metrics to central server with authentication.
         
+        A list of samples is posted in one request to the batch endpoint as
+        ``{"metrics": [...]}``.
+        
         Args:
-            data: SystemMetrics object to send
+            data: SystemMetrics object, or list of them, to send
             api_key: API key for authentication
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            # Prepare headers with API key
-            headers = {
-                'Authorization': f'Bearer {api_key}',
-                'X-API-Key': api_key  # Alternative header format
-            }
+            body = self._encode_metrics(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to serialize metrics: {e}")
+            return False
+        
+        return self.send_metrics_bytes(body, api_key, batch=isinstance(data, list))
+
+    def send_metrics_bytes(self, body: bytes, api_key: str, batch: bool = False) -> bool:
+        """
+        Send an already serialized metrics payload to the central server.
+        
+        Args:
+            body: JSON encoded sample, or ``{"metrics": [...]}`` batch
+            api_key: API key for authentication
+            batch: Whether body is a batch payload
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            url, payload, headers, encoding = self._prepare_metrics_request(body, api_key, batch)
+            
+            logger.debug(f"Sending metrics to {url}")
+            
+            response = self.client.post(
+                url,
+                content=payload,
+                headers=headers,
+                timeout=self.timeout
+            )
             
-            # Serialize metrics to JSON
-            json_data = data.to_json()
+            result = self._check_metrics_response(response, encoding)
+            if result is None:
+                return self.send_metrics_bytes(body, api_key, batch=batch)
+            return result
+                
+        except MetricsRejectedError:
+            return False
+        except Exception as e:
+            self._log_send_error(e)
+            return False
+
+    async def send_metrics_bytes_async(self, body: bytes, api_key: str, batch: bool = False) -> bool:
+        """
+        Asynchronously send an already serialized metrics payload.
+        
+        Args:
+            body: JSON encoded sample, or ``{"metrics": [...]}`` batch
+            api_key: API key for authentication
+            batch: Whether body is a batch payload
             
-            # Send POST request to metrics endpoint
-            url = f"{self.server_url}/api/v1/metrics"
+        Returns:
+            bool: True if successful, False otherwise
+            
+        Raises:
+            MetricsRejectedError: If the server permanently rejected the payload
+        """
+        try:
+            url, payload, headers, encoding = self._prepare_metrics_request(body, api_key, batch)
             
             logger.debug(f"Sending metrics to {url}")
             
-            response = self.session.post(
+            response = await self._get_async_client().post(
                 url,
-                data=json_data,
+                content=payload,
                 headers=headers,
-                timeout=self.timeout,
-                verify=self.verify_ssl
+                timeout=self.timeout
             )
             
-            # Check response status
-            if response.status_code == 200:
-                logger.info("Metrics sent successfully")
-                return True
-            elif response.status_code == 401:
-                logger.error("Authentication failed - invalid API key")
-                return False
-            elif response.status_code == 429:
-                logger.warning("Rate limit exceeded")
-                return False
-            else:
-                logger.error(f"Server returned status {response.status_code}: {response.text}")
-                return False
+            result = self._check_metrics_response(response, encoding)
+            if result is None:
+                return await self.send_metrics_bytes_async(body, api_key, batch=batch)
+            return result
                 
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Connection error: {e}")
+        except MetricsRejectedError:
+            raise
+        except Exception as e:
+            self._log_send_error(e)
             return False
-        except requests.exceptions.Timeout as e:
-            logger.error(f"Request timeout: {e}")
+
+    async def send_metrics_async(
+        self,
+        data: Union[SystemMetrics, List[SystemMetrics]],
+        api_key: str,
+        max_attempts: Optional[int] = None
+    ) -> bool:
+        """
+        Send metrics with exponential backoff without blocking a thread.
+        
+        Behaves like send_with_exponential_backoff, but waits between attempts
+        with asyncio.sleep so one event loop can carry many retrying sends.
+        A payload the server permanently rejects is not retried.
+        
+        Args:
+            data: SystemMetrics object, or list of them, to send
+            api_key: API key for authentication
+            max_attempts: Override default max retry attempts
+            
+        Returns:
+            bool: True if successful, False if all attempts failed
+            
+        Raises:
+            MetricsRejectedError: If the server rejected the payload with a
+                4xx status other than 408 or 429
+        """
+        attempts = max_attempts or self.max_retries
+        
+        try:
+            body = self._encode_metrics(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to serialize metrics: {e}")
             return False
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
+        batch = isinstance(data, list)
+        
+        for attempt in range(attempts):
+            if await self.send_metrics_bytes_async(body, api_key, batch=batch):
+                return True
+            
+            if attempt < attempts - 1:  # Don't sleep after last attempt
+                delay = self.backoff_factor ** attempt
+                logger.info(f"Attempt {attempt + 1} failed, retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+            else:
+                logger.error(f"All {attempts} attempts failed")
+        
+        return False
+
+    def _prepare_metrics_request(
+        self, body: bytes, api_key: str, batch: bool
+    ) -> Tuple[str, bytes, Dict[str, str], Optional[str]]:
+        """
+        Build the URL, compressed payload and headers for a metrics POST.
+        
+        Args:
+            body: Uncompressed JSON request body
+            api_key: API key for authentication
+            batch: Whether body is a batch payload
+            
+        Returns:
+            Tuple of URL, payload, headers and content encoding (or None)
+        """
+        headers = self._get_auth_headers(api_key)
+        url = self._batch_url if batch else self._metrics_url
+        
+        payload, encoding = self._compress(body)
+        if encoding:
+            # Copy so the cached authentication headers stay untouched
+            headers = {**headers, 'Content-Encoding': encoding}
+        
+        return url, payload, headers, encoding
+
+    def _get_auth_headers(self, api_key: str) -> Dict[str, str]:
+        """
+        Return authentication headers, using the cached set when possible.
+        
+        Args:
+            api_key: API key for authentication
+            
+        Returns:
+            Dict[str, str]: Headers to send with the request
+        """
+        if api_key == self._api_key:
+            return self._auth_headers
+        return self._build_auth_headers(api_key)
+
+    @staticmethod
+    def _build_auth_headers(api_key: str) -> Dict[str, str]:
+        """
+        Build the authentication headers for an API key.
+        
+        Args:
+            api_key: API key for authentication
+            
+        Returns:
+            Dict[str, str]: Authorization and X-API-Key headers
+        """
+        return {
+            'Authorization': f'Bearer {api_key}',
+            'X-API-Key': api_key  # Alternative header format
+        }
+
+    def _check_metrics_response(self, response, encoding: Optional[str]) -> Optional[bool]:
+        """
+        Interpret the server's response to a metrics POST.
+        
+        Args:
+            response: httpx response
+            encoding: Content encoding the body was sent with
+            
+        Returns:
+            Optional[bool]: True on success, False on failure, or None if the
+            server refused zstd and the body should be resent with gzip
+            
+        Raises:
+            MetricsRejectedError: On a 4xx status other than 408 or 429
+        """
+        if response.status_code == 415 and encoding == 'zstd':
+            logger.warning("Server does not accept zstd request bodies - switching to gzip")
+            self._zstd = None
+            return None
+        elif response.status_code in (200, 201):
+            logger.info("Metrics sent successfully")
+            return True
+        elif response.status_code == 401:
+            logger.error("Authentication failed - invalid API key")
+            raise MetricsRejectedError(response.status_code)
+        elif response.status_code == 429:
+            logger.warning("Rate limit exceeded")
             return False
-        except Exception as e:
-            logger.error(f"Unexpected error sending metrics: {e}")
+        else:
+            logger.error(f"Server returned status {response.status_code}: {response.text}")
+            if (400 <= response.status_code < 500
+                    and response.status_code not in RETRYABLE_CLIENT_STATUSES):
+                raise MetricsRejectedError(response.status_code)
             return False
 
+    def _log_send_error(self, error: Exception) -> None:
+        """
+        Log an exception raised while sending metrics.
+        
+        Args:
+            error: The exception raised by the HTTP client
+        """
+        import httpx
+        
+        if isinstance(error, httpx.ConnectError):
+            logger.error(f"Connection error: {error}")
+        elif isinstance(error, httpx.TimeoutException):
+            logger.error(f"Request timeout: {error}")
+        elif isinstance(error, httpx.HTTPError):
+            logger.error(f"Request failed: {error}")
+        else:
+            logger.error(f"Unexpected error sending metrics: {error}")
+
+    def _get_async_client(self) -> "httpx.AsyncClient":
+        """
+        Return the async client, creating it on first use.
+        
+        The client is created lazily so it belongs to the event loop that
+        drives send_metrics_async.
+        
+        Returns:
+            httpx.AsyncClient: Shared async client
+        """
+        if self._async_client is None:
+            import httpx
+            
+            transport = httpx.AsyncHTTPTransport(
+                verify=self.verify_ssl,
+                http2=HTTP2_AVAILABLE,
+                retries=self.max_retries,
+                limits=self._limits
+            )
+            self._async_client = httpx.AsyncClient(
+                transport=transport,
+                timeout=self.timeout,
+                headers=self.client.headers
+            )
+        return self._async_client
+
+    def _compress(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        """
+        Compress a request body if it is large enough to benefit.
+        
+        Args:
+            body: Uncompressed request body
+            
+        Returns:
+            Tuple[bytes, Optional[str]]: Body to send and its content encoding,
+            or None if it was left uncompressed
+        """
+        if len(body) <= COMPRESS_MIN_SIZE:
+            return body, None
+        if self._zstd is not None:
+            return self._zstd.compress(body), 'zstd'
+        return gzip.compress(body, compresslevel=6), 'gzip'
+
+    def _encode_metrics(self, data: Union[SystemMetrics, List[SystemMetrics]]) -> bytes:
+        """
+        Serialize a sample, or a list of samples as a batch payload.
+        
+        Args:
+            data: SystemMetrics object, or list of them
+            
+        Returns:
+            bytes: JSON request body
+        """
+        if isinstance(data, list):
+            return _dumps_json({'metrics': data})
+        return _dumps_json(data)
+
     def authenticate(self, api_key: str) -> bool:
         """
         Test authentication with the central server.
@@ -148,23 +487,20 @@ class HTTPTransmitter(HTTPTransmitterInterface):
         Returns:
             bool: True if authentication successful, False otherwise
         """
+        import httpx
+        
         try:
-            # Prepare headers with API key
-            headers = {
-                'Authorization': f'Bearer {api_key}',
-                'X-API-Key': api_key
-            }
+            headers = self._get_auth_headers(api_key)
             
             # Send GET request to health endpoint for authentication test
-            url = f"{self.server_url}/api/v1/health"
+            url = self._health_url
             
             logger.debug(f"Testing authentication with {url}")
             
-            response = self.session.get(
+            response = self.client.get(
                 url,
                 headers=headers,
-                timeout=self.timeout,
-                verify=self.verify_ssl
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -177,7 +513,7 @@ class HTTPTransmitter(HTTPTransmitterInterface):
                 logger.warning(f"Unexpected response during authentication: {response.status_code}")
                 return False
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Authentication request failed: {e}")
             return False
         except Exception as e:
@@ -186,7 +522,7 @@ class HTTPTransmitter(HTTPTransmitterInterface):
 
     def send_with_exponential_backoff(
         self, 
-        data: SystemMetrics, 
+        data: Union[SystemMetrics, List[SystemMetrics]], 
         api_key: str,
         max_attempts: Optional[int] = None
     ) -> bool:
@@ -197,7 +533,7 @@ class HTTPTransmitter(HTTPTransmitterInterface):
         the built-in retry mechanism is not sufficient.
         
         Args:
-            data: SystemMetrics object to send
+            data: SystemMetrics object, or list of them, to send
             api_key: API key for authentication
             max_attempts: Override default max retry attempts
             
@@ -206,8 +542,16 @@ class HTTPTransmitter(HTTPTransmitterInterface):
         """
         attempts = max_attempts or self.max_retries
         
+        # Serialize once; every retry sends the same bytes
+        try:
+            body = self._encode_metrics(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to serialize metrics: {e}")
+            return False
+        batch = isinstance(data, list)
+        
         for attempt in range(attempts):
-            success = self.send_metrics(data, api_key)
+            success = self.send_metrics_bytes(body, api_key, batch=batch)
             
             if success:
                 return True
@@ -233,6 +577,8 @@ class HTTPTransmitter(HTTPTransmitterInterface):
         Returns:
             str: API key if registration successful, None otherwise
         """
+        import httpx
+        
         try:
             registration_data = {
                 'server_id': server_id,
@@ -243,11 +589,10 @@ class HTTPTransmitter(HTTPTransmitterInterface):
             
             logger.info(f"Registering agent with server ID: {server_id}")
             
-            response = self.session.post(
+            response = self.client.post(
                 url,
                 json=registration_data,
-                timeout=self.timeout,
-                verify=self.verify_ssl
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -263,15 +608,27 @@ class HTTPTransmitter(HTTPTransmitterInterface):
                 logger.error(f"Registration failed with status {response.status_code}: {response.text}")
                 return None
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Registration request failed: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error during registration: {e}")
             return None
 
+    async def aclose(self):
+        """Close the async HTTP client, if one was created."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            logger.debug("Async HTTP client closed")
+
     def close(self):
-        """Close the HTTP session and clean up resources."""
-        if self.session:
-            self.session.close()
-            logger.debug("HTTP session closed")
\ No newline at end of file
+        """
+        Close the HTTP client and its pooled connections.
+        
+        The async client must be closed separately with aclose() on its own
+        event loop.
+        """
+        if self.client:
+            self.client.close()
+            logger.debug("HTTP client closed")
\ No newline at end of file
@@ -23,6 +23,24 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agent import AgentService
 
+# Environment variables the example needs before it can start
+REQUIRED_VARS = ('MONITORING_API_KEY', 'MONITORING_SERVER_URL')
+
+
+def _read_required_env():
+    """Read the required environment variables."""
+    return {var: os.environ.get(var) for var in REQUIRED_VARS}
+
+
+# Resolved once at import; call reset_env_cache() after changing the environment
+_REQUIRED_ENV = _read_required_env()
+
+
+def reset_env_cache():
+    """Re-read the required environment variables, e.g. between tests."""
+    global _REQUIRED_ENV
+    _REQUIRED_ENV = _read_required_env()
+
 
 def main():
     """Main function to demonstrate AgentService usage."""
@@ -36,11 +54,10 @@ def main():
     logger = logging.getLogger(__name__)
     
     # Check required environment variables
-    required_vars = ['MONITORING_API_KEY', 'MONITORING_SERVER_URL']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    missing_vars = [var for var, value in _REQUIRED_ENV.items() if not value]
     
     if missing_vars:
-        logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
+        logger.error("Missing required environment variables: %s", ', '.join(missing_vars))
         logger.info("Please set the following environment variables:")
         logger.info("  export MONITORING_API_KEY='your-api-key'")
         logger.info("  export MONITORING_SERVER_URL='https://your-server.com'")
@@ -53,12 +70,16 @@ def main():
         
         # Display configuration
         status = service.get_status()
-        logger.info(f"Agent Configuration:")
-        logger.info(f"  Server ID: {status['server_id']}")
-        logger.info(f"  Server URL: {status['server_url']}")
-        logger.info(f"  Collection Interval: {status['collection_interval']} seconds")
-        logger.info(f"  Retry Attempts: {status['retry_attempts']}")
-        logger.info(f"  Log Level: {status['log_level']}")
+        # One log record for the whole dump, formatted only when INFO is enabled
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("\n".join([
+                "Agent Configuration:",
+                f"  Server ID: {status['server_id']}",
+                f"  Server URL: {status['server_url']}",
+                f"  Collection Interval: {status['collection_interval']} seconds",
+                f"  Retry Attempts: {status['retry_attempts']}",
+                f"  Log Level: {status['log_level']}",
+            ]))
         
         # Test single metrics collection
         logger.info("Testing single metrics collection...")
@@ -78,7 +99,7 @@ def main():
     except KeyboardInterrupt:
         logger.info("Received interrupt signal, shutting down...")
     except Exception as e:
-        logger.error(f"Error running agent service: {e}")
+        logger.error("Error running agent service: %s", e)
         sys.exit(1)
     
     logger.info("Agent service stopped")
@@ -15,15 +15,24 @@ import os
 import sys
 import logging
 from datetime import datetime, timedelta
-from unittest.mock import Mock
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from server.alerts.engine import AlertEngine
+from server.alerts.engine import AlertEngine, wait_for_pending_webhooks
 from shared.models import SystemMetrics, MemoryInfo, DiskUsage, LoadAverage, FailedService
 
 
+# Parts of the sample metrics that never vary; shared by every sample
+SAMPLE_MEMORY = MemoryInfo(total=8000000000, used=4000000000, percentage=50.0)
+SAMPLE_LOAD_AVERAGE = LoadAverage(one_min=1.0, five_min=1.1, fifteen_min=0.9)
+SAMPLE_FAILED_SERVICES = [
+    FailedService(name="nginx", status="failed", since="2024-12-15T10:00:00Z")
+]
+
+
 def setup_logging():
     """Set up logging configuration."""
     logging.basicConfig(
@@ -52,13 +61,11 @@ def create_sample_metrics(server_id: str, cpu_usage: float = 50.0,
         server_id=server_id,
         timestamp=datetime.utcnow().isoformat(),
         cpu_usage=cpu_usage,
-        memory=MemoryInfo(total=8000000000, used=4000000000, percentage=50.0),
+        memory=SAMPLE_MEMORY,
         disk_usage=disk_usage,
-        load_average=LoadAverage(one_min=1.0, five_min=1.1, fifteen_min=0.9),
+        load_average=SAMPLE_LOAD_AVERAGE,
         uptime=86400,
-        failed_services=[
-            FailedService(name="nginx", status="failed", since="2024-12-15T10:00:00Z")
-        ]
+        failed_services=SAMPLE_FAILED_SERVICES
     )
 
 
@@ -82,6 +89,10 @@ def demo_alert_engine():
         webhook_urls=webhook_urls
     )
     
+    # The webhook URLs above are placeholders, so answer deliveries locally
+    webhook_patch = patch('requests.Session.post', return_value=SimpleNamespace(status_code=200))
+    webhook_patch.start()
+    
     # Display configuration
     stats = alert_engine.get_alert_statistics()
     logger.info(f"AlertEngine Configuration:")
@@ -107,12 +118,11 @@ def demo_alert_engine():
     high_cpu_metrics = create_sample_metrics("server-002", cpu_usage=95.0, disk_percentages=[30.0, 50.0])
     
     # Mock alert creation
-    mock_cpu_alert = Mock()
-    mock_cpu_alert.id = 1
-    mock_cpu_alert.server_id = "server-002"
-    mock_cpu_alert.alert_type = "cpu"
-    mock_cpu_alert.severity = "critical"
-    mock_cpu_alert.message = "High CPU usage on server-002: 95.0%"
+    mock_cpu_alert = SimpleNamespace(
+        id=1, server_id="server-002", alert_type="cpu", mountpoint=None, severity="critical",
+        message="High CPU usage on server-002: 95.0%",
+        threshold_value=90.0, actual_value=95.0, triggered_at=datetime.utcnow()
+    )
     AlertOperations.create_alert = Mock(return_value=mock_cpu_alert)
     
     alerts = alert_engine.evaluate_metrics(high_cpu_metrics)
@@ -123,12 +133,11 @@ def demo_alert_engine():
     high_disk_metrics = create_sample_metrics("server-003", cpu_usage=45.0, disk_percentages=[85.0, 30.0])
     
     # Mock alert creation
-    mock_disk_alert = Mock()
-    mock_disk_alert.id = 2
-    mock_disk_alert.server_id = "server-003"
-    mock_disk_alert.alert_type = "disk"
-    mock_disk_alert.severity = "warning"
-    mock_disk_alert.message = "High disk usage on server-003: 85.0% (/disk0)"
+    mock_disk_alert = SimpleNamespace(
+        id=2, server_id="server-003", alert_type="disk", mountpoint="/disk0", severity="warning",
+        message="High disk usage on server-003: 85.0% (/disk0)",
+        threshold_value=80.0, actual_value=85.0, triggered_at=datetime.utcnow()
+    )
     AlertOperations.create_alert = Mock(return_value=mock_disk_alert)
     
     alerts = alert_engine.evaluate_metrics(high_disk_metrics)
@@ -140,23 +149,19 @@ def demo_alert_engine():
     # Mock server operations
     from server.database.operations import ServerOperations, HealthStatusOperations
     
-    # Create a mock offline server
-    mock_offline_server = Mock()
-    mock_offline_server.server_id = "server-offline"
-    mock_offline_server.last_seen = datetime.utcnow() - timedelta(seconds=600)  # 10 minutes ago
-    
-    ServerOperations.get_all_servers = Mock(return_value=[mock_offline_server])
-    AlertOperations.get_active_alerts = Mock(return_value=[])  # No existing alerts
-    HealthStatusOperations.update_health_status = Mock()
+    # Mock an offline server without an active offline alert
+    ServerOperations.get_servers_missing_offline_alert = Mock(return_value=[
+        ("server-offline", datetime.utcnow() - timedelta(seconds=600))  # 10 minutes ago
+    ])
+    HealthStatusOperations.mark_servers_offline = Mock()
     
     # Mock offline alert creation
-    mock_offline_alert = Mock()
-    mock_offline_alert.id = 3
-    mock_offline_alert.server_id = "server-offline"
-    mock_offline_alert.alert_type = "offline"
-    mock_offline_alert.severity = "critical"
-    mock_offline_alert.message = "Server server-offline has been offline for 10 minutes"
-    AlertOperations.create_alert = Mock(return_value=mock_offline_alert)
+    mock_offline_alert = SimpleNamespace(
+        id=3, server_id="server-offline", alert_type="offline", mountpoint=None, severity="critical",
+        message="Server server-offline has been offline for 10 minutes",
+        threshold_value=300.0, actual_value=600.0, triggered_at=datetime.utcnow()
+    )
+    AlertOperations.create_alerts_batch = Mock(return_value=[mock_offline_alert])
     
     offline_alerts = alert_engine.check_offline_servers()
     logger.info(f"Offline server check: {len(offline_alerts)} alerts triggered")
@@ -165,42 +170,39 @@ def demo_alert_engine():
     logger.info("\n=== Test 5: Webhook Notification ===")
     
     # Mock requests.post for webhook testing
-    import requests
-    from unittest.mock import patch
-    
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_post.return_value = mock_response
         
         # Mock webhook status update
-        AlertOperations.update_webhook_status = Mock()
+        AlertOperations.update_webhook_status_batch = Mock()
         
-        # Test webhook sending
-        test_payload = {"test": "webhook", "alert_id": 123}
-        success = alert_engine._send_webhook("https://example.com/webhook", test_payload, 123)
+        # Test webhook sending; every URL gets one request for the batch
+        configured_urls = alert_engine.webhook_urls
+        alert_engine.webhook_urls = ["https://example.com/webhook"]
+        test_payload = {"alerts": [{"alert_id": 123}], "batch_id": "example"}
+        alert_engine._send_webhook_notifications(mock_session, [123], test_payload)
+        alert_engine.webhook_urls = configured_urls
         
+        status_calls = AlertOperations.update_webhook_status_batch.call_args_list
+        success = bool(status_calls) and status_calls[-1][1]["response_code"] == 200
         logger.info(f"Webhook notification test: {'Success' if success else 'Failed'}")
         logger.info(f"Webhook calls made: {mock_post.call_count}")
     
     # Test 6: Alert resolution
     logger.info("\n=== Test 6: Alert Resolution ===")
     
-    # Mock active alerts
-    mock_active_alert1 = Mock()
-    mock_active_alert1.id = 1
-    mock_active_alert1.alert_type = "cpu"
-    
-    mock_active_alert2 = Mock()
-    mock_active_alert2.id = 2
-    mock_active_alert2.alert_type = "disk"
-    
-    AlertOperations.get_active_alerts = Mock(return_value=[mock_active_alert1, mock_active_alert2])
-    AlertOperations.resolve_alert = Mock(return_value=True)
+    # Mock the bulk update resolving the active CPU alert
+    AlertOperations.resolve_alerts_bulk = Mock(return_value=[1])
     
     resolved_count = alert_engine.resolve_alerts_for_server("server-002", ["cpu"])
     logger.info(f"Alert resolution test: {resolved_count} alerts resolved")
     
+    # Webhooks are delivered in the background; let them finish while mocked
+    wait_for_pending_webhooks()
+    webhook_patch.stop()
+    
     logger.info("\n=== AlertEngine Demo Complete ===")
     logger.info("The AlertEngine is ready for integration with the monitoring system!")
 
@@ -11,10 +11,35 @@ This script shows how to:
 Run this script after setting up the database and starting the server.
 """
 
-import requests
+import importlib.util
 import json
 from datetime import datetime
 
+import httpx
+
+# orjson is optional; it parses and pretty-prints responses faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# httpx only negotiates HTTP/2 when the optional h2 package is importable
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _loads(content: bytes):
+    """Parse a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _format_json(data) -> str:
+    """Pretty-print parsed JSON with two-space indentation."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
 
 def main():
     """Demonstrate API usage."""
@@ -23,13 +48,27 @@ def main():
     print("Linux Server Health Monitoring API Usage Example")
     print("=" * 50)
     
+    # One client so all requests share a single pooled connection
+    with httpx.Client(base_url=base_url, http2=HTTP2_AVAILABLE, timeout=10) as client:
+        run_examples(client)
+    
+    print("\n" + "=" * 50)
+    print("Example completed!")
+    print("\nTo start the server, run:")
+    print("  python server/main.py")
+    print("\nOr with uvicorn:")
+    print("  uvicorn server.main:app --host 0.0.0.0 --port 8000")
+
+
+def run_examples(client: httpx.Client):
+    """Run the health, registration and metrics requests against the server."""
     # 1. Check server health
     print("\n1. Checking server health...")
     try:
-        response = requests.get(f"{base_url}/api/v1/health")
+        response = client.get("/api/v1/health")
         print(f"Status: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except requests.exceptions.ConnectionError:
+        print(f"Response: {_format_json(_loads(response.content))}")
+    except httpx.ConnectError:
         print("Error: Could not connect to server. Make sure the server is running.")
         return
     
@@ -42,11 +81,11 @@ def main():
     }
     
     try:
-        response = requests.post(f"{base_url}/api/v1/register", json=registration_data)
+        response = client.post("/api/v1/register", json=registration_data)
         print(f"Status: {response.status_code}")
         if response.status_code == 201:
-            registration_result = response.json()
-            print(f"Response: {json.dumps(registration_result, indent=2)}")
+            registration_result = _loads(response.content)
+            print(f"Response: {_format_json(registration_result)}")
             api_key = registration_result.get("api_key")
             
             # 3. Submit metrics using the API key
@@ -85,23 +124,16 @@ def main():
                 }
                 
                 headers = {"Authorization": f"Bearer {api_key}"}
-                response = requests.post(f"{base_url}/api/v1/metrics", 
-                                       json=metrics_data, 
+                response = client.post("/api/v1/metrics",
+                                       json=metrics_data,
                                        headers=headers)
                 print(f"Status: {response.status_code}")
-                print(f"Response: {json.dumps(response.json(), indent=2)}")
+                print(f"Response: {_format_json(_loads(response.content))}")
         else:
             print(f"Registration failed: {response.text}")
     
     except Exception as e:
         print(f"Error: {e}")
-    
-    print("\n" + "=" * 50)
-    print("Example completed!")
-    print("\nTo start the server, run:")
-    print("  python server/main.py")
-    print("\nOr with uvicorn:")
-    print("  uvicorn server.main:app --host 0.0.0.0 --port 8000")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+"""Add mountpoint column to alerts
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-12-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Store the mountpoint of disk alerts in its own column."""
+    op.add_column('alerts', sa.Column('mountpoint', sa.String(length=255), nullable=True))
+
+    # Disk alert messages end with "(<mountpoint>)"; copy it out for existing rows
+    op.execute(
+        "UPDATE alerts SET mountpoint = substring(message from '\\(([^()]*)\\)$') "
+        "WHERE alert_type = 'disk'"
+    )
+
+
+def downgrade():
+    """Remove the alerts mountpoint column."""
+    op.drop_column('alerts', 'mountpoint')
@@ -0,0 +1,31 @@
+"""Key the active alerts index by the deduplication key
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-12-20 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace idx_alerts_resolved with a partial index on (server_id, alert_type, mountpoint)."""
+    op.drop_index('idx_alerts_resolved', table_name='alerts')
+    # Alert evaluation dedups on (server_id, alert_type, mountpoint) among active alerts
+    op.create_index('idx_alerts_active_dedup', 'alerts',
+                    ['server_id', 'alert_type', 'mountpoint'], unique=False,
+                    postgresql_where=sa.text('is_resolved = false'),
+                    postgresql_include=['triggered_at', 'severity'])
+
+
+def downgrade():
+    """Restore the is_resolved index."""
+    op.drop_index('idx_alerts_active_dedup', table_name='alerts')
+    op.create_index('idx_alerts_resolved', 'alerts', ['is_resolved'], unique=False)
@@ -0,0 +1,27 @@
+"""Index active API keys by server
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-12-20 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add a partial index on api_keys.server_id for active keys."""
+    # Server management lists every server with its active key in one outer join
+    op.create_index('idx_api_keys_server_active', 'api_keys', ['server_id'], unique=False,
+                    postgresql_where=sa.text('is_active = true'))
+
+
+def downgrade():
+    """Remove the active API keys index."""
+    op.drop_index('idx_api_keys_server_active', table_name='api_keys')
@@ -0,0 +1,127 @@
+"""Partition the metrics table by month on timestamp
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-12-21 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+# Number of monthly metrics partitions created ahead of the current month;
+# the server tops this up at startup and daily (see server.main)
+METRICS_PARTITIONS_AHEAD = 3
+
+# Creates the metrics_YYYY_MM partition for one month. Rows that already
+# landed in the default partition for that month are moved into it first,
+# since attaching a range the default partition holds rows for would fail.
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_metrics_partition(month_start date)
+RETURNS void AS $$
+DECLARE
+    partition_name text := 'metrics_' || to_char(month_start, 'YYYY_MM');
+    month_end date := (month_start + interval '1 month')::date;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE metrics INCLUDING DEFAULTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM metrics_default '
+        || 'WHERE "timestamp" >= %L AND "timestamp" < %L RETURNING *) '
+        || 'INSERT INTO %I SELECT * FROM moved',
+        month_start, month_end, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE metrics ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_end
+    );
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Creates partitions from the current month up to months_ahead months out.
+# Idempotent; the advisory lock serializes concurrent callers (server workers)
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_metrics_partitions(months_ahead integer)
+RETURNS void AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_metrics_partitions'));
+    FOR i IN 0..months_ahead LOOP
+        PERFORM create_metrics_partition(
+            (date_trunc('month', now()) + make_interval(months => i))::date
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade():
+    """Move metrics into a RANGE (timestamp) partitioned table with monthly partitions."""
+    # Set the existing table aside; index and key names are reused below
+    op.drop_index('idx_metrics_server_timestamp', table_name='metrics')
+    op.drop_index('idx_metrics_timestamp', table_name='metrics')
+    op.execute("ALTER TABLE metrics RENAME TO metrics_unpartitioned")
+    op.execute("ALTER TABLE metrics_unpartitioned RENAME CONSTRAINT metrics_pkey TO metrics_unpartitioned_pkey")
+
+    # Same columns and id sequence; the partition key must be part of the primary key
+    op.execute(
+        "CREATE TABLE metrics ("
+        "LIKE metrics_unpartitioned INCLUDING DEFAULTS, "
+        "PRIMARY KEY (id, timestamp), "
+        "FOREIGN KEY (server_id) REFERENCES servers (server_id)"
+        ") PARTITION BY RANGE (timestamp)"
+    )
+    op.execute("ALTER SEQUENCE metrics_id_seq OWNED BY metrics.id")
+
+    op.execute(CREATE_PARTITION_FUNCTION)
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    # Catches timestamps beyond the created partitions
+    op.execute("CREATE TABLE metrics_default PARTITION OF metrics DEFAULT")
+
+    # One partition per month of existing data, then the months ahead
+    op.execute(
+        "SELECT create_metrics_partition(month_start::date) FROM generate_series("
+        "date_trunc('month', (SELECT min(timestamp) FROM metrics_unpartitioned)), "
+        "date_trunc('month', now()), interval '1 month') AS month_start"
+    )
+    op.execute(f"SELECT create_metrics_partitions({METRICS_PARTITIONS_AHEAD})")
+
+    op.execute("INSERT INTO metrics SELECT * FROM metrics_unpartitioned")
+    op.execute("DROP TABLE metrics_unpartitioned")
+
+    op.create_index('idx_metrics_server_timestamp', 'metrics', ['server_id', 'timestamp'], unique=False)
+    # No standalone timestamp btree: it would double per-insert index writes,
+    # and BRIN covers global time-range scans at a fraction of the size
+    op.create_index('idx_metrics_timestamp_brin', 'metrics', ['timestamp'], unique=False,
+                    postgresql_using='brin', postgresql_with={'pages_per_range': 32})
+
+
+def downgrade():
+    """Move metrics back into a single unpartitioned table."""
+    op.drop_index('idx_metrics_server_timestamp', table_name='metrics')
+    op.drop_index('idx_metrics_timestamp_brin', table_name='metrics')
+    op.execute("ALTER TABLE metrics RENAME TO metrics_partitioned")
+    op.execute("ALTER TABLE metrics_partitioned RENAME CONSTRAINT metrics_pkey TO metrics_partitioned_pkey")
+
+    op.execute(
+        "CREATE TABLE metrics ("
+        "LIKE metrics_partitioned INCLUDING DEFAULTS, "
+        "PRIMARY KEY (id), "
+        "FOREIGN KEY (server_id) REFERENCES servers (server_id)"
+        ")"
+    )
+    op.execute("ALTER SEQUENCE metrics_id_seq OWNED BY metrics.id")
+    op.execute("INSERT INTO metrics SELECT * FROM metrics_partitioned")
+    op.execute("DROP TABLE metrics_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS create_metrics_partitions(integer)")
+    op.execute("DROP FUNCTION IF EXISTS create_metrics_partition(date)")
+
+    op.create_index('idx_metrics_server_timestamp', 'metrics', ['server_id', 'timestamp'], unique=False)
+    op.create_index('idx_metrics_timestamp', 'metrics', ['timestamp'], unique=False)
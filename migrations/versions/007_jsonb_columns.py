@@ -0,0 +1,45 @@
+"""Store metrics and webhook JSON columns as JSONB with GIN indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-12-21 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs converted between JSON and JSONB
+JSON_COLUMNS = (
+    ('metrics', 'disk_usage'),
+    ('metrics', 'failed_services'),
+    ('dashboard_settings', 'webhook_urls'),
+)
+
+
+def upgrade():
+    """Convert the JSON columns to JSONB and index the metrics ones with GIN."""
+    # JSONB is stored decoded, so reads skip the text re-parse
+    for table, column in JSON_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb")
+
+    op.create_index('idx_metrics_disk_gin', 'metrics', ['disk_usage'], unique=False,
+                    postgresql_using='gin')
+    # Partial index: most samples report no failed services
+    op.create_index('idx_metrics_failed_gin', 'metrics', ['failed_services'], unique=False,
+                    postgresql_using='gin',
+                    postgresql_where=sa.text("failed_services <> '[]'::jsonb"))
+
+
+def downgrade():
+    """Drop the GIN indexes and convert the columns back to JSON."""
+    op.drop_index('idx_metrics_failed_gin', table_name='metrics')
+    op.drop_index('idx_metrics_disk_gin', table_name='metrics')
+
+    for table, column in JSON_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING {column}::json")
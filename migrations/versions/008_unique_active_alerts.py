@@ -0,0 +1,37 @@
+"""Allow one active alert per server and type
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-12-21 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+# Disk alerts are per mountpoint, so they are left out of the constraint
+ACTIVE_UNIQUE_ALERT_CONDITION = "is_resolved = false AND alert_type <> 'disk'"
+
+
+def upgrade():
+    """Add the partial unique index that alert creation's ON CONFLICT relies on."""
+    # The old check-then-insert path could raise the same alert twice;
+    # keep the newest active one so the unique index can be built
+    op.execute(
+        "UPDATE alerts SET is_resolved = true, resolved_at = now() "
+        f"WHERE {ACTIVE_UNIQUE_ALERT_CONDITION} AND id NOT IN ("
+        f"SELECT max(id) FROM alerts WHERE {ACTIVE_UNIQUE_ALERT_CONDITION} "
+        "GROUP BY server_id, alert_type)"
+    )
+    op.create_index('uq_alerts_active', 'alerts', ['server_id', 'alert_type'], unique=True,
+                    postgresql_where=sa.text(ACTIVE_UNIQUE_ALERT_CONDITION))
+
+
+def downgrade():
+    """Remove the active alerts unique index."""
+    op.drop_index('uq_alerts_active', table_name='alerts')
@@ -0,0 +1,28 @@
+"""Index alerts by triggered_at with BRIN instead of a type btree
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-12-21 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace idx_alerts_type_triggered with a BRIN index on triggered_at."""
+    op.drop_index('idx_alerts_type_triggered', table_name='alerts')
+    # Alerts are appended in triggered_at order, so a BRIN index serves time-range scans
+    op.create_index('idx_alerts_triggered_brin', 'alerts', ['triggered_at'], unique=False,
+                    postgresql_using='brin', postgresql_with={'pages_per_range': 16})
+
+
+def downgrade():
+    """Restore the (alert_type, triggered_at) btree index."""
+    op.drop_index('idx_alerts_triggered_brin', table_name='alerts')
+    op.create_index('idx_alerts_type_triggered', 'alerts', ['alert_type', 'triggered_at'], unique=False)
@@ -0,0 +1,27 @@
+"""Drop the unused created_at column from metrics
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-12-21 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Remove metrics.created_at; samples are ordered by their own timestamp."""
+    op.drop_column('metrics', 'created_at')
+
+
+def downgrade():
+    """Restore metrics.created_at, filling existing rows with the current time."""
+    op.add_column('metrics', sa.Column('created_at', sa.DateTime(), nullable=False,
+                                       server_default=sa.func.now()))
+    op.alter_column('metrics', 'created_at', server_default=None)
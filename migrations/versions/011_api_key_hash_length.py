@@ -0,0 +1,33 @@
+"""Size api_keys.key_hash for the stored hash formats
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-12-21 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Narrow key_hash to 128 characters."""
+    # New keys are 64-character SHA-256 digests, but keys created before
+    # them keep their 128-character salted PBKDF2 hash until first used
+    op.alter_column('api_keys', 'key_hash',
+                    existing_type=sa.String(length=255),
+                    type_=sa.String(length=128),
+                    existing_nullable=False)
+
+
+def downgrade():
+    """Widen key_hash back to 255 characters."""
+    op.alter_column('api_keys', 'key_hash',
+                    existing_type=sa.String(length=128),
+                    type_=sa.String(length=255),
+                    existing_nullable=False)
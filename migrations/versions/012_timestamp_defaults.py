@@ -0,0 +1,64 @@
+"""Stamp creation and update times with database-side defaults
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-12-21 16:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# Timestamp columns the models leave to the database on insert
+DEFAULT_NOW_COLUMNS = (
+    ('servers', 'registered_at'),
+    ('servers', 'last_seen'),
+    ('api_keys', 'created_at'),
+    ('alert_rules', 'created_at'),
+    ('alert_rules', 'updated_at'),
+    ('health_status', 'last_check'),
+    ('health_status', 'status_since'),
+    ('health_status', 'updated_at'),
+    ('alerts', 'triggered_at'),
+)
+
+# Keeps updated_at current for writers that do not set it themselves
+SET_UPDATED_AT_FUNCTION = """
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Tables from revision 001 with an updated_at column
+UPDATED_AT_TABLES = ('alert_rules', 'health_status')
+
+
+def upgrade():
+    """Add now() defaults and updated_at triggers."""
+    for table, column in DEFAULT_NOW_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT now()")
+
+    op.execute(SET_UPDATED_AT_FUNCTION)
+    for table in UPDATED_AT_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_set_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        )
+
+
+def downgrade():
+    """Remove the updated_at triggers and now() defaults."""
+    for table in UPDATED_AT_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_set_updated_at ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS set_updated_at()")
+
+    for table, column in DEFAULT_NOW_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
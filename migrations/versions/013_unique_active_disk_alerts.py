@@ -0,0 +1,36 @@
+"""Allow one active disk alert per server and mountpoint
+
+Revision ID: 013
+Revises: 012
+Create Date: 2024-12-21 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+ACTIVE_UNIQUE_DISK_ALERT_CONDITION = "is_resolved = false AND alert_type = 'disk'"
+
+
+def upgrade():
+    """Add the partial unique index that disk alert creation's ON CONFLICT relies on."""
+    # Concurrent workers could raise the same disk alert twice;
+    # keep the newest active one so the unique index can be built
+    op.execute(
+        "UPDATE alerts SET is_resolved = true, resolved_at = now() "
+        f"WHERE {ACTIVE_UNIQUE_DISK_ALERT_CONDITION} AND id NOT IN ("
+        f"SELECT max(id) FROM alerts WHERE {ACTIVE_UNIQUE_DISK_ALERT_CONDITION} "
+        "GROUP BY server_id, mountpoint)"
+    )
+    op.create_index('uq_alerts_active_disk', 'alerts', ['server_id', 'mountpoint'], unique=True,
+                    postgresql_where=sa.text(ACTIVE_UNIQUE_DISK_ALERT_CONDITION))
+
+
+def downgrade():
+    """Remove the active disk alerts unique index."""
+    op.drop_index('uq_alerts_active_disk', table_name='alerts')
@@ -4,76 +4,159 @@ Simple script to send test metrics for registered servers.
 This simulates monitoring agents sending data to the server.
 """
 
-import requests
+import asyncio
+import httpx
+import copy
 import json
-import time
+import os
 import random
-from datetime import datetime
+from datetime import datetime, timezone
+
+# orjson is optional; it serializes the payload (and datetimes) much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configuration
 SERVER_URL = "http://localhost:8000"
+# Set to the server's UDS_PATH to skip the TCP stack when running on the same host
+UDS_PATH = os.getenv("MONITORING_UDS") or None
+# Samples buffered per server before one batch request, and the time between samples
+TEST_BATCH_SIZE = int(os.getenv("TEST_BATCH_SIZE", "1"))
+TEST_BATCH_MS = int(os.getenv("TEST_BATCH_MS", "30000"))
 API_KEYS = [
     "0heKhZdDyTONhU64GIKq5JRAjyg0kvoKfwA4Juz22fk",  # test-server-003 (active)
 ]
 
+# Connection pool shared by all keys; connections stay open across ticks
+CONNECTION_LIMITS = httpx.Limits(
+    max_connections=64, max_keepalive_connections=64, keepalive_expiry=60
+)
+
+# Request headers only depend on the API key, so build them once per key
+HEADERS = {
+    api_key: {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    for api_key in API_KEYS
+}
+
+# Fields that never change between samples; only the measurements are updated
+MEMORY_TOTAL = 8589934592  # 8GB in bytes
+DISK_TOTAL = 107374182400  # 100GB
+
+_TEMPLATE = {
+    "server_id": None,
+    "timestamp": None,
+    "cpu_usage": 0.0,
+    "memory": {"total": MEMORY_TOTAL, "used": 0, "percentage": 0.0},
+    "disk_usage": [
+        {"mountpoint": "/", "total": DISK_TOTAL, "used": 0, "percentage": 0.0}
+    ],
+    "load_average": {"one_min": 0.0, "five_min": 0.0, "fifteen_min": 0.0},
+    "uptime": 0,
+    "failed_services": []
+}
+
+# One template per server; samples are generated on the event loop, one at a time
+_templates = {}
+
+# Random ranges for each sample, looked up once instead of spelled out per call
+_rng = random.Random()
+CPU_RANGE = (10, 85)
+MEMORY_USED_RANGE = (2000000000, 6000000000)  # 2-6GB used
+DISK_USED_RANGE = (20000000000, 80000000000)  # 20-80GB used
+LOAD_RANGES = (("one_min", 0.1, 2.0), ("five_min", 0.1, 1.8), ("fifteen_min", 0.1, 1.5))
+UPTIME_RANGE = (86400, 2592000)  # 1 day to 30 days
+
+def _dumps(metrics):
+    """Serialize metrics to JSON bytes, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(metrics, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        metrics, default=lambda o: o.isoformat().replace("+00:00", "Z")
+    ).encode("utf-8")
+
 def generate_mock_metrics(server_id):
     """Generate realistic mock metrics data."""
-    memory_total = 8589934592  # 8GB in bytes
-    memory_used = random.randint(2000000000, 6000000000)  # 2-6GB used
+    metrics = _templates.get(server_id)
+    if metrics is None:
+        metrics = _templates[server_id] = copy.deepcopy(_TEMPLATE)
+        metrics["server_id"] = server_id
     
-    disk_total = 107374182400  # 100GB
-    disk_used = random.randint(20000000000, 80000000000)  # 20-80GB used
+    uniform = _rng.uniform
+    randint = _rng.randint
+    memory_used = randint(*MEMORY_USED_RANGE)
+    disk_used = randint(*DISK_USED_RANGE)
     
-    return {
-        "server_id": server_id,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "cpu_usage": round(random.uniform(10, 85), 2),
-        "memory": {
-            "total": memory_total,
-            "used": memory_used,
-            "percentage": round((memory_used / memory_total) * 100, 2)
-        },
-        "disk_usage": [
-            {
-                "mountpoint": "/",
-                "total": disk_total,
-                "used": disk_used,
-                "percentage": round((disk_used / disk_total) * 100, 2)
-            }
-        ],
-        "load_average": {
-            "one_min": round(random.uniform(0.1, 2.0), 2),
-            "five_min": round(random.uniform(0.1, 1.8), 2),
-            "fifteen_min": round(random.uniform(0.1, 1.5), 2)
-        },
-        "uptime": random.randint(86400, 2592000),  # 1 day to 30 days
-        "failed_services": []
-    }
+    metrics["timestamp"] = datetime.now(timezone.utc)
+    metrics["cpu_usage"] = round(uniform(*CPU_RANGE), 2)
+    
+    memory = metrics["memory"]
+    memory["used"] = memory_used
+    memory["percentage"] = round((memory_used / MEMORY_TOTAL) * 100, 2)
+    
+    disk = metrics["disk_usage"][0]
+    disk["used"] = disk_used
+    disk["percentage"] = round((disk_used / DISK_TOTAL) * 100, 2)
+    
+    load_average = metrics["load_average"]
+    for key, low, high in LOAD_RANGES:
+        load_average[key] = round(uniform(low, high), 2)
+    
+    metrics["uptime"] = randint(*UPTIME_RANGE)
+    return metrics
 
-def send_metrics(api_key, server_id):
-    """Send metrics data to the server."""
-    metrics = generate_mock_metrics(server_id)
+async def send_metrics_batch(session, api_key, samples):
+    """Send buffered, already-serialized metrics samples in one request."""
+    if not samples:
+        return
     
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    body = b'{"metrics":[' + b",".join(samples) + b"]}"
     
     try:
-        response = requests.post(
-            f"{SERVER_URL}/api/v1/metrics",
-            headers=headers,
-            json=metrics,
-            timeout=10
+        response = await session.post(
+            f"{SERVER_URL}/api/v1/metrics/batch",
+            headers=HEADERS[api_key],
+            content=body
         )
         
         if response.status_code == 201:  # 201 Created for successful metrics submission
-            print(f"✅ Sent metrics for {server_id} - CPU: {metrics['cpu_usage']}%, Memory: {metrics['memory']['percentage']}%")
+            result = response.json()
+            print(f"✅ Sent {result['count']} metrics samples for {', '.join(result['server_ids'])}")
         else:
-            print(f"❌ Failed to send metrics for {server_id}: {response.status_code} - {response.text}")
+            print(f"❌ Failed to send metrics batch: {response.status_code} - {response.text}")
+            
+    except httpx.HTTPError as e:
+        print(f"❌ Network error sending metrics batch: {e}")
+
+async def run(servers_by_key):
+    """Sample every server and post all keys' batches concurrently."""
+    buffers = {api_key: [] for api_key in servers_by_key}
+    transport = httpx.AsyncHTTPTransport(uds=UDS_PATH, limits=CONNECTION_LIMITS)
+    
+    async with httpx.AsyncClient(transport=transport, timeout=10) as session:
+        tick = 0
+        while True:
+            for api_key, key_server_ids in servers_by_key.items():
+                # Serialize now: the per-server template is reused for the next sample
+                buffers[api_key].extend(
+                    _dumps(generate_mock_metrics(server_id)) for server_id in key_server_ids
+                )
             
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Network error sending metrics for {server_id}: {e}")
+            tick += 1
+            if tick % TEST_BATCH_SIZE == 0:
+                # All keys complete in roughly one round trip instead of one each
+                await asyncio.gather(*(
+                    send_metrics_batch(session, api_key, samples)
+                    for api_key, samples in buffers.items()
+                ))
+                buffers = {api_key: [] for api_key in servers_by_key}
+            
+            print(f"⏰ Waiting {TEST_BATCH_MS / 1000:g} seconds before next sample...\n")
+            await asyncio.sleep(TEST_BATCH_MS / 1000)
 
 def main():
     """Main function to send test metrics."""
@@ -83,14 +166,13 @@ def main():
     
     server_ids = ["test-server-003"]  # Only active server
     
+    # Each API key sends the samples of its own servers as one batch
+    servers_by_key = {api_key: [] for api_key in API_KEYS}
+    for api_key, server_id in zip(API_KEYS, server_ids):
+        servers_by_key[api_key].append(server_id)
+    
     try:
-        while True:
-            for i, api_key in enumerate(API_KEYS):
-                send_metrics(api_key, server_ids[i])
-            
-            print(f"⏰ Waiting 30 seconds before next update...\n")
-            time.sleep(30)
-            
+        asyncio.run(run(servers_by_key))
     except KeyboardInterrupt:
         print("\n🛑 Stopping metrics sender...")
         print("✅ Done!")
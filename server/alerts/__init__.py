@@ -5,6 +5,12 @@ This module provides alerting functionality including rule-based alert evaluatio
 console logging, and webhook notifications.
 """
 
-from .engine import AlertEngine
+__all__ = ['AlertEngine']
 
-__all__ = ['AlertEngine']
\ No newline at end of file
+
+def __getattr__(name):
+    """Import AlertEngine on first access; the engine pulls in requests and the ORM."""
+    if name == 'AlertEngine':
+        from .engine import AlertEngine
+        return AlertEngine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,129 @@
+"""
+Webhook circuit breaker for the Linux Server Health Monitoring System.
+
+A webhook endpoint that is down makes every delivery wait for all of its
+retries and timeouts. This module tracks consecutive delivery failures per
+URL and skips a URL for a cooldown period once it keeps failing, so dead
+endpoints stop tying up the webhook workers.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Set
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Per-URL circuit breaker.
+
+    A URL's circuit opens after ``failure_threshold`` consecutive failed
+    deliveries and stays open for ``cooldown`` seconds. After the cooldown the
+    circuit is half-open: one delivery is let through as a trial while the
+    others are still skipped. Success closes the circuit, another failure
+    opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 60.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open a URL's circuit; 0 disables the breaker
+            cooldown: Seconds a circuit stays open before a delivery is tried again
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+        # Half-open URLs whose trial delivery has not been recorded yet
+        self._trials: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def allow(self, url: str) -> bool:
+        """
+        Check whether a delivery to a URL may be attempted.
+
+        The first call after the cooldown claims the trial delivery; the
+        caller must then record its outcome with record_success or
+        record_failure.
+
+        Args:
+            url: Webhook URL
+
+        Returns:
+            True if the URL's circuit is closed or the caller got the trial,
+            False otherwise
+        """
+        with self._lock:
+            open_until = self._open_until.get(url)
+            if open_until is None:
+                return True
+            if url in self._trials or time.monotonic() < open_until:
+                return False
+            self._trials.add(url)
+            return True
+
+    def record_success(self, url: str) -> None:
+        """
+        Record a successful delivery, closing the URL's circuit.
+
+        Args:
+            url: Webhook URL
+        """
+        with self._lock:
+            failures = self._failures.pop(url, 0)
+            self._open_until.pop(url, None)
+            self._trials.discard(url)
+        if self.failure_threshold and failures >= self.failure_threshold:
+            logger.info("Webhook circuit for %s closed", url)
+
+    def record_failure(self, url: str) -> None:
+        """
+        Record a failed delivery, opening the URL's circuit at the threshold.
+
+        Args:
+            url: Webhook URL
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            failures = self._failures.get(url, 0) + 1
+            self._failures[url] = failures
+            if failures < self.failure_threshold:
+                return
+            self._open_until[url] = time.monotonic() + self.cooldown
+            self._trials.discard(url)
+        logger.info("Webhook circuit for %s opened after %d consecutive failures; "
+                    "skipping it for %ss", url, failures, self.cooldown)
+
+    def clear(self) -> None:
+        """Close every circuit and forget all failures."""
+        with self._lock:
+            self._failures.clear()
+            self._open_until.clear()
+            self._trials.clear()
+
+    def statistics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the circuit state of every URL with recent failures.
+
+        Returns:
+            Dictionary mapping URLs to their consecutive failures, whether the
+            circuit is open, whether a trial delivery is in flight, and the
+            seconds until it is retried
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                url: {
+                    "failures": failures,
+                    "open": now < self._open_until.get(url, 0.0),
+                    "trial": url in self._trials,
+                    "retry_in": max(0.0, self._open_until.get(url, 0.0) - now)
+                }
+                for url, failures in self._failures.items()
+            }
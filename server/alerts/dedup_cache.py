@@ -0,0 +1,136 @@
+"""
+Active alert cache for the Linux Server Health Monitoring System.
+
+Alert evaluation needs to know which alerts are already active for a server
+before it raises new ones. This module keeps a short-lived, per-process copy
+of that set so that servers reporting every few seconds do not each cost a
+database query per sample.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+# (alert_type, mountpoint) - mountpoint is None for everything but disk alerts
+AlertKey = Tuple[str, Optional[str]]
+
+
+class ActiveAlertCache:
+    """
+    LRU cache of the active alert keys of each server, with a time-to-live.
+
+    Entries are refreshed from the database once they are older than the TTL
+    and are kept up to date in between as alerts are created and resolved.
+    The least recently used servers are evicted beyond ``max_servers``.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_servers: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a server's entry is trusted before it is reloaded; 0 disables caching
+            max_servers: Maximum number of servers kept in the cache
+        """
+        self.ttl = ttl
+        self.max_servers = max_servers
+        self._entries: "OrderedDict[str, Tuple[float, Set[AlertKey]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, server_id: str) -> Optional[Set[AlertKey]]:
+        """
+        Get the cached active alert keys of a server.
+
+        Args:
+            server_id: Server ID to look up
+
+        Returns:
+            Copy of the cached keys, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(server_id)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(server_id)
+            self.hits += 1
+            return set(entry[1])
+
+    def store(self, server_id: str, keys: Iterable[AlertKey]) -> None:
+        """
+        Store the full set of active alert keys loaded for a server.
+
+        Args:
+            server_id: Server ID the keys belong to
+            keys: Active alert keys of the server
+        """
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[server_id] = (time.monotonic(), set(keys))
+            self._entries.move_to_end(server_id)
+            while len(self._entries) > self.max_servers:
+                self._entries.popitem(last=False)
+
+    def add(self, server_id: str, key: AlertKey) -> None:
+        """
+        Record a newly created alert in a server's cached entry.
+
+        Args:
+            server_id: Server ID the alert belongs to
+            key: Key of the created alert
+        """
+        with self._lock:
+            entry = self._entries.get(server_id)
+            if entry is not None:
+                entry[1].add(key)
+
+    def discard(self, server_id: str, keys: Iterable[AlertKey]) -> None:
+        """
+        Remove resolved alerts from a server's cached entry.
+
+        Args:
+            server_id: Server ID the alerts belong to
+            keys: Keys of the resolved alerts
+        """
+        with self._lock:
+            entry = self._entries.get(server_id)
+            if entry is not None:
+                entry[1].difference_update(keys)
+
+    def invalidate(self, server_id: str) -> None:
+        """
+        Drop a server's entry so the next lookup reloads it from the database.
+
+        Args:
+            server_id: Server ID to invalidate
+        """
+        with self._lock:
+            self._entries.pop(server_id, None)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the hit statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def statistics(self) -> Dict[str, float]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with the number of cached servers, hits, misses, and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "servers": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -9,18 +9,153 @@ logging and webhook notifications for triggered alerts.
 import os
 import json
 import logging
+import random
+import threading
+import time
+import uuid
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Set
+from urllib.parse import urlsplit
 from sqlalchemy.orm import Session
 
+from server.alerts.circuit_breaker import CircuitBreaker
+from server.alerts.dedup_cache import ActiveAlertCache, AlertKey
 from server.database.models import Alert, Server, Metric, HealthStatus
 from server.database.operations import AlertOperations, ServerOperations, HealthStatusOperations
 from shared.models import SystemMetrics
 
+# orjson is optional; it serializes webhook payloads (and datetimes) much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
+# One session per webhook host, shared by all engines, so pooled connections
+# and TLS sessions survive between alerts
+_webhook_sessions: Dict[str, requests.Session] = {}
+
+# Worker pool that delivers alerts to all webhook URLs at once, so a
+# slow endpoint only delays its own delivery
+WEBHOOK_MAX_WORKERS = int(os.getenv("WEBHOOK_MAX_WORKERS", "8"))
+_webhook_executor = ThreadPoolExecutor(max_workers=WEBHOOK_MAX_WORKERS,
+                                       thread_name_prefix="webhook")
+
+# Notifications are delivered in the background so ingestion never waits on
+# webhook endpoints. One dispatcher keeps batches in order; the queue is bounded
+# and notifications beyond it are dropped (and logged) rather than piling up.
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+_webhook_dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webhook-dispatch")
+_webhook_queue_slots = threading.BoundedSemaphore(WEBHOOK_QUEUE_SIZE)
+_pending_webhooks: Set[Future] = set()
+_pending_webhooks_lock = threading.Lock()
+
+# Per-process copy of each server's active alert keys, so repeated samples from
+# a server skip the deduplication query (ALERT_DEDUP_CACHE_TTL=0 disables it)
+_active_alert_cache = ActiveAlertCache(ttl=float(os.getenv("ALERT_DEDUP_CACHE_TTL", "60")))
+
+# Webhook URLs that keep failing are skipped for a cooldown instead of costing
+# every notification its full retries (WEBHOOK_CIRCUIT_FAILURES=0 disables it)
+_webhook_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("WEBHOOK_CIRCUIT_FAILURES", "5")),
+    cooldown=float(os.getenv("WEBHOOK_CIRCUIT_COOLDOWN", "60"))
+)
+
+# Sent with every webhook request; set once on each session
+WEBHOOK_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'Linux-Server-Monitoring/1.0'
+}
+
+
+@lru_cache(maxsize=128)
+def _webhook_host(url: str) -> str:
+    """Return the scheme and host of a webhook URL."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _get_webhook_session(url: str) -> requests.Session:
+    """
+    Get the shared HTTP session for a webhook URL's host.
+    
+    Args:
+        url: Webhook URL
+        
+    Returns:
+        Session reused for every webhook sent to that host
+    """
+    host = _webhook_host(url)
+    session = _webhook_sessions.get(host)
+    if session is None:
+        session = _webhook_sessions.setdefault(host, _create_webhook_session())
+    return session
+
+
+def _create_webhook_session() -> requests.Session:
+    """
+    Create an HTTP session for one webhook host.
+    
+    The connection pool holds one connection per webhook worker, so concurrent
+    deliveries to the host never open throwaway connections. Retries are
+    handled by AlertEngine, not by urllib3.
+    
+    Returns:
+        Configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=WEBHOOK_MAX_WORKERS, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(WEBHOOK_HEADERS)
+    return session
+
+
+def _dumps_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize a webhook payload to JSON bytes, preferring orjson when installed.
+    
+    Args:
+        payload: Webhook payload; datetimes are written in ISO 8601 format
+        
+    Returns:
+        JSON-encoded payload
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    # Same bytes as orjson: compact separators and raw UTF-8
+    return json.dumps(payload, default=lambda o: o.isoformat(),
+                      separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _webhook_delivered(future: Future) -> None:
+    """Free the queue slot of a finished background webhook delivery."""
+    with _pending_webhooks_lock:
+        _pending_webhooks.discard(future)
+    _webhook_queue_slots.release()
+
+
+def wait_for_pending_webhooks(timeout: Optional[float] = None) -> bool:
+    """
+    Wait for queued webhook notifications to be delivered.
+    
+    Args:
+        timeout: Maximum number of seconds to wait (optional, waits indefinitely if None)
+        
+    Returns:
+        True if every queued notification finished, False on timeout
+    """
+    with _pending_webhooks_lock:
+        pending = list(_pending_webhooks)
+    _, not_done = wait(pending, timeout=timeout)
+    return not not_done
+
 
 class AlertEngine:
     """
@@ -50,11 +185,15 @@ class AlertEngine:
         # Webhook configuration
         self.webhook_timeout = int(os.getenv("WEBHOOK_TIMEOUT", "10"))  # seconds
         self.webhook_retry_attempts = int(os.getenv("WEBHOOK_RETRY_ATTEMPTS", "3"))
+        self.webhook_base_delay = int(os.getenv("WEBHOOK_BASE_DELAY_MS", "1000")) / 1000  # seconds
+        self.webhook_max_delay = int(os.getenv("WEBHOOK_MAX_DELAY_MS", "30000")) / 1000  # seconds
         
-        logger.info(f"AlertEngine initialized with thresholds: CPU={self.cpu_threshold}%, "
-                   f"Disk={self.disk_threshold}%, Offline={self.offline_timeout}s")
+        logger.info("AlertEngine initialized with thresholds: CPU=%s%%, Disk=%s%%, Offline=%ss",
+                    self.cpu_threshold, self.disk_threshold, self.offline_timeout)
         if self.webhook_urls:
-            logger.info(f"Webhook notifications enabled for {len(self.webhook_urls)} URLs")
+            logger.info("Webhook notifications enabled for %d URLs", len(self.webhook_urls))
+            for webhook_url in self.webhook_urls:
+                _get_webhook_session(webhook_url)
     
     def evaluate_metrics(self, metrics: SystemMetrics) -> List[Alert]:
         """
@@ -66,23 +205,138 @@ class AlertEngine:
         Returns:
             List of triggered alerts
         """
+        return self.evaluate_metrics_batch([metrics])
+    
+    def evaluate_metrics_batch(self, metrics_list: List[SystemMetrics]) -> List[Alert]:
+        """
+        Evaluate several metrics samples at once, e.g. a bulk upload from many servers.
+        
+        Resolutions and alerts from the whole batch are committed in a single
+        transaction, and new alerts are sent in a single webhook request per URL.
+        
+        Args:
+            metrics_list: System metrics samples to evaluate
+            
+        Returns:
+            List of triggered alerts
+        """
+        triggered_alerts = []
+        resolved_servers: Set[str] = set()
+        # Active alert keys of every evaluated server that this batch may have
+        # raised; they only go into the cache once the batch is committed
+        raised_keys: Dict[str, Set[AlertKey]] = {}
+        
+        try:
+            for metrics in metrics_list:
+                triggered_alerts.extend(self._evaluate_sample(
+                    metrics, resolved_servers, raised_keys.setdefault(metrics.server_id, set())
+                ))
+            
+            if triggered_alerts:
+                # Commits, then sends one webhook request per URL for all alerts
+                self._process_alerts(triggered_alerts)
+            elif resolved_servers:
+                self.session.commit()
+        except Exception:
+            # Nothing was stored; reload the evaluated servers' active alerts
+            for server_id in raised_keys:
+                _active_alert_cache.invalidate(server_id)
+            raise
+        
+        for server_id, keys in raised_keys.items():
+            for key in keys:
+                _active_alert_cache.add(server_id, key)
+        
+        return triggered_alerts
+    
+    def _evaluate_sample(self, metrics: SystemMetrics, resolved_servers: Set[str],
+                         raised_keys: Set[AlertKey]) -> List[Alert]:
+        """
+        Resolve recovered alerts and create new ones for a single sample.
+        
+        Args:
+            metrics: System metrics to evaluate
+            resolved_servers: Collects the servers that had alerts resolved
+            raised_keys: Keys of the server's alerts that are active after
+                earlier samples of the batch; updated with this sample's
+            
+        Returns:
+            List of created alerts, not yet committed or notified
+        """
         triggered_alerts = []
         
+        # Fetch the server's active alerts once (normally from the cache) and share
+        # them; alerts raised earlier in the batch are not cached until the commit
+        active_index = self._index_active_alerts(metrics.server_id)
+        active_index |= raised_keys
+        
+        # Recovery is detected on the same path as alerting
+        if self._resolve_recovered_alerts(metrics, active_index):
+            resolved_servers.add(metrics.server_id)
+        raised_keys.intersection_update(active_index)
+        
+        # Healthy samples (the common case) need no threshold checks
+        if (metrics.cpu_usage <= self.cpu_threshold and
+                all(disk.percentage <= self.disk_threshold for disk in metrics.disk_usage)):
+            return triggered_alerts
+        
         # Check CPU usage threshold
-        cpu_alert = self._check_cpu_threshold(metrics)
+        cpu_alert = self._check_cpu_threshold(metrics, active_index)
         if cpu_alert:
             triggered_alerts.append(cpu_alert)
         
         # Check disk usage thresholds
-        disk_alerts = self._check_disk_thresholds(metrics)
+        disk_alerts = self._check_disk_thresholds(metrics, active_index)
         triggered_alerts.extend(disk_alerts)
         
-        # Process all triggered alerts
-        for alert in triggered_alerts:
-            self._process_alert(alert)
+        # Whether raised now or before, an alert is active for every breach
+        if metrics.cpu_usage > self.cpu_threshold:
+            raised_keys.add(('cpu', None))
+        raised_keys.update(('disk', disk.mountpoint) for disk in metrics.disk_usage
+                           if disk.percentage > self.disk_threshold)
         
         return triggered_alerts
     
+    def _resolve_recovered_alerts(self, metrics: SystemMetrics, active_index: Set[AlertKey]) -> bool:
+        """
+        Resolve the active CPU and disk alerts whose condition has cleared.
+        
+        Only alerts present in the active index are considered, so samples of
+        servers without active alerts cost no database round trip. The caller
+        commits the resolution.
+        
+        Args:
+            metrics: System metrics being evaluated
+            active_index: Active alert keys of the server
+            
+        Returns:
+            True if any alert was resolved
+        """
+        recovered = set()
+        if ('cpu', None) in active_index and metrics.cpu_usage <= self.cpu_threshold:
+            recovered.add(('cpu', None))
+        for disk in metrics.disk_usage:
+            key = ('disk', disk.mountpoint)
+            if key in active_index and disk.percentage <= self.disk_threshold:
+                recovered.add(key)
+        
+        if not recovered:
+            return False
+        
+        resolved_ids = AlertOperations.resolve_alerts_bulk(
+            self.session,
+            metrics.server_id,
+            alert_types=[alert_type for alert_type, mountpoint in recovered if mountpoint is None],
+            disk_mountpoints=[mountpoint for alert_type, mountpoint in recovered if mountpoint is not None]
+        )
+        if resolved_ids:
+            logger.info("Resolved %d recovered alert(s) for server %s",
+                        len(resolved_ids), metrics.server_id)
+        
+        active_index.difference_update(recovered)
+        _active_alert_cache.discard(metrics.server_id, recovered)
+        return bool(resolved_ids)
+    
     def check_offline_servers(self) -> List[Alert]:
         """
         Check for servers that have gone offline and trigger alerts.
@@ -90,124 +344,187 @@ class AlertEngine:
         Returns:
             List of offline alerts triggered
         """
-        triggered_alerts = []
-        cutoff_time = datetime.utcnow() - timedelta(seconds=self.offline_timeout)
+        # Naive UTC datetimes like Server.last_seen. The cutoff is applied in SQL, so
+        # the datetime arithmetic below only runs for servers that newly went offline.
+        now = datetime.utcnow()
+        cutoff_time = now - timedelta(seconds=self.offline_timeout)
+        
+        # Servers that haven't been seen recently and have no active offline alert yet.
+        # Deliberately not cached: last_seen moves with every sample, so a cached
+        # server list would raise offline alerts for servers that just reported.
+        offline_servers = ServerOperations.get_servers_missing_offline_alert(self.session, cutoff_time)
+        if not offline_servers:
+            return []
+        
+        alert_rows = []
+        for server_id, last_seen in offline_servers:
+            offline_seconds = (now - last_seen).total_seconds()
+            alert_rows.append({
+                'server_id': server_id,
+                'alert_type': 'offline',
+                'severity': 'critical',
+                'message': f"Server {server_id} has been offline for {int(offline_seconds / 60)} minutes",
+                'threshold_value': float(self.offline_timeout),
+                'actual_value': offline_seconds
+            })
+        
+        # Only one active offline alert per server
+        triggered_alerts = AlertOperations.create_alerts_batch(self.session, alert_rows)
+        
+        # Update health status to 'down'
+        HealthStatusOperations.mark_servers_offline(
+            self.session, [alert.server_id for alert in triggered_alerts], now
+        )
         
-        # Get all servers that haven't been seen recently
-        servers = ServerOperations.get_all_servers(self.session, active_only=True)
+        self._process_alerts(triggered_alerts)
+        for alert in triggered_alerts:
+            _active_alert_cache.add(alert.server_id, ('offline', None))
+        return triggered_alerts
+    
+    def _index_active_alerts(self, server_id: str) -> Set[AlertKey]:
+        """
+        Index a server's active alerts for deduplication.
         
-        for server in servers:
-            if server.last_seen < cutoff_time:
-                # Check if we already have an active offline alert for this server
-                existing_alerts = AlertOperations.get_active_alerts(self.session, server.server_id)
-                has_offline_alert = any(alert.alert_type == 'offline' for alert in existing_alerts)
-                
-                if not has_offline_alert:
-                    offline_minutes = int((datetime.utcnow() - server.last_seen).total_seconds() / 60)
-                    alert = AlertOperations.create_alert(
-                        session=self.session,
-                        server_id=server.server_id,
-                        alert_type='offline',
-                        severity='critical',
-                        message=f"Server {server.server_id} has been offline for {offline_minutes} minutes",
-                        threshold_value=float(self.offline_timeout),
-                        actual_value=float((datetime.utcnow() - server.last_seen).total_seconds())
-                    )
-                    triggered_alerts.append(alert)
-                    self._process_alert(alert)
-                    
-                    # Update health status to 'down'
-                    HealthStatusOperations.update_health_status(
-                        session=self.session,
-                        server_id=server.server_id,
-                        status='down',
-                        connectivity_status='offline'
-                    )
+        Served from the active alert cache while fresh, otherwise loaded from
+        the database and cached.
         
-        return triggered_alerts
+        Args:
+            server_id: Server ID to look up active alerts for
+            
+        Returns:
+            (alert_type, mountpoint) keys of the active alerts; mountpoint is
+            None for everything but disk alerts
+        """
+        active_index = _active_alert_cache.get(server_id)
+        if active_index is None:
+            active_index = {
+                (alert.alert_type, alert.mountpoint if alert.alert_type == 'disk' else None)
+                for alert in AlertOperations.get_active_alerts(self.session, server_id)
+            }
+            _active_alert_cache.store(server_id, active_index)
+        return active_index
     
-    def _check_cpu_threshold(self, metrics: SystemMetrics) -> Optional[Alert]:
+    def _check_cpu_threshold(self, metrics: SystemMetrics,
+                             active_index: Set[AlertKey]) -> Optional[Alert]:
         """
         Check if CPU usage exceeds threshold.
         
         Args:
             metrics: System metrics to check
+            active_index: Active alert keys of the server, from _index_active_alerts
             
         Returns:
             Alert if threshold exceeded, None otherwise
         """
-        if metrics.cpu_usage > self.cpu_threshold:
-            # Check if we already have an active CPU alert for this server
-            existing_alerts = AlertOperations.get_active_alerts(self.session, metrics.server_id)
-            has_cpu_alert = any(alert.alert_type == 'cpu' for alert in existing_alerts)
-            
-            if not has_cpu_alert:
-                return AlertOperations.create_alert(
-                    session=self.session,
-                    server_id=metrics.server_id,
-                    alert_type='cpu',
-                    severity='warning' if metrics.cpu_usage < 95.0 else 'critical',
-                    message=f"High CPU usage on {metrics.server_id}: {metrics.cpu_usage:.1f}%",
-                    threshold_value=self.cpu_threshold,
-                    actual_value=metrics.cpu_usage
-                )
+        if metrics.cpu_usage > self.cpu_threshold and ('cpu', None) not in active_index:
+            # Only one active CPU alert per server
+            return AlertOperations.create_alert_if_absent(
+                session=self.session,
+                server_id=metrics.server_id,
+                alert_type='cpu',
+                severity='warning' if metrics.cpu_usage < 95.0 else 'critical',
+                message=f"High CPU usage on {metrics.server_id}: {metrics.cpu_usage:.1f}%",
+                threshold_value=self.cpu_threshold,
+                actual_value=metrics.cpu_usage
+            )
         
         return None
     
-    def _check_disk_thresholds(self, metrics: SystemMetrics) -> List[Alert]:
+    def _check_disk_thresholds(self, metrics: SystemMetrics,
+                               active_index: Set[AlertKey]) -> List[Alert]:
         """
         Check if any disk usage exceeds threshold.
         
         Args:
             metrics: System metrics to check
+            active_index: Active alert keys of the server, from _index_active_alerts
             
         Returns:
             List of disk usage alerts
         """
         alerts = []
         
-        # Get existing active disk alerts for this server
-        existing_alerts = AlertOperations.get_active_alerts(self.session, metrics.server_id)
-        existing_disk_alerts = {
-            alert.message.split(' ')[-1]: alert  # Extract mountpoint from message
-            for alert in existing_alerts 
-            if alert.alert_type == 'disk'
-        }
-        
         for disk in metrics.disk_usage:
             if disk.percentage > self.disk_threshold:
-                # Check if we already have an active alert for this specific mountpoint
-                mountpoint_key = f"({disk.mountpoint})"
-                if mountpoint_key not in existing_disk_alerts:
-                    alert = AlertOperations.create_alert(
+                # Only one active alert per mountpoint
+                if ('disk', disk.mountpoint) not in active_index:
+                    alert = AlertOperations.create_alert_if_absent(
                         session=self.session,
                         server_id=metrics.server_id,
                         alert_type='disk',
                         severity='warning' if disk.percentage < 90.0 else 'critical',
                         message=f"High disk usage on {metrics.server_id}: {disk.percentage:.1f}% ({disk.mountpoint})",
                         threshold_value=self.disk_threshold,
-                        actual_value=disk.percentage
+                        actual_value=disk.percentage,
+                        mountpoint=disk.mountpoint
                     )
-                    alerts.append(alert)
+                    if alert:
+                        alerts.append(alert)
         
         return alerts
     
-    def _process_alert(self, alert: Alert) -> None:
+    def _process_alerts(self, alerts: List[Alert]) -> None:
         """
-        Process a triggered alert by logging and sending notifications.
+        Log triggered alerts, commit them, and queue their webhook notification.
         
         Args:
-            alert: Alert to process
+            alerts: Alerts to process
         """
-        # Log alert to console
-        self._log_alert(alert)
+        # Log alerts to console
+        for alert in alerts:
+            self._log_alert(alert)
         
-        # Send webhook notifications if configured
-        if self.webhook_urls:
-            self._send_webhook_notifications(alert)
+        # Build the payload while the alerts are still loaded in this session
+        webhook_payload = None
+        if self.webhook_urls and alerts:
+            webhook_payload = self._create_webhook_payload(alerts)
+        alert_ids = [alert.id for alert in alerts]
         
-        # Commit the alert to database
+        # Commit the alerts to database before any network I/O
         self.session.commit()
+        
+        # Send one webhook notification covering all alerts if configured
+        if webhook_payload is not None:
+            self._queue_webhook_notifications(alert_ids, webhook_payload)
+    
+    def _queue_webhook_notifications(self, alert_ids: List[int], payload: Dict[str, Any]) -> None:
+        """
+        Hand a webhook notification to the background dispatcher.
+        
+        Args:
+            alert_ids: IDs of the alerts in the payload
+            payload: Webhook payload
+        """
+        if not _webhook_queue_slots.acquire(blocking=False):
+            logger.error("Webhook queue full (%d); dropping notification for alerts %s",
+                         WEBHOOK_QUEUE_SIZE, alert_ids)
+            return
+        
+        future = _webhook_dispatcher.submit(self._deliver_webhook_notifications, alert_ids, payload)
+        with _pending_webhooks_lock:
+            _pending_webhooks.add(future)
+        future.add_done_callback(_webhook_delivered)
+    
+    def _deliver_webhook_notifications(self, alert_ids: List[int], payload: Dict[str, Any]) -> None:
+        """
+        Deliver a queued webhook notification and record its outcome.
+        
+        Runs on the dispatcher thread, so it records delivery status through
+        its own database session rather than the engine's.
+        
+        Args:
+            alert_ids: IDs of the alerts in the payload
+            payload: Webhook payload
+        """
+        db_session = Session(bind=self.session.get_bind())
+        try:
+            self._send_webhook_notifications(db_session, alert_ids, payload)
+            db_session.commit()
+        except Exception as e:
+            db_session.rollback()
+            logger.error("Failed to record webhook delivery for alerts %s: %s", alert_ids, e)
+        finally:
+            db_session.close()
     
     def _log_alert(self, alert: Alert) -> None:
         """
@@ -216,100 +533,191 @@ class AlertEngine:
         Args:
             alert: Alert to log
         """
-        log_level = logging.CRITICAL if alert.severity == 'critical' else logging.WARNING
-        logger.log(
-            log_level,
-            f"ALERT [{alert.severity.upper()}] {alert.alert_type.upper()}: {alert.message}"
-        )
+        severity = alert.severity
+        log_level = logging.CRITICAL if severity == 'critical' else logging.WARNING
+        # Skip the upper-casing when alerts aren't being logged at all
+        if logger.isEnabledFor(log_level):
+            logger.log(log_level, "ALERT [%s] %s: %s",
+                       severity.upper(), alert.alert_type.upper(), alert.message)
     
-    def _send_webhook_notifications(self, alert: Alert) -> None:
+    def _send_webhook_notifications(self, db_session: Session, alert_ids: List[int],
+                                    payload: Dict[str, Any]) -> None:
         """
-        Send webhook notifications for an alert.
+        Send webhook notifications for a batch of alerts.
+        
+        Every webhook URL receives a single request carrying all the alerts.
         
         Args:
-            alert: Alert to send notifications for
+            db_session: Database session used to record delivery status
+            alert_ids: IDs of the alerts in the payload
+            payload: Webhook payload
         """
-        webhook_payload = self._create_webhook_payload(alert)
-        
-        for webhook_url in self.webhook_urls:
-            success = self._send_webhook(webhook_url, webhook_payload, alert.id)
-            if success:
-                logger.info(f"Webhook notification sent successfully to {webhook_url}")
+        # Serialize once for every URL and retry
+        body = _dumps_payload(payload)
+        
+        # Deliver to every URL concurrently; total time is that of the slowest URL
+        try:
+            response_codes = list(_webhook_executor.map(
+                lambda webhook_url: self._post_webhook(webhook_url, body),
+                self.webhook_urls
+            ))
+        except RuntimeError:
+            # The pool refuses new work once the interpreter is shutting down;
+            # finish the queued notification one URL at a time
+            response_codes = [self._post_webhook(webhook_url, body)
+                              for webhook_url in self.webhook_urls]
+        
+        for webhook_url, response_code in zip(self.webhook_urls, response_codes):
+            AlertOperations.update_webhook_status_batch(
+                session=db_session,
+                alert_ids=alert_ids,
+                response_code=response_code
+            )
+            if self._webhook_succeeded(response_code):
+                logger.info("Webhook notification for %d alerts sent successfully to %s",
+                            len(alert_ids), webhook_url)
             else:
-                logger.error(f"Failed to send webhook notification to {webhook_url}")
+                logger.error("Failed to send webhook notification to %s", webhook_url)
     
-    def _create_webhook_payload(self, alert: Alert) -> Dict[str, Any]:
+    def _serialize_alert(self, alert: Alert) -> Dict[str, Any]:
         """
-        Create webhook payload for an alert.
+        Convert an alert to its webhook representation.
         
         Args:
-            alert: Alert to create payload for
+            alert: Alert to serialize
             
         Returns:
-            Dictionary containing webhook payload
+            Dictionary describing the alert
         """
         return {
             "alert_id": alert.id,
             "server_id": alert.server_id,
             "alert_type": alert.alert_type,
+            "mountpoint": alert.mountpoint,
             "severity": alert.severity,
             "message": alert.message,
             "threshold_value": alert.threshold_value,
             "actual_value": alert.actual_value,
-            "triggered_at": alert.triggered_at.isoformat(),
-            "timestamp": datetime.utcnow().isoformat()
+            "triggered_at": alert.triggered_at
         }
     
-    def _send_webhook(self, webhook_url: str, payload: Dict[str, Any], alert_id: int) -> bool:
+    def _create_webhook_payload(self, alerts: List[Alert]) -> Dict[str, Any]:
         """
-        Send webhook notification with retry logic.
+        Create webhook payload for a batch of alerts.
         
         Args:
-            webhook_url: URL to send webhook to
-            payload: Webhook payload
-            alert_id: Alert ID for tracking delivery status
+            alerts: Alerts to create payload for
             
         Returns:
-            True if webhook sent successfully, False otherwise
+            Dictionary containing webhook payload
         """
-        headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': 'Linux-Server-Monitoring/1.0'
+        return {
+            "alerts": [self._serialize_alert(alert) for alert in alerts],
+            "batch_id": uuid.uuid4().hex,
+            "timestamp": datetime.utcnow()
         }
+    
+    def _post_webhook(self, webhook_url: str, body: bytes) -> int:
+        """
+        POST a webhook payload unless the URL's circuit is open.
+        
+        Args:
+            webhook_url: URL to send webhook to
+            body: JSON-encoded webhook payload
+            
+        Returns:
+            HTTP status code of the last attempt, or 0 if no response was received
+        """
+        if not _webhook_breaker.allow(webhook_url):
+            logger.debug("Skipping webhook %s while its circuit is open", webhook_url)
+            return 0
+        
+        try:
+            response_code = self._post_webhook_with_retries(webhook_url, body)
+        except Exception:
+            # Settle a half-open circuit's trial, or the URL stays skipped
+            _webhook_breaker.record_failure(webhook_url)
+            raise
+        if self._webhook_succeeded(response_code):
+            _webhook_breaker.record_success(webhook_url)
+        else:
+            _webhook_breaker.record_failure(webhook_url)
+        return response_code
+    
+    def _post_webhook_with_retries(self, webhook_url: str, body: bytes) -> int:
+        """
+        POST a webhook payload, retrying with exponential backoff on failure.
+        
+        Client errors other than 429 are not retried since they cannot succeed.
+        Runs on webhook worker threads, so it must not touch the database session.
+        
+        Args:
+            webhook_url: URL to send webhook to
+            body: JSON-encoded webhook payload
+            
+        Returns:
+            HTTP status code of the last attempt, or 0 if no response was received
+        """
+        http_session = _get_webhook_session(webhook_url)
+        response_code = 0  # 0 indicates network/connection failure
         
         for attempt in range(self.webhook_retry_attempts):
             try:
-                response = requests.post(
+                response = http_session.post(
                     webhook_url,
-                    json=payload,
-                    headers=headers,
+                    data=body,
                     timeout=self.webhook_timeout
                 )
+                response_code = response.status_code
                 
-                # Update webhook delivery status in database
-                AlertOperations.update_webhook_status(
-                    session=self.session,
-                    alert_id=alert_id,
-                    response_code=response.status_code
-                )
-                
-                if response.status_code < 400:
-                    return True
-                else:
-                    logger.warning(f"Webhook returned status {response.status_code} for alert {alert_id}")
+                if response_code < 400:
+                    return response_code
+                logger.warning("Webhook %s returned status %d", webhook_url, response_code)
+                if response_code < 500 and response_code != 429:
+                    return response_code
                     
+            except requests.Timeout:
+                logger.warning("Webhook attempt %d timed out after %ss for %s",
+                               attempt + 1, self.webhook_timeout, webhook_url)
+                response_code = 0
+            except requests.ConnectionError as e:
+                logger.warning("Webhook attempt %d could not connect to %s: %s",
+                               attempt + 1, webhook_url, e)
+                response_code = 0
             except Exception as e:
-                logger.warning(f"Webhook attempt {attempt + 1} failed for {webhook_url}: {e}")
-                
-                if attempt == self.webhook_retry_attempts - 1:
-                    # Update webhook status as failed on final attempt
-                    AlertOperations.update_webhook_status(
-                        session=self.session,
-                        alert_id=alert_id,
-                        response_code=0  # 0 indicates network/connection failure
-                    )
+                logger.warning("Webhook attempt %d failed for %s: %s", attempt + 1, webhook_url, e)
+                response_code = 0
+            
+            if attempt < self.webhook_retry_attempts - 1:
+                time.sleep(self._retry_delay(attempt))
+        
+        return response_code
+    
+    @staticmethod
+    def _webhook_succeeded(response_code: int) -> bool:
+        """
+        Check whether a webhook delivery succeeded.
         
-        return False
+        Args:
+            response_code: Final HTTP status code, or 0 on network failure
+            
+        Returns:
+            True for 1xx-3xx responses, False otherwise
+        """
+        return 0 < response_code < 400
+    
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Compute the backoff before the next webhook attempt.
+        
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            
+        Returns:
+            Delay in seconds: exponential, capped, with up to 25% jitter
+        """
+        delay = min(self.webhook_max_delay, self.webhook_base_delay * (2 ** attempt))
+        return delay * (1 + random.random() * 0.25)
     
     def resolve_alerts_for_server(self, server_id: str, alert_types: Optional[List[str]] = None) -> int:
         """
@@ -322,19 +730,14 @@ class AlertEngine:
         Returns:
             Number of alerts resolved
         """
-        active_alerts = AlertOperations.get_active_alerts(self.session, server_id)
-        resolved_count = 0
-        
-        for alert in active_alerts:
-            if alert_types is None or alert.alert_type in alert_types:
-                if AlertOperations.resolve_alert(self.session, alert.id):
-                    resolved_count += 1
-                    logger.info(f"Resolved {alert.alert_type} alert for server {server_id}")
+        resolved_ids = AlertOperations.resolve_alerts_bulk(self.session, server_id, alert_types)
         
-        if resolved_count > 0:
+        if resolved_ids:
             self.session.commit()
+            _active_alert_cache.invalidate(server_id)
+            logger.info("Resolved %d alert(s) for server %s", len(resolved_ids), server_id)
         
-        return resolved_count
+        return len(resolved_ids)
     
     def get_alert_statistics(self) -> Dict[str, Any]:
         """
@@ -354,6 +757,10 @@ class AlertEngine:
             "webhook_config": {
                 "webhook_count": len(self.webhook_urls),
                 "webhook_timeout": self.webhook_timeout,
-                "retry_attempts": self.webhook_retry_attempts
-            }
+                "retry_attempts": self.webhook_retry_attempts,
+                "retry_base_delay": self.webhook_base_delay,
+                "retry_max_delay": self.webhook_max_delay
+            },
+            "dedup_cache": _active_alert_cache.statistics(),
+            "webhook_circuits": _webhook_breaker.statistics()
         }
\ No newline at end of file
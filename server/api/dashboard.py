@@ -7,10 +7,15 @@ including authentication, user management, settings, and historical metrics.
 
 import logging
 import os
-from typing import Dict, Any, Optional, List
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.orm import Session
@@ -20,10 +25,16 @@ from server.database.connection import get_db_session
 from server.auth.dashboard_auth import DashboardAuthService
 from server.services.dashboard_settings import DashboardSettingsService
 from server.services.metrics_aggregation import MetricsAggregationService
-from server.database.operations import ServerOperations, MetricOperations, AlertOperations
-from server.database.models import ApiKey
+from server.database.models import Alert
+from server.database.operations import ServerOperations, MetricOperations, AlertOperations, ApiKeyOperations
 from server.middleware.security import metrics_rate_limit, registration_rate_limit
 
+# orjson is optional; it encodes large metric responses much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Security scheme for JWT authentication
@@ -32,6 +43,102 @@ security = HTTPBearer()
 # JWT secret from environment
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-here")
 
+# The servers overview is the same for every user; concurrent dashboards share one
+# result for a few seconds (DASHBOARD_OVERVIEW_CACHE_TTL=0 disables this)
+OVERVIEW_CACHE_TTL = float(os.getenv("DASHBOARD_OVERVIEW_CACHE_TTL", "5"))
+_servers_overview_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+_servers_overview_lock = threading.Lock()
+
+# Alphanumerics, hyphens and underscores, with at least one alphanumeric
+# ([^\W_] is exactly str.isalnum())
+_USERNAME_RE = re.compile(r"[\w-]*[^\W_][\w-]*")
+
+
+def _get_servers_overview(db_session: Session) -> List[Dict[str, Any]]:
+    """
+    Get the metrics overview of all servers, cached for OVERVIEW_CACHE_TTL seconds.
+    
+    Requests arriving while the overview is refreshed wait for that refresh
+    instead of each running the aggregation themselves.
+    
+    Args:
+        db_session: Database session used when the overview is refreshed
+        
+    Returns:
+        List of server overviews
+    """
+    global _servers_overview_cache
+    
+    # Without caching there is nothing to share, so requests run side by side
+    if OVERVIEW_CACHE_TTL <= 0:
+        return MetricsAggregationService(db_session).get_server_metrics_overview()
+    
+    with _servers_overview_lock:
+        cached = _servers_overview_cache
+        if cached is not None and time.monotonic() - cached[0] < OVERVIEW_CACHE_TTL:
+            return cached[1]
+        
+        overview = MetricsAggregationService(db_session).get_server_metrics_overview()
+        _servers_overview_cache = (time.monotonic(), overview)
+        return overview
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso_timestamp(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp, accepting a trailing 'Z' for UTC.
+    
+    Dashboards poll the same time window repeatedly, so parsed values are cached.
+    
+    Args:
+        value: ISO 8601 timestamp
+        
+    Returns:
+        Parsed datetime
+        
+    Raises:
+        ValueError: If the timestamp is not valid ISO 8601
+    """
+    if value.endswith('Z'):
+        return datetime.fromisoformat(value[:-1] + '+00:00')
+    return datetime.fromisoformat(value)
+
+
+# Alert columns returned by the alert endpoints, loaded as plain rows without ORM objects
+ALERT_RESPONSE_COLUMNS = (
+    Alert.id,
+    Alert.server_id,
+    Alert.alert_type,
+    Alert.mountpoint,
+    Alert.severity,
+    Alert.message,
+    Alert.threshold_value,
+    Alert.actual_value,
+    Alert.triggered_at,
+    Alert.resolved_at,
+    Alert.is_resolved,
+)
+
+
+def _iso_timestamp(value: Optional[datetime]) -> Optional[str]:
+    """Format a naive UTC datetime as ISO 8601 with a 'Z' suffix; None stays None."""
+    return value.isoformat() + "Z" if value else None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson when it is installed.
+    
+    Endpoints returning large payloads of plain dicts return this directly,
+    which also skips FastAPI's recursive jsonable_encoder pass.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        """Encode the content to JSON bytes."""
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
 
 # Pydantic models for request/response validation
 class LoginRequest(BaseModel):
@@ -77,7 +184,7 @@ class UserRegistrationRequest(BaseModel):
         v = v.strip()
         
         # Check for valid characters (alphanumeric, hyphens, underscores)
-        if not v.replace('-', '').replace('_', '').isalnum():
+        if not _USERNAME_RE.fullmatch(v):
             raise ValueError('Username must contain only alphanumeric characters, hyphens, and underscores')
         
         return v
@@ -93,7 +200,8 @@ class UserRegistrationRequest(BaseModel):
             return None
         
         # Basic email validation
-        if '@' not in v or '.' not in v.split('@')[-1]:
+        _, at, domain = v.rpartition('@')
+        if not at or '.' not in domain:
             raise ValueError('Invalid email format')
         
         return v
@@ -118,24 +226,55 @@ class MetricsQueryRequest(BaseModel):
     @classmethod
     def validate_timestamp(cls, v):
         try:
-            datetime.fromisoformat(v.replace('Z', '+00:00'))
+            _parse_iso_timestamp(v)
             return v
         except ValueError:
             raise ValueError('Timestamp must be in ISO 8601 format')
 
 
-# Create router for dashboard endpoints
+# Create router for dashboard endpoints. They are plain functions because they use
+# the synchronous database session; FastAPI runs them in its threadpool so database
+# I/O never blocks the event loop.
 dashboard_router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"])
 
 
+def get_auth_service(db_session: Session = Depends(get_db_session)) -> DashboardAuthService:
+    """
+    Dependency providing the dashboard authentication service for a request.
+    
+    FastAPI caches dependencies per request, so get_current_user and the
+    endpoint share a single service bound to the request's database session.
+    
+    Args:
+        db_session: Database session
+        
+    Returns:
+        Authentication service for the request
+    """
+    return DashboardAuthService(db_session, JWT_SECRET)
+
+
+def get_settings_service(db_session: Session = Depends(get_db_session)) -> DashboardSettingsService:
+    """
+    Dependency providing the dashboard settings service for a request.
+    
+    Args:
+        db_session: Database session
+        
+    Returns:
+        Settings service for the request
+    """
+    return DashboardSettingsService(db_session)
+
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security),
-                    db_session: Session = Depends(get_db_session)):
+                    auth_service: DashboardAuthService = Depends(get_auth_service)):
     """
     Dependency to get current authenticated user from JWT token.
     
     Args:
         credentials: JWT credentials from Authorization header
-        db_session: Database session
+        auth_service: Authentication service for the request
         
     Returns:
         Current user ID
@@ -143,8 +282,6 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     Raises:
         HTTPException: If authentication fails
     """
-    auth_service = DashboardAuthService(db_session, JWT_SECRET)
-    
     payload = auth_service.validate_access_token(credentials.credentials)
     if not payload:
         raise HTTPException(
@@ -156,22 +293,20 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 
 
 @dashboard_router.post("/auth/login", response_model=LoginResponse)
-async def login(request: Request, login_data: LoginRequest, 
-               db_session: Session = Depends(get_db_session)):
+def login(request: Request, login_data: LoginRequest,
+               auth_service: DashboardAuthService = Depends(get_auth_service)):
     """
     Authenticate user and return JWT tokens.
     
     Args:
         request: FastAPI request object
         login_data: Login credentials
-        db_session: Database session
+        auth_service: Authentication service for the request
         
     Returns:
         Login response with tokens and user info
     """
     try:
-        auth_service = DashboardAuthService(db_session, JWT_SECRET)
-        
         # Authenticate user
         user = auth_service.authenticate_user(login_data.username, login_data.password)
         if not user:
@@ -214,21 +349,19 @@ async def login(request: Request, login_data: LoginRequest,
 
 
 @dashboard_router.post("/auth/refresh")
-async def refresh_token(refresh_data: RefreshTokenRequest,
-                       db_session: Session = Depends(get_db_session)):
+def refresh_token(refresh_data: RefreshTokenRequest,
+                       auth_service: DashboardAuthService = Depends(get_auth_service)):
     """
     Refresh access token using refresh token.
     
     Args:
         refresh_data: Refresh token data
-        db_session: Database session
+        auth_service: Authentication service for the request
         
     Returns:
         New access and refresh tokens
     """
     try:
-        auth_service = DashboardAuthService(db_session, JWT_SECRET)
-        
         result = auth_service.refresh_access_token(refresh_data.refresh_token)
         if not result:
             raise HTTPException(
@@ -256,21 +389,19 @@ async def refresh_token(refresh_data: RefreshTokenRequest,
 
 
 @dashboard_router.post("/auth/logout")
-async def logout(current_user_id: int = Depends(get_current_user),
-                db_session: Session = Depends(get_db_session)):
+def logout(current_user_id: int = Depends(get_current_user),
+                auth_service: DashboardAuthService = Depends(get_auth_service)):
     """
     Logout current user session.
     
     Args:
         current_user_id: Current authenticated user ID
-        db_session: Database session
+        auth_service: Authentication service for the request
         
     Returns:
         Logout confirmation
     """
     try:
-        auth_service = DashboardAuthService(db_session, JWT_SECRET)
-        
         # Logout all sessions for the user
         logged_out_count = auth_service.logout_all_sessions(current_user_id)
         
@@ -291,22 +422,20 @@ async def logout(current_user_id: int = Depends(get_current_user),
 
 @dashboard_router.post("/auth/register")
 @registration_rate_limit()
-async def register_user(request: Request, registration_data: UserRegistrationRequest,
-                       db_session: Session = Depends(get_db_session)):
+def register_user(request: Request, registration_data: UserRegistrationRequest,
+                       auth_service: DashboardAuthService = Depends(get_auth_service)):
     """
     Register a new dashboard user.
     
     Args:
         request: FastAPI request object
         registration_data: User registration data
-        db_session: Database session
+        auth_service: Authentication service for the request
         
     Returns:
         Registration confirmation
     """
     try:
-        auth_service = DashboardAuthService(db_session, JWT_SECRET)
-        
         # Create user
         user = auth_service.create_user(
             username=registration_data.username,
@@ -340,20 +469,19 @@ async def register_user(request: Request, registration_data: UserRegistrationReq
 
 
 @dashboard_router.get("/user/profile")
-async def get_user_profile(current_user_id: int = Depends(get_current_user),
-                          db_session: Session = Depends(get_db_session)):
+def get_user_profile(current_user_id: int = Depends(get_current_user),
+                          auth_service: DashboardAuthService = Depends(get_auth_service)):
     """
     Get current user profile information.
     
     Args:
         current_user_id: Current authenticated user ID
-        db_session: Database session
+        auth_service: Authentication service for the request
         
     Returns:
         User profile information
     """
     try:
-        auth_service = DashboardAuthService(db_session, JWT_SECRET)
         user = auth_service.get_user_by_id(current_user_id)
         
         if not user:
@@ -384,20 +512,19 @@ async def get_user_profile(current_user_id: int = Depends(get_current_user),
 
 
 @dashboard_router.get("/settings")
-async def get_user_settings(current_user_id: int = Depends(get_current_user),
-                           db_session: Session = Depends(get_db_session)):
+def get_user_settings(current_user_id: int = Depends(get_current_user),
+                           settings_service: DashboardSettingsService = Depends(get_settings_service)):
     """
     Get user dashboard settings.
     
     Args:
         current_user_id: Current authenticated user ID
-        db_session: Database session
+        settings_service: Settings service for the request
         
     Returns:
         User dashboard settings
     """
     try:
-        settings_service = DashboardSettingsService(db_session)
         settings = settings_service.get_user_settings(current_user_id)
         
         if not settings:
@@ -439,30 +566,28 @@ async def get_user_settings(current_user_id: int = Depends(get_current_user),
 
 
 @dashboard_router.put("/settings")
-async def update_user_settings(settings_data: SettingsUpdateRequest,
+def update_user_settings(settings_data: SettingsUpdateRequest,
                               current_user_id: int = Depends(get_current_user),
-                              db_session: Session = Depends(get_db_session)):
+                              settings_service: DashboardSettingsService = Depends(get_settings_service)):
     """
     Update user dashboard settings.
     
     Args:
         settings_data: Settings update data
         current_user_id: Current authenticated user ID
-        db_session: Database session
+        settings_service: Settings service for the request
         
     Returns:
         Update confirmation
     """
     try:
-        settings_service = DashboardSettingsService(db_session)
-        
         # Ensure user has settings record
         existing_settings = settings_service.get_user_settings(current_user_id)
         if not existing_settings:
             settings_service.create_default_settings(current_user_id)
         
         # Convert frontend format to backend format
-        backend_data = settings_data.dict(exclude_unset=True)
+        backend_data = settings_data.model_dump(exclude_unset=True)
         
         # Handle refresh_interval conversion (frontend sends milliseconds, backend stores seconds)
         if "refresh_interval" in backend_data:
@@ -492,21 +617,19 @@ async def update_user_settings(settings_data: SettingsUpdateRequest,
 
 
 @dashboard_router.post("/settings/reset")
-async def reset_user_settings(current_user_id: int = Depends(get_current_user),
-                             db_session: Session = Depends(get_db_session)):
+def reset_user_settings(current_user_id: int = Depends(get_current_user),
+                             settings_service: DashboardSettingsService = Depends(get_settings_service)):
     """
     Reset user settings to defaults.
     
     Args:
         current_user_id: Current authenticated user ID
-        db_session: Database session
+        settings_service: Settings service for the request
         
     Returns:
         Reset confirmation
     """
     try:
-        settings_service = DashboardSettingsService(db_session)
-        
         success = settings_service.reset_user_settings(current_user_id)
         
         if not success:
@@ -527,9 +650,9 @@ async def reset_user_settings(current_user_id: int = Depends(get_current_user),
         )
 
 
-@dashboard_router.get("/servers")
+@dashboard_router.get("/servers", response_class=FastJSONResponse)
 @metrics_rate_limit()
-async def get_servers_overview(request: Request,
+def get_servers_overview(request: Request,
                               current_user_id: int = Depends(get_current_user),
                               db_session: Session = Depends(get_db_session)):
     """
@@ -543,14 +666,13 @@ async def get_servers_overview(request: Request,
         List of server overviews with current status
     """
     try:
-        metrics_service = MetricsAggregationService(db_session)
-        servers_overview = metrics_service.get_server_metrics_overview()
+        servers_overview = _get_servers_overview(db_session)
         
-        return {
+        return FastJSONResponse({
             "servers": servers_overview,
             "total_count": len(servers_overview),
             "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+        })
         
     except Exception as e:
         logger.error(f"Servers overview error: {e}")
@@ -560,9 +682,9 @@ async def get_servers_overview(request: Request,
         )
 
 
-@dashboard_router.get("/servers/{server_id}/metrics")
+@dashboard_router.get("/servers/{server_id}/metrics", response_class=FastJSONResponse)
 @metrics_rate_limit()
-async def get_server_metrics(request: Request,
+def get_server_metrics(request: Request,
                             server_id: str,
                             start_time: str = Query(..., description="ISO 8601 start time"),
                             end_time: str = Query(..., description="ISO 8601 end time"),
@@ -586,8 +708,8 @@ async def get_server_metrics(request: Request,
     try:
         # Validate timestamps
         try:
-            start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-            end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+            start_dt = _parse_iso_timestamp(start_time)
+            end_dt = _parse_iso_timestamp(end_time)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -614,14 +736,14 @@ async def get_server_metrics(request: Request,
             server_id, start_dt, end_dt, interval_minutes
         )
         
-        return {
+        return FastJSONResponse({
             "server_id": server_id,
             "start_time": start_time,
             "end_time": end_time,
             "interval_minutes": interval_minutes,
             "data_points": len(metrics_data),
             "metrics": metrics_data
-        }
+        })
         
     except HTTPException:
         raise
@@ -635,7 +757,7 @@ async def get_server_metrics(request: Request,
 
 @dashboard_router.get("/servers/{server_id}/summary")
 @metrics_rate_limit()
-async def get_server_summary(request: Request,
+def get_server_summary(request: Request,
                             server_id: str,
                             current_user_id: int = Depends(get_current_user),
                             db_session: Session = Depends(get_db_session)):
@@ -672,9 +794,9 @@ async def get_server_summary(request: Request,
         )
 
 
-@dashboard_router.get("/alerts")
+@dashboard_router.get("/alerts", response_class=FastJSONResponse)
 @metrics_rate_limit()
-async def get_alerts(request: Request,
+def get_alerts(request: Request,
                     active_only: bool = Query(default=True),
                     server_id: Optional[str] = Query(default=None),
                     current_user_id: int = Depends(get_current_user),
@@ -693,33 +815,35 @@ async def get_alerts(request: Request,
     """
     try:
         if active_only:
-            alerts = AlertOperations.get_active_alerts(db_session, server_id)
+            alerts = AlertOperations.get_active_alerts(db_session, server_id, ALERT_RESPONSE_COLUMNS)
         else:
             # For historical alerts, we'd need to implement a method in AlertOperations
             # For now, just return active alerts
-            alerts = AlertOperations.get_active_alerts(db_session, server_id)
+            alerts = AlertOperations.get_active_alerts(db_session, server_id, ALERT_RESPONSE_COLUMNS)
         
-        alerts_data = []
-        for alert in alerts:
-            alerts_data.append({
+        alerts_data = [
+            {
                 "id": alert.id,
                 "server_id": alert.server_id,
                 "type": alert.alert_type,
+                "mountpoint": alert.mountpoint,
                 "severity": alert.severity,
                 "message": alert.message,
                 "threshold_value": alert.threshold_value,
                 "actual_value": alert.actual_value,
-                "triggered_at": alert.triggered_at.isoformat() + "Z",
-                "resolved_at": alert.resolved_at.isoformat() + "Z" if alert.resolved_at else None,
+                "triggered_at": _iso_timestamp(alert.triggered_at),
+                "resolved_at": _iso_timestamp(alert.resolved_at),
                 "is_resolved": alert.is_resolved
-            })
+            }
+            for alert in alerts
+        ]
         
-        return {
+        return FastJSONResponse({
             "alerts": alerts_data,
             "total_count": len(alerts_data),
             "active_only": active_only,
             "server_id": server_id
-        }
+        })
         
     except Exception as e:
         logger.error(f"Alerts retrieval error: {e}")
@@ -752,7 +876,7 @@ class ApiKeyRegenerationRequest(BaseModel):
 
 
 @dashboard_router.get("/management/servers")
-async def get_managed_servers(current_user_id: int = Depends(get_current_user),
+def get_managed_servers(current_user_id: int = Depends(get_current_user),
                              db_session: Session = Depends(get_db_session)):
     """
     Get list of all registered servers for management.
@@ -765,16 +889,11 @@ async def get_managed_servers(current_user_id: int = Depends(get_current_user),
         List of registered servers with management information
     """
     try:
-        servers = ServerOperations.get_all_servers(db_session)
+        # Servers and their active API keys in one query
+        servers = ServerOperations.get_all_servers_with_api_keys(db_session)
         
         servers_data = []
-        for server in servers:
-            # Get API key information
-            api_key = db_session.query(ApiKey).filter(
-                ApiKey.server_id == server.server_id,
-                ApiKey.is_active == True
-            ).first()
-            
+        for server, api_key in servers:
             servers_data.append({
                 "server_id": server.server_id,
                 "hostname": server.hostname,
@@ -802,7 +921,7 @@ async def get_managed_servers(current_user_id: int = Depends(get_current_user),
 
 @dashboard_router.post("/management/servers/register")
 @registration_rate_limit()
-async def register_server_via_dashboard(request: Request, 
+def register_server_via_dashboard(request: Request, 
                                        registration_data: ServerRegistrationRequest,
                                        current_user_id: int = Depends(get_current_user),
                                        db_session: Session = Depends(get_db_session)):
@@ -880,7 +999,7 @@ async def register_server_via_dashboard(request: Request,
 
 
 @dashboard_router.post("/management/servers/{server_id}/regenerate-key")
-async def regenerate_server_api_key(server_id: str,
+def regenerate_server_api_key(server_id: str,
                                    regeneration_data: ApiKeyRegenerationRequest,
                                    current_user_id: int = Depends(get_current_user),
                                    db_session: Session = Depends(get_db_session)):
@@ -907,14 +1026,8 @@ async def regenerate_server_api_key(server_id: str,
                 detail="Server not found"
             )
         
-        # Deactivate existing API keys for this server
-        existing_keys = db_session.query(ApiKey).filter(
-            ApiKey.server_id == server_id,
-            ApiKey.is_active == True
-        ).all()
-        
-        for key in existing_keys:
-            key.is_active = False
+        # Deactivate existing API keys for this server; committed with the new key
+        keys_deactivated = ApiKeyOperations.deactivate_server_api_keys(db_session, server_id)
         
         # Generate new API key
         auth_service = AuthenticationService(db_session)
@@ -931,7 +1044,7 @@ async def regenerate_server_api_key(server_id: str,
             "api_key": new_api_key,
             "key_id": key_id,
             "regenerated_at": datetime.utcnow().isoformat() + "Z",
-            "previous_keys_deactivated": len(existing_keys)
+            "previous_keys_deactivated": keys_deactivated
         }
         
     except HTTPException:
@@ -945,7 +1058,7 @@ async def regenerate_server_api_key(server_id: str,
 
 
 @dashboard_router.delete("/management/servers/{server_id}")
-async def deregister_server(server_id: str,
+def deregister_server(server_id: str,
                            current_user_id: int = Depends(get_current_user),
                            db_session: Session = Depends(get_db_session)):
     """
@@ -969,10 +1082,7 @@ async def deregister_server(server_id: str,
             )
         
         # Deactivate all API keys for this server
-        api_keys_updated = db_session.query(ApiKey).filter(
-            ApiKey.server_id == server_id,
-            ApiKey.is_active == True
-        ).update({"is_active": False})
+        api_keys_updated = ApiKeyOperations.deactivate_server_api_keys(db_session, server_id)
         
         # Mark server as inactive (soft delete to preserve historical data)
         server.is_active = False
@@ -1000,7 +1110,7 @@ async def deregister_server(server_id: str,
 
 @dashboard_router.get("/metrics/aggregated")
 @metrics_rate_limit()
-async def get_aggregated_metrics(request: Request,
+def get_aggregated_metrics(request: Request,
                                 time_range: str = Query(default="24h", regex="^(1h|6h|24h|7d|30d)$"),
                                 current_user_id: int = Depends(get_current_user),
                                 db_session: Session = Depends(get_db_session)):
@@ -1076,7 +1186,7 @@ async def get_aggregated_metrics(request: Request,
 
 @dashboard_router.get("/alerts/history")
 @metrics_rate_limit()
-async def get_alert_history(request: Request,
+def get_alert_history(request: Request,
                            days: int = Query(default=7, ge=1, le=90),
                            server_id: Optional[str] = Query(default=None),
                            alert_type: Optional[str] = Query(default=None),
@@ -1097,12 +1207,10 @@ async def get_alert_history(request: Request,
         Historical alerts data
     """
     try:
-        from server.database.models import Alert
-        
         cutoff_time = datetime.utcnow() - timedelta(days=days)
         
         # Build query with filters
-        query = db_session.query(Alert).filter(
+        query = db_session.query(*ALERT_RESPONSE_COLUMNS).filter(
             Alert.triggered_at >= cutoff_time
         )
         
@@ -1114,24 +1222,26 @@ async def get_alert_history(request: Request,
         
         alerts = query.order_by(desc(Alert.triggered_at)).all()
         
-        alerts_data = []
-        for alert in alerts:
-            alerts_data.append({
+        alerts_data = [
+            {
                 "id": alert.id,
                 "server_id": alert.server_id,
                 "type": alert.alert_type,
+                "mountpoint": alert.mountpoint,
                 "severity": alert.severity,
                 "message": alert.message,
                 "threshold_value": alert.threshold_value,
                 "actual_value": alert.actual_value,
-                "triggered_at": alert.triggered_at.isoformat() + "Z",
-                "resolved_at": alert.resolved_at.isoformat() + "Z" if alert.resolved_at else None,
+                "triggered_at": _iso_timestamp(alert.triggered_at),
+                "resolved_at": _iso_timestamp(alert.resolved_at),
                 "is_resolved": alert.is_resolved,
                 "duration_minutes": (
                     (alert.resolved_at - alert.triggered_at).total_seconds() / 60
                     if alert.resolved_at else None
                 )
-            })
+            }
+            for alert in alerts
+        ]
         
         # Calculate statistics
         total_alerts = len(alerts_data)
@@ -6,6 +6,7 @@ agent metrics, health checks, and agent registration.
 """
 
 import logging
+import re
 from typing import Dict, Any, Optional
 from datetime import datetime
 
@@ -19,6 +20,7 @@ from sqlalchemy.orm import Session
 from server.database.connection import get_db_session
 from server.auth.service import AuthenticationService
 from server.database.manager import DatabaseManager
+from server.middleware.compression import GzipRequestMiddleware
 from server.middleware.security import (
     SecurityMiddleware, 
     setup_rate_limiting, 
@@ -30,6 +32,12 @@ from shared.models import SystemMetrics, MemoryInfo, DiskUsage, LoadAverage, Fai
 
 logger = logging.getLogger(__name__)
 
+# Precompiled validators; [^\W_] is exactly str.isalnum(), so these accept the
+# same identifiers as stripping the punctuation and calling isalnum()
+_SERVICE_NAME_RE = re.compile(r"[\w.@-]*[^\W_][\w.@-]*")
+_SERVER_ID_RE = re.compile(r"[\w.-]*[^\W_][\w.-]*")
+_SUSPICIOUS_SERVER_ID_RE = re.compile(r"\.\.|--|__|admin|root|system|null|undefined", re.IGNORECASE)
+
 # Security scheme for API key authentication
 security = HTTPBearer()
 
@@ -113,7 +121,7 @@ class FailedServiceModel(BaseModel):
         v = v.strip()
         
         # Check for valid service name format (systemd service names)
-        if not v.replace('-', '').replace('_', '').replace('.', '').replace('@', '').isalnum():
+        if not _SERVICE_NAME_RE.fullmatch(v):
             raise ValueError('Service name contains invalid characters')
         
         # Prevent path traversal and injection attempts
@@ -196,19 +204,22 @@ class MetricsRequestModel(BaseModel):
             raise ValueError('Server ID must be between 1 and 255 characters')
         
         # Check for valid characters (alphanumeric, hyphens, underscores, dots)
-        if not v.replace('-', '').replace('_', '').replace('.', '').isalnum():
+        if not _SERVER_ID_RE.fullmatch(v):
             raise ValueError('Server ID must contain only alphanumeric characters, hyphens, underscores, and dots')
         
         # Prevent suspicious patterns
-        suspicious_patterns = ['..', '--', '__', 'admin', 'root', 'system', 'null', 'undefined']
-        v_lower = v.lower()
-        for pattern in suspicious_patterns:
-            if pattern in v_lower:
-                raise ValueError('Server ID contains invalid pattern')
+        if _SUSPICIOUS_SERVER_ID_RE.search(v):
+            raise ValueError('Server ID contains invalid pattern')
         
         return v
 
 
+class MetricsBatchRequestModel(BaseModel):
+    """Pydantic model for a batch of metrics samples sent in one request."""
+    metrics: list[MetricsRequestModel] = Field(..., min_length=1, max_length=1000,
+                                               description="Metrics samples, oldest first")
+
+
 class RegistrationRequestModel(BaseModel):
     """Pydantic model for agent registration request."""
     server_id: str = Field(..., min_length=1, max_length=255, description="Unique server identifier")
@@ -230,15 +241,12 @@ class RegistrationRequestModel(BaseModel):
             raise ValueError('Server ID must be between 1 and 255 characters')
         
         # Check for valid characters (alphanumeric, hyphens, underscores, dots)
-        if not v.replace('-', '').replace('_', '').replace('.', '').isalnum():
+        if not _SERVER_ID_RE.fullmatch(v):
             raise ValueError('Server ID must contain only alphanumeric characters, hyphens, underscores, and dots')
         
         # Prevent suspicious patterns
-        suspicious_patterns = ['..', '--', '__', 'admin', 'root', 'system', 'null', 'undefined']
-        v_lower = v.lower()
-        for pattern in suspicious_patterns:
-            if pattern in v_lower:
-                raise ValueError('Server ID contains invalid pattern')
+        if _SUSPICIOUS_SERVER_ID_RE.search(v):
+            raise ValueError('Server ID contains invalid pattern')
         
         return v
 
@@ -290,6 +298,10 @@ class MetricsAPI:
             allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
         )
         
+        # Inflate gzip-compressed agent payloads; added last so it runs before
+        # the security middleware inspects the request body
+        self.app.add_middleware(GzipRequestMiddleware)
+        
         # Register routes
         self._register_routes()
         
@@ -312,6 +324,19 @@ class MetricsAPI:
         ) -> Dict[str, Any]:
             return await self._submit_metrics(metrics_data, credentials, db_session)
 
+        @self.app.post("/api/v1/metrics/batch",
+                      status_code=status.HTTP_201_CREATED,
+                      summary="Submit a batch of server metrics",
+                      description="Endpoint for agents to submit several buffered metrics samples at once")
+        @metrics_rate_limit()
+        async def submit_metrics_batch(
+            request: Request,
+            batch_data: MetricsBatchRequestModel,
+            credentials: HTTPAuthorizationCredentials = Depends(security),
+            db_session: Session = Depends(get_db_session)
+        ) -> Dict[str, Any]:
+            return await self._submit_metrics_batch(batch_data, credentials, db_session)
+
         @self.app.get("/api/v1/health",
                      status_code=status.HTTP_200_OK,
                      summary="Health check endpoint",
@@ -402,6 +427,79 @@ class MetricsAPI:
                 detail="Internal server error processing metrics"
             )
 
+    async def _submit_metrics_batch(
+        self,
+        batch_data: MetricsBatchRequestModel,
+        credentials: HTTPAuthorizationCredentials,
+        db_session: Session
+    ) -> Dict[str, Any]:
+        """
+        Handle a batch of metrics samples from an agent.
+        
+        Args:
+            batch_data: Validated batch of metrics samples
+            credentials: API key credentials from Authorization header
+            db_session: Database session for operations
+            
+        Returns:
+            Success response with the number of stored samples
+            
+        Raises:
+            HTTPException: For authentication or processing errors
+        """
+        try:
+            # Authenticate once for the whole batch
+            auth_service = AuthenticationService(db_session)
+            api_key_record = auth_service.validate_api_key(credentials.credentials)
+            
+            if not api_key_record:
+                logger.warning("Invalid API key used for batch metrics submission")
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired API key"
+                )
+            
+            metrics_list = [
+                self._convert_to_system_metrics(metrics_data)
+                for metrics_data in batch_data.metrics
+            ]
+            
+            known_servers = set()
+            for system_metrics in metrics_list:
+                if system_metrics.server_id not in known_servers:
+                    self.db_manager.ensure_server_exists(
+                        server_id=system_metrics.server_id,
+                        hostname=None,
+                        ip_address=None
+                    )
+                    known_servers.add(system_metrics.server_id)
+            
+            # One transaction and one multi-row INSERT for the whole batch
+            if not self.db_manager.store_metrics_batch(metrics_list):
+                logger.error(f"Failed to store metrics batch for servers {sorted(known_servers)}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to store metrics"
+                )
+            
+            logger.info(f"Successfully stored batch of {len(batch_data.metrics)} metrics samples")
+            
+            return {
+                "status": "success",
+                "message": "Metrics batch received and stored successfully",
+                "count": len(batch_data.metrics),
+                "server_ids": sorted(known_servers)
+            }
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error processing metrics batch: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error processing metrics"
+            )
+
     async def _health_check(self) -> Dict[str, Any]:
         """
         Perform health check of the monitoring server.
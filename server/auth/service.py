@@ -5,14 +5,76 @@ This module provides secure API key generation, hashing, and validation
 functionality for the Linux Server Health Monitoring System.
 """
 
+import os
 import secrets
 import hashlib
-from typing import Optional, Tuple
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from server.database.models import ApiKey, Server
 
 
+class LegacyKeyFallback:
+    """
+    Guards the PBKDF2 scan over keys still stored with the legacy salted hash.
+    
+    Every unknown bearer token would otherwise cost one 100k-iteration
+    PBKDF2 per remaining legacy key. Scans are limited to ``max_per_minute``
+    per process, and stop for good once no active legacy keys remain (new
+    keys are never stored in the legacy format).
+    """
+    
+    def __init__(self, max_per_minute: int = 30):
+        """
+        Initialize the fallback guard.
+        
+        Args:
+            max_per_minute: Legacy scans allowed per minute; 0 disables the fallback
+        """
+        self.max_per_minute = max_per_minute
+        self.retired = False
+        self._scans: deque = deque()
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """
+        Check whether a legacy scan may run now, counting it if so.
+        
+        Returns:
+            True if the scan is within the rate limit and legacy keys may remain
+        """
+        if self.retired or self.max_per_minute <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._scans and now - self._scans[0] >= 60:
+                self._scans.popleft()
+            if len(self._scans) >= self.max_per_minute:
+                return False
+            self._scans.append(now)
+            return True
+    
+    def retire(self) -> None:
+        """Stop scanning; called once no active legacy keys remain."""
+        self.retired = True
+    
+    def reset(self) -> None:
+        """Re-enable scanning and forget the recent scans."""
+        with self._lock:
+            self.retired = False
+            self._scans.clear()
+
+
+# Process-wide, since a service instance is created per request
+_legacy_fallback = LegacyKeyFallback(
+    max_per_minute=int(os.getenv("AUTH_LEGACY_FALLBACK_PER_MINUTE", "30"))
+)
+
+
 class AuthenticationService:
     """
     Service for managing API key authentication and security.
@@ -24,6 +86,11 @@ class AuthenticationService:
     # Minimum entropy for API keys (32 bytes = 256 bits)
     MIN_KEY_ENTROPY_BYTES = 32
     
+    # Hashes written before keys were stored as plain SHA-256 digests:
+    # hex of a 32-byte salt + PBKDF2-SHA256 digest
+    LEGACY_HASH_LENGTH = 128
+    LEGACY_PBKDF2_ITERATIONS = 100000
+    
     def __init__(self, db_session: Session):
         """
         Initialize the authentication service.
@@ -76,7 +143,6 @@ class AuthenticationService:
             server_id=server_id,
             description=description,
             expires_at=expires_at,
-            created_at=datetime.utcnow(),
             is_active=True
         )
         
@@ -101,26 +167,73 @@ class AuthenticationService:
         if not raw_key:
             return None
         
-        # Get all active API key records and check each one
-        active_keys = self.db_session.query(ApiKey).filter(
+        # Single indexed lookup on the deterministic digest
+        key_hash = self._hash_api_key(raw_key)
+        api_key_record = self.db_session.query(ApiKey).filter(
+            ApiKey.key_hash == key_hash,
             ApiKey.is_active == True
-        ).all()
+        ).first()
+        
+        if api_key_record is None:
+            api_key_record = self._find_legacy_api_key(raw_key, key_hash)
+            if api_key_record is None:
+                return None
         
-        for api_key_record in active_keys:
-            # Verify the key against this record's hash
-            if self._verify_key_hash(raw_key, api_key_record.key_hash):
-                # Check expiration
-                if api_key_record.expires_at and api_key_record.expires_at < datetime.utcnow():
-                    return None
-                
-                # Update last used timestamp
-                api_key_record.last_used = datetime.utcnow()
-                self.db_session.commit()
-                
+        # Check expiration
+        if api_key_record.expires_at and api_key_record.expires_at < datetime.utcnow():
+            return None
+        
+        # Update last used timestamp
+        api_key_record.last_used = datetime.utcnow()
+        self.db_session.commit()
+        
+        return api_key_record
+    
+    def _find_legacy_api_key(self, raw_key: str, key_hash: str) -> Optional[ApiKey]:
+        """
+        Find an active key still stored with a legacy salted PBKDF2 hash.
+        
+        A matching record is rewritten to the SHA-256 digest so later
+        validations take the indexed lookup path. Scans are rate limited and
+        end once no legacy keys remain (see LegacyKeyFallback).
+        
+        Args:
+            raw_key: The raw API key to validate
+            key_hash: SHA-256 digest of the raw key
+            
+        Returns:
+            Matching ApiKey record, or None
+        """
+        if not _legacy_fallback.allow():
+            return None
+        
+        legacy_keys = self.list_legacy_api_keys()
+        if not legacy_keys:
+            _legacy_fallback.retire()
+            return None
+        
+        for api_key_record in legacy_keys:
+            if self._verify_legacy_key_hash(raw_key, api_key_record.key_hash):
+                api_key_record.key_hash = key_hash
                 return api_key_record
         
         return None
     
+    def list_legacy_api_keys(self) -> List[ApiKey]:
+        """
+        List active keys still stored with the legacy salted PBKDF2 hash.
+        
+        Each is rehashed the first time its agent authenticates; revoking the
+        rest (see the database CLI's legacy-keys command) ends the fallback.
+        
+        Returns:
+            List of active legacy ApiKey records
+        """
+        return self.db_session.query(ApiKey).filter(
+            ApiKey.is_active == True,
+            func.length(ApiKey.key_hash) == self.LEGACY_HASH_LENGTH
+        ).all()
+    
     def revoke_api_key(self, key_id: str) -> bool:
         """
         Revoke an API key by marking it as inactive.
@@ -189,28 +302,23 @@ class AuthenticationService:
     
     def _hash_api_key(self, raw_key: str) -> str:
         """
-        Hash an API key for secure storage.
+        Hash an API key for storage and lookup.
         
-        Uses SHA-256 with a random salt for secure hashing.
+        Keys carry 256 bits of randomness, so a plain SHA-256 digest is safe
+        against brute force without a salt or key stretching. Being
+        deterministic, it can be looked up through the unique key_hash index.
         
         Args:
             raw_key: The raw API key to hash
             
         Returns:
-            Hashed key suitable for database storage (salt + hash)
+            Hex-encoded SHA-256 digest (64 characters)
         """
-        # Generate a random salt
-        salt = secrets.token_bytes(32)
-        
-        # Hash the key with the salt
-        key_hash = hashlib.pbkdf2_hmac('sha256', raw_key.encode('utf-8'), salt, 100000)
-        
-        # Return salt + hash as hex string
-        return (salt + key_hash).hex()
+        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
     
-    def _verify_key_hash(self, raw_key: str, key_hash: str) -> bool:
+    def _verify_legacy_key_hash(self, raw_key: str, key_hash: str) -> bool:
         """
-        Verify a raw key against a stored hash.
+        Verify a raw key against a legacy salted PBKDF2 hash.
         
         Args:
             raw_key: The raw API key to verify
@@ -228,7 +336,8 @@ class AuthenticationService:
             stored_hash = stored_bytes[32:]
             
             # Hash the provided key with the same salt
-            computed_hash = hashlib.pbkdf2_hmac('sha256', raw_key.encode('utf-8'), salt, 100000)
+            computed_hash = hashlib.pbkdf2_hmac('sha256', raw_key.encode('utf-8'), salt,
+                                                self.LEGACY_PBKDF2_ITERATIONS)
             
             # Compare hashes using constant-time comparison
             return secrets.compare_digest(computed_hash, stored_hash)
@@ -81,6 +81,28 @@ def show_stats():
         sys.exit(1)
 
 
+def legacy_keys(revoke: bool):
+    """List, and optionally revoke, API keys still stored with the legacy hash."""
+    try:
+        from server.auth.service import AuthenticationService
+        
+        with db_manager.get_session() as session:
+            legacy = AuthenticationService(session).list_legacy_api_keys()
+            
+            print(f"Active API keys with a legacy hash: {len(legacy)}")
+            for api_key in legacy:
+                last_used = api_key.last_used.isoformat() if api_key.last_used else "never"
+                print(f"  id={api_key.id} server={api_key.server_id} last used {last_used}")
+            
+            if revoke and legacy:
+                for api_key in legacy:
+                    api_key.is_active = False
+                print(f"Revoked {len(legacy)} legacy API keys; their agents must re-register")
+    except Exception as e:
+        print(f"Error checking legacy API keys: {e}")
+        sys.exit(1)
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(description="Database management for monitoring system")
@@ -100,6 +122,12 @@ def main():
     # Stats command
     subparsers.add_parser('stats', help='Show database statistics')
     
+    # Legacy API keys command
+    legacy_parser = subparsers.add_parser('legacy-keys',
+                                          help='List API keys still stored with the legacy hash')
+    legacy_parser.add_argument('--revoke', action='store_true',
+                               help='Revoke them, ending the legacy validation fallback')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -114,6 +142,8 @@ def main():
         cleanup_metrics(args.days)
     elif args.command == 'stats':
         show_stats()
+    elif args.command == 'legacy-keys':
+        legacy_keys(args.revoke)
     else:
         parser.print_help()
         sys.exit(1)
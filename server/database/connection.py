@@ -6,7 +6,7 @@ Provides SQLAlchemy engine, session factory, and connection utilities.
 
 import os
 from typing import Generator, Optional
-from sqlalchemy import create_engine, Engine
+from sqlalchemy import create_engine, Engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
@@ -16,6 +16,9 @@ from .models import Base
 
 logger = logging.getLogger(__name__)
 
+# Monthly metrics partitions kept ready ahead of the current month
+METRICS_PARTITIONS_AHEAD = 3
+
 
 class DatabaseManager:
     """Manages database connections and sessions."""
@@ -77,6 +80,37 @@ class DatabaseManager:
             logger.error(f"Failed to create database tables: {e}")
             raise
     
+    def create_metrics_partitions(self, months_ahead: int = METRICS_PARTITIONS_AHEAD) -> bool:
+        """
+        Create the monthly metrics partitions for the coming months.
+        
+        Only applies to PostgreSQL databases whose metrics table was
+        partitioned by migration 006; does nothing elsewhere.
+        
+        Args:
+            months_ahead: Number of months after the current one to cover
+            
+        Returns:
+            bool: True if the partitions were checked, False if not applicable
+        """
+        if self.engine.dialect.name != "postgresql":
+            return False
+        try:
+            with self.get_session() as session:
+                function = session.execute(
+                    text("SELECT to_regprocedure('create_metrics_partitions(integer)')")
+                ).scalar()
+                if function is None:
+                    return False
+                session.execute(
+                    text("SELECT create_metrics_partitions(:months_ahead)"),
+                    {"months_ahead": months_ahead}
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to create metrics partitions: {e}")
+            raise
+    
     def drop_tables(self) -> None:
         """Drop all database tables (use with caution)."""
         try:
@@ -107,7 +141,6 @@ class DatabaseManager:
     def health_check(self) -> bool:
         """Check database connectivity."""
         try:
-            from sqlalchemy import text
             with self.get_session() as session:
                 session.execute(text("SELECT 1"))
             return True
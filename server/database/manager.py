@@ -6,7 +6,7 @@ and provides business logic for metrics storage, server management, and health t
 """
 
 import logging
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 from shared.interfaces import DatabaseManagerInterface
@@ -51,6 +51,27 @@ class DatabaseManager(DatabaseManagerInterface):
             logger.error(f"Failed to store metrics for server {metrics.server_id}: {e}")
             return False
     
+    def store_metrics_batch(self, metrics_list: List[SystemMetrics]) -> bool:
+        """
+        Store several metrics samples in one transaction.
+        
+        Args:
+            metrics_list: SystemMetrics samples to store
+            
+        Returns:
+            bool: True if all samples were stored, False otherwise
+        """
+        try:
+            with self.connection_manager.get_session() as session:
+                count = MetricOperations.store_metrics_batch(session, metrics_list)
+                
+                logger.info(f"Stored batch of {count} metrics samples")
+                return True
+                
+        except Exception as e:
+            logger.error(f"Failed to store batch of {len(metrics_list)} metrics samples: {e}")
+            return False
+    
     def get_server_status(self, server_id: str) -> Optional[str]:
         """
         Get current health status of a server.
@@ -9,14 +9,18 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Text, Boolean, 
-    ForeignKey, JSON, Index, UniqueConstraint
+    ForeignKey, JSON, Index, UniqueConstraint, text
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+# Binary JSONB on PostgreSQL (no re-parse on read, GIN-indexable); plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Server(Base):
     """Server registration and metadata."""
@@ -26,8 +30,8 @@ class Server(Base):
     server_id = Column(String(255), unique=True, nullable=False, index=True)
     hostname = Column(String(255), nullable=True)
     ip_address = Column(String(45), nullable=True)  # IPv6 compatible
-    registered_at = Column(DateTime, default=func.now(), nullable=False)
-    last_seen = Column(DateTime, default=func.now(), nullable=False)
+    registered_at = Column(DateTime, server_default=func.now(), nullable=False)
+    last_seen = Column(DateTime, server_default=func.now(), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     
     # Relationships
@@ -40,12 +44,19 @@ class Server(Base):
 
 
 class Metric(Base):
-    """Time-series metrics data from agents."""
+    """
+    Time-series metrics data from agents.
+
+    On PostgreSQL, migration 006 range-partitions the table by month on
+    ``timestamp``, with (id, timestamp) as the primary key. ``id`` still comes
+    from a sequence and is unique, so the model keys on it alone and stays
+    insertable on every backend.
+    """
     __tablename__ = "metrics"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     server_id = Column(String(255), ForeignKey("servers.server_id"), nullable=False)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    timestamp = Column(DateTime, nullable=False)
     
     # System metrics
     cpu_usage = Column(Float, nullable=False)
@@ -54,7 +65,7 @@ class Metric(Base):
     memory_percentage = Column(Float, nullable=False)
     
     # Disk usage stored as JSON array
-    disk_usage = Column(JSON, nullable=False)
+    disk_usage = Column(JSONType, nullable=False)
     
     # Load average
     load_1min = Column(Float, nullable=False)
@@ -65,10 +76,7 @@ class Metric(Base):
     uptime = Column(Integer, nullable=False)
     
     # Failed services stored as JSON array
-    failed_services = Column(JSON, nullable=False, default=list)
-    
-    # Metadata
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    failed_services = Column(JSONType, nullable=False, default=list)
     
     # Relationships
     server = relationship("Server", back_populates="metrics")
@@ -76,7 +84,11 @@ class Metric(Base):
     # Indexes for performance
     __table_args__ = (
         Index('idx_metrics_server_timestamp', 'server_id', 'timestamp'),
-        Index('idx_metrics_timestamp', 'timestamp'),
+        Index('idx_metrics_timestamp_brin', 'timestamp',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        Index('idx_metrics_disk_gin', 'disk_usage', postgresql_using='gin'),
+        Index('idx_metrics_failed_gin', 'failed_services', postgresql_using='gin',
+              postgresql_where=text("failed_services <> '[]'::jsonb")),
     )
 
     def __repr__(self):
@@ -88,18 +100,31 @@ class ApiKey(Base):
     __tablename__ = "api_keys"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    key_hash = Column(String(255), unique=True, nullable=False, index=True)
+    # SHA-256 hex (64); legacy salted PBKDF2 hashes (128) until they are rehashed
+    key_hash = Column(String(128), unique=True, nullable=False, index=True)
     server_id = Column(String(255), ForeignKey("servers.server_id"), nullable=True)
     description = Column(String(500), nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     last_used = Column(DateTime, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     expires_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index('idx_api_keys_server_active', 'server_id',
+              postgresql_where=text('is_active = true')),
+    )
+
     def __repr__(self):
         return f"<ApiKey(id={self.id}, server_id='{self.server_id}', active={self.is_active})>"
 
 
+# Alerts limited to one active instance per server; disk alerts are per mountpoint
+ACTIVE_UNIQUE_ALERT_CONDITION = text("is_resolved = false AND alert_type <> 'disk'")
+
+# Disk alerts limited to one active instance per server and mountpoint
+ACTIVE_UNIQUE_DISK_ALERT_CONDITION = text("is_resolved = false AND alert_type = 'disk'")
+
+
 class Alert(Base):
     """Alert history and configuration."""
     __tablename__ = "alerts"
@@ -111,7 +136,8 @@ class Alert(Base):
     message = Column(Text, nullable=False)
     threshold_value = Column(Float, nullable=True)
     actual_value = Column(Float, nullable=True)
-    triggered_at = Column(DateTime, default=func.now(), nullable=False)
+    mountpoint = Column(String(255), nullable=True)  # Set for disk alerts only
+    triggered_at = Column(DateTime, server_default=func.now(), nullable=False)
     resolved_at = Column(DateTime, nullable=True)
     is_resolved = Column(Boolean, default=False, nullable=False)
     
@@ -126,8 +152,17 @@ class Alert(Base):
     # Indexes for performance
     __table_args__ = (
         Index('idx_alerts_server_triggered', 'server_id', 'triggered_at'),
-        Index('idx_alerts_type_triggered', 'alert_type', 'triggered_at'),
-        Index('idx_alerts_resolved', 'is_resolved'),
+        Index('idx_alerts_triggered_brin', 'triggered_at',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 16}),
+        Index('idx_alerts_active_dedup', 'server_id', 'alert_type', 'mountpoint',
+              postgresql_where=text('is_resolved = false'),
+              postgresql_include=['triggered_at', 'severity']),
+        Index('uq_alerts_active', 'server_id', 'alert_type', unique=True,
+              postgresql_where=ACTIVE_UNIQUE_ALERT_CONDITION,
+              sqlite_where=ACTIVE_UNIQUE_ALERT_CONDITION),
+        Index('uq_alerts_active_disk', 'server_id', 'mountpoint', unique=True,
+              postgresql_where=ACTIVE_UNIQUE_DISK_ALERT_CONDITION,
+              sqlite_where=ACTIVE_UNIQUE_DISK_ALERT_CONDITION),
     )
 
     def __repr__(self):
@@ -141,8 +176,8 @@ class HealthStatus(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     server_id = Column(String(255), ForeignKey("servers.server_id"), unique=True, nullable=False)
     status = Column(String(20), nullable=False)  # 'healthy', 'warning', 'down'
-    last_check = Column(DateTime, default=func.now(), nullable=False)
-    status_since = Column(DateTime, default=func.now(), nullable=False)
+    last_check = Column(DateTime, server_default=func.now(), nullable=False)
+    status_since = Column(DateTime, server_default=func.now(), nullable=False)
     
     # Health indicators
     cpu_status = Column(String(20), default='normal', nullable=False)
@@ -156,7 +191,7 @@ class HealthStatus(Base):
     last_disk_usage_max = Column(Float, nullable=True)
     
     # Metadata
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     server = relationship("Server", back_populates="health_status")
@@ -182,8 +217,8 @@ class AlertRule(Base):
     cooldown_period = Column(Integer, default=300, nullable=False)     # seconds
     
     # Metadata
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
     def __repr__(self):
         return f"<AlertRule(name='{self.name}', type='{self.alert_type}', threshold={self.threshold_value})>"
@@ -264,7 +299,7 @@ class DashboardSettings(Base):
     
     # Notification settings
     notifications_enabled = Column(Boolean, default=True, nullable=False)
-    webhook_urls = Column(JSON, nullable=False, default=list)
+    webhook_urls = Column(JSONType, nullable=False, default=list)
     email_notifications = Column(Boolean, default=False, nullable=False)
     
     # Metadata
@@ -5,11 +5,15 @@ Provides high-level database operations for servers, metrics, alerts, and health
 """
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_, func
+from sqlalchemy import desc, and_, or_, func, insert, case, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from .models import Server, Metric, ApiKey, Alert, HealthStatus, AlertRule
+from .models import (
+    Server, Metric, ApiKey, Alert, HealthStatus, AlertRule, ACTIVE_UNIQUE_ALERT_CONDITION,
+    ACTIVE_UNIQUE_DISK_ALERT_CONDITION
+)
 from shared.models import SystemMetrics
 
 
@@ -58,6 +62,53 @@ class ServerOperations:
         if active_only:
             query = query.filter(Server.is_active == True)
         return query.all()
+    
+    @staticmethod
+    def get_all_servers_with_api_keys(session: Session,
+                                      active_only: bool = True) -> List[Tuple[Server, Optional[ApiKey]]]:
+        """
+        Get all servers together with an active API key of each, in one query.
+        
+        Args:
+            session: Database session
+            active_only: Only include active servers
+            
+        Returns:
+            (server, api_key) pairs; api_key is None for servers without an active key
+        """
+        query = (session.query(Server, ApiKey)
+                 .outerjoin(ApiKey, and_(ApiKey.server_id == Server.server_id,
+                                         ApiKey.is_active == True))
+                 .order_by(Server.server_id, ApiKey.id))
+        if active_only:
+            query = query.filter(Server.is_active == True)
+        
+        # A server with several active keys appears once per key; keep its first key
+        servers: Dict[str, Tuple[Server, Optional[ApiKey]]] = {}
+        for server, api_key in query:
+            servers.setdefault(server.server_id, (server, api_key))
+        return list(servers.values())
+    
+    @staticmethod
+    def get_servers_missing_offline_alert(session: Session,
+                                          cutoff: datetime) -> List[Tuple[str, datetime]]:
+        """
+        Find active servers not seen since the cutoff that have no active offline alert.
+        
+        Returns:
+            (server_id, last_seen) tuples, found with a single anti-join query
+        """
+        active_offline_alert = and_(
+            Alert.server_id == Server.server_id,
+            Alert.alert_type == 'offline',
+            Alert.is_resolved == False
+        )
+        return (session.query(Server.server_id, Server.last_seen)
+                .outerjoin(Alert, active_offline_alert)
+                .filter(Server.is_active == True,
+                        Server.last_seen < cutoff,
+                        Alert.id.is_(None))
+                .all())
 
 
 class MetricOperations:
@@ -70,37 +121,66 @@ class MetricOperations:
         ServerOperations.get_or_create_server(session, metrics.server_id)
         
         # Convert SystemMetrics to database format
-        metric = Metric(
-            server_id=metrics.server_id,
-            timestamp=datetime.fromisoformat(metrics.timestamp.replace('Z', '+00:00')),
-            cpu_usage=metrics.cpu_usage,
-            memory_total=metrics.memory.total,
-            memory_used=metrics.memory.used,
-            memory_percentage=metrics.memory.percentage,
-            disk_usage=[{
+        metric = Metric(**MetricOperations._to_row(metrics))
+        
+        session.add(metric)
+        
+        # Update server's last_seen timestamp
+        ServerOperations.update_last_seen(session, metrics.server_id)
+        
+        session.flush()
+        return metric
+    
+    @staticmethod
+    def store_metrics_batch(session: Session, metrics_list: List[SystemMetrics]) -> int:
+        """
+        Store several metrics samples with a single multi-row INSERT.
+        
+        Servers are created and their last_seen updated once per distinct
+        server rather than once per sample.
+        
+        Returns:
+            Number of stored samples
+        """
+        server_ids = list(dict.fromkeys(metrics.server_id for metrics in metrics_list))
+        for server_id in server_ids:
+            ServerOperations.get_or_create_server(session, server_id)
+        
+        rows = [MetricOperations._to_row(metrics) for metrics in metrics_list]
+        session.execute(insert(Metric), rows)
+        
+        for server_id in server_ids:
+            ServerOperations.update_last_seen(session, server_id)
+        
+        session.flush()
+        return len(rows)
+    
+    @staticmethod
+    def _to_row(metrics: SystemMetrics) -> Dict[str, Any]:
+        """Convert SystemMetrics to Metric column values."""
+        return {
+            'server_id': metrics.server_id,
+            'timestamp': datetime.fromisoformat(metrics.timestamp.replace('Z', '+00:00')),
+            'cpu_usage': metrics.cpu_usage,
+            'memory_total': metrics.memory.total,
+            'memory_used': metrics.memory.used,
+            'memory_percentage': metrics.memory.percentage,
+            'disk_usage': [{
                 'mountpoint': disk.mountpoint,
                 'total': disk.total,
                 'used': disk.used,
                 'percentage': disk.percentage
             } for disk in metrics.disk_usage],
-            load_1min=metrics.load_average.one_min,
-            load_5min=metrics.load_average.five_min,
-            load_15min=metrics.load_average.fifteen_min,
-            uptime=metrics.uptime,
-            failed_services=[{
+            'load_1min': metrics.load_average.one_min,
+            'load_5min': metrics.load_average.five_min,
+            'load_15min': metrics.load_average.fifteen_min,
+            'uptime': metrics.uptime,
+            'failed_services': [{
                 'name': service.name,
                 'status': service.status,
                 'since': service.since
             } for service in metrics.failed_services]
-        )
-        
-        session.add(metric)
-        
-        # Update server's last_seen timestamp
-        ServerOperations.update_last_seen(session, metrics.server_id)
-        
-        session.flush()
-        return metric
+        }
     
     @staticmethod
     def get_latest_metrics(session: Session, server_id: str, limit: int = 1) -> List[Metric]:
@@ -140,7 +220,8 @@ class AlertOperations:
     @staticmethod
     def create_alert(session: Session, server_id: str, alert_type: str, 
                     severity: str, message: str, threshold_value: Optional[float] = None,
-                    actual_value: Optional[float] = None) -> Alert:
+                    actual_value: Optional[float] = None,
+                    mountpoint: Optional[str] = None) -> Alert:
         """Create a new alert."""
         alert = Alert(
             server_id=server_id,
@@ -148,16 +229,103 @@ class AlertOperations:
             severity=severity,
             message=message,
             threshold_value=threshold_value,
-            actual_value=actual_value
+            actual_value=actual_value,
+            mountpoint=mountpoint
         )
         session.add(alert)
         session.flush()
         return alert
     
     @staticmethod
-    def get_active_alerts(session: Session, server_id: Optional[str] = None) -> List[Alert]:
-        """Get all unresolved alerts, optionally filtered by server."""
-        query = session.query(Alert).filter(Alert.is_resolved == False)
+    def create_alert_if_absent(session: Session, server_id: str, alert_type: str,
+                               severity: str, message: str, threshold_value: Optional[float] = None,
+                               actual_value: Optional[float] = None,
+                               mountpoint: Optional[str] = None) -> Optional[Alert]:
+        """
+        Create an alert unless an equivalent one is already active for the server.
+
+        Disk alerts are compared by mountpoint, every other type by type alone.
+        On PostgreSQL this is a single INSERT ... ON CONFLICT DO NOTHING against
+        the matching partial unique index on active alerts; other databases fall
+        back to a read-then-write check.
+
+        Returns:
+            The new alert, or None if an active alert already existed
+        """
+        is_disk = alert_type == 'disk'
+        if session.get_bind().dialect.name == "postgresql":
+            if is_disk:
+                conflict_target = dict(index_elements=['server_id', 'mountpoint'],
+                                       index_where=ACTIVE_UNIQUE_DISK_ALERT_CONDITION)
+            else:
+                conflict_target = dict(index_elements=['server_id', 'alert_type'],
+                                       index_where=ACTIVE_UNIQUE_ALERT_CONDITION)
+            stmt = (pg_insert(Alert)
+                    .values(server_id=server_id, alert_type=alert_type, severity=severity,
+                            message=message, threshold_value=threshold_value,
+                            actual_value=actual_value, mountpoint=mountpoint)
+                    .on_conflict_do_nothing(**conflict_target)
+                    .returning(Alert))
+            return session.scalars(stmt).first()
+
+        active_alerts = AlertOperations.get_active_alerts(session, server_id)
+        if any(alert.alert_type == alert_type and (not is_disk or alert.mountpoint == mountpoint)
+               for alert in active_alerts):
+            return None
+        return AlertOperations.create_alert(
+            session=session,
+            server_id=server_id,
+            alert_type=alert_type,
+            severity=severity,
+            message=message,
+            threshold_value=threshold_value,
+            actual_value=actual_value,
+            mountpoint=mountpoint
+        )
+    
+    @staticmethod
+    def create_alerts_batch(session: Session, alert_rows: List[Dict[str, Any]]) -> List[Alert]:
+        """
+        Create several alerts with a single INSERT.
+        
+        On PostgreSQL rows that would duplicate an active alert are skipped via
+        ON CONFLICT DO NOTHING; other databases insert every row.
+        
+        Returns:
+            The alerts that were created
+        """
+        if not alert_rows:
+            return []
+        
+        if session.get_bind().dialect.name == "postgresql":
+            stmt = (pg_insert(Alert)
+                    .values(alert_rows)
+                    .on_conflict_do_nothing(index_elements=['server_id', 'alert_type'],
+                                            index_where=ACTIVE_UNIQUE_ALERT_CONDITION)
+                    .returning(Alert))
+            return session.scalars(stmt).all()
+        
+        alerts = [Alert(**row) for row in alert_rows]
+        session.add_all(alerts)
+        session.flush()
+        return alerts
+    
+    @staticmethod
+    def get_active_alerts(session: Session, server_id: Optional[str] = None,
+                          columns: Optional[Tuple] = None) -> List[Alert]:
+        """
+        Get all unresolved alerts, optionally filtered by server.
+        
+        Args:
+            session: Database session
+            server_id: Only return alerts of this server
+            columns: Only load these Alert columns, returning rows instead of Alert objects
+            
+        Returns:
+            Alerts (or rows of the requested columns), newest first
+        """
+        query = session.query(*columns) if columns else session.query(Alert)
+        query = query.filter(Alert.is_resolved == False)
         if server_id:
             query = query.filter(Alert.server_id == server_id)
         return query.order_by(desc(Alert.triggered_at)).all()
@@ -173,6 +341,51 @@ class AlertOperations:
                   }))
         return updated > 0
     
+    @staticmethod
+    def resolve_alerts_bulk(session: Session, server_id: str,
+                            alert_types: Optional[List[str]] = None,
+                            disk_mountpoints: Optional[List[str]] = None) -> List[int]:
+        """
+        Resolve several active alerts of a server with a single UPDATE.
+        
+        Args:
+            session: Database session
+            server_id: Server ID to resolve alerts for
+            alert_types: Alert types to resolve; all types if neither filter is given
+            disk_mountpoints: Mountpoints whose disk alerts to resolve
+            
+        Returns:
+            IDs of the resolved alerts
+        """
+        conditions = [Alert.server_id == server_id, Alert.is_resolved == False]
+        if alert_types is not None or disk_mountpoints is not None:
+            selectors = []
+            if alert_types:
+                selectors.append(Alert.alert_type.in_(alert_types))
+            if disk_mountpoints:
+                selectors.append(and_(Alert.alert_type == 'disk',
+                                      Alert.mountpoint.in_(disk_mountpoints)))
+            if not selectors:
+                return []
+            conditions.append(or_(*selectors))
+        
+        values = {'is_resolved': True, 'resolved_at': datetime.utcnow()}
+        if session.get_bind().dialect.update_returning:
+            stmt = (update(Alert)
+                    .where(*conditions)
+                    .values(**values)
+                    .returning(Alert.id)
+                    .execution_options(synchronize_session=False))
+            return list(session.scalars(stmt))
+        
+        # No UPDATE ... RETURNING (e.g. MySQL): select the ids first
+        alert_ids = [row.id for row in session.query(Alert.id).filter(*conditions)]
+        if alert_ids:
+            (session.query(Alert)
+             .filter(Alert.id.in_(alert_ids))
+             .update(values, synchronize_session=False))
+        return alert_ids
+    
     @staticmethod
     def update_webhook_status(session: Session, alert_id: int, 
                             response_code: Optional[int] = None) -> None:
@@ -185,6 +398,21 @@ class AlertOperations:
             update_data['webhook_response_code'] = response_code
             
         session.query(Alert).filter(Alert.id == alert_id).update(update_data)
+    
+    @staticmethod
+    def update_webhook_status_batch(session: Session, alert_ids: List[int],
+                                    response_code: Optional[int] = None) -> None:
+        """Update webhook delivery status for several alerts sent in one webhook."""
+        update_data = {
+            'webhook_sent': True,
+            'webhook_sent_at': datetime.utcnow()
+        }
+        if response_code is not None:
+            update_data['webhook_response_code'] = response_code
+        
+        (session.query(Alert)
+         .filter(Alert.id.in_(alert_ids))
+         .update(update_data, synchronize_session=False))
 
 
 class HealthStatusOperations:
@@ -238,6 +466,69 @@ class HealthStatusOperations:
         session.flush()
         return health_status
     
+    @staticmethod
+    def mark_servers_offline(session: Session, server_ids: List[str],
+                             now: Optional[datetime] = None) -> None:
+        """
+        Set the health status of several servers to down/offline at once.
+        
+        On PostgreSQL this is a single upsert; other databases update the
+        servers one by one.
+        
+        Args:
+            now: Check time recorded by the PostgreSQL upsert; defaults to the current time
+        """
+        if not server_ids:
+            return
+        
+        if session.get_bind().dialect.name != "postgresql":
+            for server_id in server_ids:
+                HealthStatusOperations.update_health_status(
+                    session=session,
+                    server_id=server_id,
+                    status='down',
+                    connectivity_status='offline'
+                )
+            return
+        
+        now = now or datetime.utcnow()
+        stmt = pg_insert(HealthStatus).values([
+            {
+                'server_id': server_id,
+                'status': 'down',
+                'last_check': now,
+                'status_since': now,
+                'cpu_status': 'normal',
+                'memory_status': 'normal',
+                'disk_status': 'normal',
+                'connectivity_status': 'offline',
+                'last_cpu_usage': None,
+                'last_memory_percentage': None,
+                'last_disk_usage_max': None
+            }
+            for server_id in server_ids
+        ])
+        # Same resulting row as update_health_status(status='down', connectivity_status='offline')
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['server_id'],
+            set_={
+                'status': stmt.excluded.status,
+                'last_check': stmt.excluded.last_check,
+                'status_since': case(
+                    (HealthStatus.status != 'down', stmt.excluded.status_since),
+                    else_=HealthStatus.status_since
+                ),
+                'cpu_status': stmt.excluded.cpu_status,
+                'memory_status': stmt.excluded.memory_status,
+                'disk_status': stmt.excluded.disk_status,
+                'connectivity_status': stmt.excluded.connectivity_status,
+                'last_cpu_usage': stmt.excluded.last_cpu_usage,
+                'last_memory_percentage': stmt.excluded.last_memory_percentage,
+                'last_disk_usage_max': stmt.excluded.last_disk_usage_max
+            }
+        )
+        session.execute(stmt)
+    
     @staticmethod
     def get_health_status(session: Session, server_id: str) -> Optional[HealthStatus]:
         """Get health status for a server."""
@@ -292,4 +583,20 @@ class ApiKeyOperations:
         updated = (session.query(ApiKey)
                   .filter(ApiKey.key_hash == key_hash)
                   .update({'is_active': False}))
-        return updated > 0
\ No newline at end of file
+        return updated > 0
+    
+    @staticmethod
+    def deactivate_server_api_keys(session: Session, server_id: str) -> int:
+        """
+        Deactivate all active API keys of a server with a single UPDATE.
+        
+        Args:
+            session: Database session
+            server_id: Server whose keys to deactivate
+            
+        Returns:
+            Number of keys deactivated
+        """
+        return (session.query(ApiKey)
+                .filter(ApiKey.server_id == server_id, ApiKey.is_active == True)
+                .update({'is_active': False}, synchronize_session=False))
\ No newline at end of file
@@ -5,6 +5,7 @@ This module provides the FastAPI application instance and can be used to run
 the server with uvicorn or other ASGI servers.
 """
 
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -28,13 +29,32 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Seconds between checks that the upcoming monthly metrics partitions exist
+PARTITION_MAINTENANCE_INTERVAL = 24 * 60 * 60
+
+
+async def maintain_metrics_partitions() -> None:
+    """
+    Create upcoming metrics partitions at startup and then once a day.
+    
+    Keeps samples out of the default partition, which would otherwise
+    collect every row once the partitions created by migration 006 run out.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, db_manager.create_metrics_partitions)
+        except Exception:
+            pass  # Logged by create_metrics_partitions; retried next interval
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager for startup and shutdown events.
     
-    Handles database initialization and cleanup.
+    Handles database initialization, metrics partition upkeep and cleanup.
     """
     # Startup
     logger.info("Starting Linux Server Health Monitoring System")
@@ -53,10 +73,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
     
+    partition_task = asyncio.create_task(maintain_metrics_partitions())
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Linux Server Health Monitoring System")
+    partition_task.cancel()
 
 
 # Get the FastAPI app with lifespan events
@@ -107,13 +130,29 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
     log_level = os.getenv("LOG_LEVEL", "info")
+    # Longer than the agents' collection interval so their pooled
+    # connections survive between submissions (uvicorn defaults to 5s)
+    keep_alive = int(os.getenv("KEEP_ALIVE_TIMEOUT", "75"))
+    # Optional UNIX socket for colocated clients; takes precedence over host/port
+    uds = os.getenv("UDS_PATH") or None
+    # Worker processes; in-process caches (alert dedup, dashboard overview) are per worker
+    workers = int(os.getenv("WORKERS", "1"))
     
-    logger.info(f"Starting server on {host}:{port}")
+    if uds:
+        logger.info(f"Starting server on unix socket {uds}")
+    else:
+        logger.info(f"Starting server on {host}:{port}")
     
     uvicorn.run(
         "server.main:app",
         host=host,
         port=port,
+        uds=uds,
         log_level=log_level,
+        timeout_keep_alive=keep_alive,
+        workers=workers,
+        # uvloop and httptools (from uvicorn[standard]) when installed, asyncio and h11 otherwise
+        loop="auto",
+        http="auto",
         reload=False  # Set to True for development
     )
\ No newline at end of file
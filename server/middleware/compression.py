@@ -0,0 +1,198 @@
+"""
+Request decompression middleware for the Linux Server Health Monitoring System.
+
+Agents may gzip (or zstd, when the zstandard package is installed on both
+sides) large metric payloads to save bandwidth. This middleware transparently
+inflates such request bodies before they reach the security middleware and
+the endpoint handlers.
+"""
+
+import logging
+import zlib
+from typing import List, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+# zstandard is optional; without it zstd bodies are refused with 415
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the inflated body size to guard against decompression bombs
+MAX_DECOMPRESSED_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Read size used while streaming a zstd frame
+_ZSTD_READ_SIZE = 64 * 1024
+
+
+class GzipRequestMiddleware:
+    """
+    ASGI middleware that decompresses gzip- and zstd-encoded request bodies.
+
+    Requests without a ``Content-Encoding: gzip`` or ``zstd`` header are
+    passed through untouched. Compressed requests have their body inflated
+    and their ``Content-Encoding``/``Content-Length`` headers rewritten
+    accordingly. zstd bodies are answered with 415 when zstandard is missing,
+    so agents can fall back to gzip.
+    """
+
+    def __init__(self, app, max_size: int = MAX_DECOMPRESSED_SIZE):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            max_size: Maximum allowed size of the decompressed body in bytes
+        """
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        """
+        Process an ASGI request, inflating gzip bodies when present.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive callable
+            send: ASGI send callable
+        """
+        encoding = self._content_encoding(scope["headers"]) if scope["type"] == "http" else None
+        if encoding not in (b"gzip", b"zstd"):
+            await self.app(scope, receive, send)
+            return
+
+        if encoding == b"zstd" and zstandard is None:
+            response = JSONResponse(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                content={"detail": "zstd request bodies are not supported"}
+            )
+            await response(scope, receive, send)
+            return
+
+        # Read the complete compressed body
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        try:
+            if encoding == b"zstd":
+                body = self._decompress_zstd(b"".join(chunks))
+            else:
+                body = self._decompress(b"".join(chunks))
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Rejected {encoding.decode()} request body: {e}")
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": f"Invalid {encoding.decode()} request body"}
+            )
+            await response(scope, receive, send)
+            return
+
+        scope = dict(scope)
+        scope["headers"] = self._rewrite_headers(scope["headers"], len(body))
+
+        body_sent = False
+
+        async def receive_decompressed():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, receive_decompressed, send)
+
+    def _content_encoding(self, headers: List[Tuple[bytes, bytes]]) -> Optional[bytes]:
+        """
+        Return the request's declared content encoding.
+
+        Args:
+            headers: Raw ASGI request headers
+
+        Returns:
+            Lower-cased encoding such as ``b"gzip"``, or None if absent
+        """
+        for key, value in headers:
+            if key == b"content-encoding":
+                return value.strip().lower()
+        return None
+
+    def _decompress(self, data: bytes) -> bytes:
+        """
+        Inflate a gzip body, enforcing the configured size limit.
+
+        Args:
+            data: Compressed request body
+
+        Returns:
+            Decompressed request body
+
+        Raises:
+            zlib.error: If the body is not valid gzip data
+            ValueError: If the decompressed body exceeds the size limit
+        """
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = decompressor.decompress(data, self.max_size)
+        if decompressor.unconsumed_tail:
+            raise ValueError("decompressed body exceeds size limit")
+        body += decompressor.flush()
+        if not decompressor.eof:
+            raise ValueError("truncated gzip stream")
+        return body
+
+    def _decompress_zstd(self, data: bytes) -> bytes:
+        """
+        Inflate a zstd body, enforcing the configured size limit.
+
+        Args:
+            data: Compressed request body
+
+        Returns:
+            Decompressed request body
+
+        Raises:
+            ValueError: If the body is not valid zstd data or exceeds the size limit
+        """
+        chunks = []
+        size = 0
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+                while True:
+                    chunk = reader.read(_ZSTD_READ_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise ValueError("decompressed body exceeds size limit")
+                    chunks.append(chunk)
+        except zstandard.ZstdError as e:
+            raise ValueError(str(e)) from e
+        return b"".join(chunks)
+
+    def _rewrite_headers(self, headers: List[Tuple[bytes, bytes]],
+                         content_length: int) -> List[Tuple[bytes, bytes]]:
+        """
+        Drop the content encoding and fix up the content length.
+
+        Args:
+            headers: Raw ASGI request headers
+            content_length: Length of the decompressed body
+
+        Returns:
+            Updated header list
+        """
+        rewritten = [
+            (key, value) for key, value in headers
+            if key not in (b"content-encoding", b"content-length")
+        ]
+        rewritten.append((b"content-length", str(content_length).encode("latin-1")))
+        return rewritten
@@ -5,12 +5,26 @@ This module provides functionality for aggregating and analyzing historical
 server metrics data for dashboard visualization and reporting.
 """
 
+from itertools import groupby
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
+from sqlalchemy import Float, func, and_, case, desc, select
+from sqlalchemy.sql import Select
 from server.database.models import Metric, Server
 
+# Columns read for time-bucketed aggregation, so range queries skip full ORM rows
+AGGREGATE_COLUMNS = (
+    Metric.timestamp,
+    Metric.cpu_usage,
+    Metric.memory_percentage,
+    Metric.load_1min,
+    Metric.load_5min,
+    Metric.load_15min,
+    Metric.disk_usage,
+    Metric.failed_services,
+)
+
 
 class MetricsAggregationService:
     """
@@ -47,8 +61,29 @@ class MetricsAggregationService:
             # Calculate interval for aggregation
             interval_seconds = interval_minutes * 60
             
-            # Query metrics within time range
-            metrics = self.db_session.query(Metric).filter(
+            # PostgreSQL aggregates each interval itself and returns one row per interval
+            if self.db_session.get_bind().dialect.name == "postgresql":
+                stmt = self._bucketed_metrics_query(server_id, start_time, end_time, interval_seconds)
+                aggregated_data = []
+                for row in self.db_session.execute(stmt):
+                    interval_start = start_time + timedelta(seconds=int(row.bucket) * interval_seconds)
+                    if interval_start >= end_time:
+                        break
+                    aggregated_data.append({
+                        "timestamp": interval_start.isoformat() + "Z",
+                        "cpu_usage": row.cpu_usage,
+                        "memory_percentage": row.memory_percentage,
+                        "max_disk_usage": row.max_disk_usage if row.max_disk_usage is not None else 0,
+                        "load_1min": row.load_1min,
+                        "load_5min": row.load_5min,
+                        "load_15min": row.load_15min,
+                        "failed_services_count": float(row.failed_services_count),
+                        "data_points": row.data_points
+                    })
+                return aggregated_data
+            
+            # Query only the aggregated columns within the time range
+            metrics = self.db_session.query(*AGGREGATE_COLUMNS).filter(
                 and_(
                     Metric.server_id == server_id,
                     Metric.timestamp >= start_time,
@@ -59,31 +94,82 @@ class MetricsAggregationService:
             if not metrics:
                 return []
             
-            # Group metrics by time intervals
+            # Rows are time-ordered, so each interval is one contiguous run
             aggregated_data = []
-            current_interval_start = start_time
-            
-            while current_interval_start < end_time:
-                interval_end = current_interval_start + timedelta(seconds=interval_seconds)
-                
-                # Get metrics within this interval
-                interval_metrics = [
-                    m for m in metrics 
-                    if current_interval_start <= m.timestamp < interval_end
-                ]
+            for interval_index, interval_metrics in groupby(
+                metrics,
+                key=lambda m: int((m.timestamp - start_time).total_seconds() // interval_seconds)
+            ):
+                interval_start = start_time + timedelta(seconds=interval_index * interval_seconds)
+                if interval_start >= end_time:
+                    break
                 
-                if interval_metrics:
-                    # Calculate aggregated values for this interval
-                    aggregated_point = self._aggregate_metrics_data(interval_metrics, current_interval_start)
-                    aggregated_data.append(aggregated_point)
-                
-                current_interval_start = interval_end
+                # Calculate aggregated values for this interval
+                aggregated_point = self._aggregate_metrics_data(list(interval_metrics), interval_start)
+                aggregated_data.append(aggregated_point)
             
             return aggregated_data
             
         except Exception as e:
             return []
     
+    @staticmethod
+    def _bucketed_metrics_query(server_id: str, start_time: datetime, end_time: datetime,
+                                interval_seconds: int) -> Select:
+        """
+        Build a PostgreSQL query aggregating a server's metrics per interval.
+        
+        Produces the same values as _aggregate_metrics_data, one row per
+        non-empty interval ordered by interval index.
+        
+        Args:
+            server_id: ID of the server to get metrics for
+            start_time: Start of the time range, also the origin of the intervals
+            end_time: End of the time range
+            interval_seconds: Interval length in seconds
+            
+        Returns:
+            Select yielding bucket, averaged metrics, and data_points per interval
+        """
+        bucket = func.floor(
+            func.extract('epoch', Metric.timestamp - start_time) / interval_seconds
+        ).label('bucket')
+        
+        # Highest disk usage of each sample; NULL (skipped by avg) without disks
+        disk = func.jsonb_array_elements(Metric.disk_usage).table_valued('value').alias('disk')
+        sample_max_disk = (
+            select(func.max(func.coalesce(disk.c.value.op('->>')('percentage').cast(Float), 0)))
+            .select_from(disk)
+            .scalar_subquery()
+        )
+        sample_max_disk = case((func.jsonb_typeof(Metric.disk_usage) == 'array', sample_max_disk))
+        failed_count = case(
+            (func.jsonb_typeof(Metric.failed_services) == 'array',
+             func.jsonb_array_length(Metric.failed_services)),
+            else_=0
+        )
+        
+        return (
+            select(
+                bucket,
+                func.avg(Metric.cpu_usage).label('cpu_usage'),
+                func.avg(Metric.memory_percentage).label('memory_percentage'),
+                func.avg(sample_max_disk).label('max_disk_usage'),
+                func.avg(Metric.load_1min).label('load_1min'),
+                func.avg(Metric.load_5min).label('load_5min'),
+                func.avg(Metric.load_15min).label('load_15min'),
+                func.avg(failed_count).label('failed_services_count'),
+                func.count().label('data_points'),
+            )
+            .where(
+                Metric.server_id == server_id,
+                Metric.timestamp >= start_time,
+                Metric.timestamp <= end_time
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+    
     def get_latest_metrics_summary(self, server_id: str, limit: int = 100) -> Dict[str, Any]:
         """
         Get a summary of the latest metrics for a server.
@@ -301,7 +387,7 @@ class MetricsAggregationService:
         Aggregate a list of metrics into a single data point.
         
         Args:
-            metrics: List of Metric objects to aggregate
+            metrics: Metric objects (or rows of AGGREGATE_COLUMNS) to aggregate
             timestamp: Timestamp for the aggregated data point
             
         Returns:
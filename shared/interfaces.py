@@ -6,7 +6,7 @@ These interfaces define the contracts between different components.
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
-from .models import SystemMetrics, FailedService
+from .models import SystemMetrics, DiskUsage, FailedService
 
 
 class MetricsCollectorInterface(ABC):
@@ -23,7 +23,7 @@ class MetricsCollectorInterface(ABC):
         pass
 
     @abstractmethod
-    def collect_disk_usage(self) -> List[Dict]:
+    def collect_disk_usage(self) -> List[DiskUsage]:
         """Collect disk usage for all mounted filesystems."""
         pass
 
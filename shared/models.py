@@ -4,7 +4,7 @@ Shared data models for the Linux Server Health Monitoring System.
 These models define the structure of data exchanged between agents and the central server.
 """
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import List, Dict, Optional
 from datetime import datetime
 import json
@@ -21,6 +21,9 @@ class MemoryInfo:
 @dataclass
 class DiskUsage:
     """Disk usage information for a filesystem."""
+    # One instance per mount point per sample, so skip the per-instance dict
+    __slots__ = ("mountpoint", "total", "used", "percentage")
+    
     mountpoint: str
     total: int
     used: int
@@ -57,7 +60,7 @@ class SystemMetrics:
 
     def to_json(self) -> str:
         """Serialize metrics to JSON string."""
-        return json.dumps(self, default=lambda o: o.__dict__, indent=2)
+        return json.dumps(asdict(self), indent=2)
 
     @classmethod
     def from_json(cls, json_str: str) -> 'SystemMetrics':
@@ -107,6 +107,18 @@ class TestConfigManager:
         # Key with no built-in default and no custom default should return None
         assert config_manager.get_setting("another_unknown_setting") is None
 
+    def test_get_setting_memoized_until_reload(self):
+        """Test that resolved settings are cached until the config is reloaded."""
+        os.environ['MONITORING_COLLECTION_INTERVAL'] = '30'
+        config_manager = ConfigManager()
+        assert config_manager.get_setting("collection_interval") == 30
+        
+        os.environ['MONITORING_COLLECTION_INTERVAL'] = '45'
+        assert config_manager.get_setting("collection_interval") == 30
+        
+        config_manager.reload_config()
+        assert config_manager.get_setting("collection_interval") == 45
+
     def test_get_agent_config(self):
         """Test getting complete agent configuration as AgentConfig object."""
         os.environ['MONITORING_API_KEY'] = 'test-api-key'
@@ -157,6 +169,17 @@ class TestConfigManager:
         assert is_valid is False
         assert len(errors) >= 5  # Should have multiple validation errors
 
+    def test_validate_config_batch_max_within_server_limit(self):
+        """Test that batch_max may not exceed what the batch endpoint accepts."""
+        os.environ['MONITORING_API_KEY'] = 'valid-api-key'
+        os.environ['MONITORING_BATCH_MAX'] = '1001'
+        
+        config_manager = ConfigManager()
+        is_valid, errors = config_manager.validate_config()
+        
+        assert is_valid is False
+        assert "batch_max must not exceed 1000" in errors
+
     def test_convert_env_value_types(self):
         """Test environment variable type conversion."""
         config_manager = ConfigManager()
@@ -261,6 +284,23 @@ class TestConfigManager:
         finally:
             os.unlink(temp_path)
 
+    def test_load_config_uses_cache_for_unchanged_file(self):
+        """Test that an unchanged configuration file is only parsed once."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump({"server_url": "https://cached.example.com"}, f)
+            temp_path = f.name
+        
+        try:
+            config_manager = ConfigManager(temp_path)
+            
+            with patch('agent.config.manager.yaml.load') as mock_load:
+                config_manager.reload_config()
+                mock_load.assert_not_called()
+            
+            assert config_manager.get_setting("server_url") == "https://cached.example.com"
+        finally:
+            os.unlink(temp_path)
+
     @patch('pathlib.Path.exists')
     def test_find_config_file(self, mock_exists):
         """Test automatic configuration file discovery."""
@@ -273,6 +313,15 @@ class TestConfigManager:
         assert config_manager._config_path is not None or config_manager._config_path == "agent_config.yaml"
 
 
+    def test_find_config_file_env_override(self):
+        """Test that MONITORING_CONFIG_FILE short-circuits config discovery."""
+        os.environ['MONITORING_CONFIG_FILE'] = '/custom/location/agent.yaml'
+        
+        config_manager = ConfigManager()
+        
+        assert config_manager._config_path == '/custom/location/agent.yaml'
+
+
 class TestAgentConfig:
     """Test cases for AgentConfig dataclass."""
 
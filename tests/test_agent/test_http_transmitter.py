@@ -3,12 +3,13 @@ Tests for agent HTTP transmitter functionality.
 """
 
 import pytest
+import asyncio
+import gzip
 import json
-from unittest.mock import Mock, patch, MagicMock
-import requests
-from requests.exceptions import ConnectionError, Timeout, RequestException
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+import httpx
 
-from agent.transport.http_transmitter import HTTPTransmitter
+from agent.transport.http_transmitter import HTTPTransmitter, MetricsRejectedError
 from shared.models import SystemMetrics, MemoryInfo, DiskUsage, LoadAverage, FailedService
 
 
@@ -46,7 +47,7 @@ class TestHTTPTransmitter:
         """Clean up after tests."""
         self.transmitter.close()
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
     def test_send_metrics_success(self, mock_post):
         """Test successful metrics transmission."""
         # Mock successful response
@@ -62,13 +63,50 @@ class TestHTTPTransmitter:
         # Verify the call arguments
         call_args = mock_post.call_args
         assert call_args[1]['timeout'] == 10
-        assert call_args[1]['verify'] is True
         assert 'Authorization' in call_args[1]['headers']
         assert call_args[1]['headers']['Authorization'] == f'Bearer {self.api_key}'
         assert 'X-API-Key' in call_args[1]['headers']
         assert call_args[1]['headers']['X-API-Key'] == self.api_key
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
+    def test_send_metrics_batch(self, mock_post):
+        """Test that a list of samples is posted in one request to the batch endpoint."""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_post.return_value = mock_response
+        self.transmitter._zstd = None
+        
+        result = self.transmitter.send_metrics([self.sample_metrics, self.sample_metrics], self.api_key)
+        
+        assert result is True
+        mock_post.assert_called_once()
+        
+        call_args = mock_post.call_args
+        assert call_args[0][0] == f"{self.server_url}/api/v1/metrics/batch"
+        # The batch is large enough to be compressed
+        assert call_args[1]['headers']['Content-Encoding'] == 'gzip'
+        payload = json.loads(gzip.decompress(call_args[1]['content']))
+        assert len(payload['metrics']) == 2
+        assert payload['metrics'][0]['server_id'] == "test-server-001"
+        assert payload['metrics'][0]['memory']['percentage'] == 50.0
+
+    @patch('httpx.Client.post')
+    def test_send_metrics_falls_back_to_gzip_when_zstd_refused(self, mock_post):
+        """Test that a 415 for a zstd body is retried once with gzip."""
+        mock_post.side_effect = [Mock(status_code=415), Mock(status_code=201)]
+        self.transmitter._zstd = Mock()
+        self.transmitter._zstd.compress.return_value = b'zstd-frame'
+        
+        result = self.transmitter.send_metrics_bytes(b'x' * 1024, self.api_key)
+        
+        assert result is True
+        assert mock_post.call_count == 2
+        assert mock_post.call_args_list[0][1]['headers']['Content-Encoding'] == 'zstd'
+        assert mock_post.call_args_list[1][1]['headers']['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(mock_post.call_args_list[1][1]['content']) == b'x' * 1024
+        assert self.transmitter._zstd is None
+
+    @patch('httpx.Client.post')
     def test_send_metrics_authentication_failure(self, mock_post):
         """Test metrics transmission with authentication failure."""
         # Mock authentication failure response
@@ -81,7 +119,7 @@ class TestHTTPTransmitter:
         assert result is False
         mock_post.assert_called_once()
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
     def test_send_metrics_rate_limit(self, mock_post):
         """Test metrics transmission with rate limiting."""
         # Mock rate limit response
@@ -94,7 +132,7 @@ class TestHTTPTransmitter:
         assert result is False
         mock_post.assert_called_once()
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
     def test_send_metrics_server_error(self, mock_post):
         """Test metrics transmission with server error."""
         # Mock server error response
@@ -108,29 +146,29 @@ class TestHTTPTransmitter:
         assert result is False
         mock_post.assert_called_once()
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
     def test_send_metrics_connection_error(self, mock_post):
         """Test metrics transmission with connection error."""
         # Mock connection error
-        mock_post.side_effect = ConnectionError("Connection failed")
+        mock_post.side_effect = httpx.ConnectError("Connection failed")
         
         result = self.transmitter.send_metrics(self.sample_metrics, self.api_key)
         
         assert result is False
         mock_post.assert_called_once()
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
     def test_send_metrics_timeout(self, mock_post):
         """Test metrics transmission with timeout."""
         # Mock timeout error
-        mock_post.side_effect = Timeout("Request timed out")
+        mock_post.side_effect = httpx.ReadTimeout("Request timed out")
         
         result = self.transmitter.send_metrics(self.sample_metrics, self.api_key)
         
         assert result is False
         mock_post.assert_called_once()
 
-    @patch('agent.transport.http_transmitter.requests.Session.get')
+    @patch('httpx.Client.get')
     def test_authenticate_success(self, mock_get):
         """Test successful authentication."""
         # Mock successful response
@@ -148,7 +186,21 @@ class TestHTTPTransmitter:
         assert 'Authorization' in call_args[1]['headers']
         assert call_args[1]['headers']['Authorization'] == f'Bearer {self.api_key}'
 
-    @patch('agent.transport.http_transmitter.requests.Session.get')
+    @patch('httpx.Client.post')
+    def test_set_api_key_caches_auth_headers(self, mock_post):
+        """Test that sends with the registered key reuse the cached headers."""
+        mock_post.return_value = Mock(status_code=201)
+        self.transmitter.set_api_key(self.api_key)
+        
+        self.transmitter.send_metrics(self.sample_metrics, self.api_key)
+        self.transmitter.send_metrics(self.sample_metrics, "other-key")
+        
+        cached_headers, other_headers = [call[1]['headers'] for call in mock_post.call_args_list]
+        assert cached_headers is self.transmitter._auth_headers
+        assert cached_headers['Authorization'] == f'Bearer {self.api_key}'
+        assert other_headers['X-API-Key'] == "other-key"
+
+    @patch('httpx.Client.get')
     def test_authenticate_failure(self, mock_get):
         """Test authentication failure."""
         # Mock authentication failure response
@@ -161,11 +213,11 @@ class TestHTTPTransmitter:
         assert result is False
         mock_get.assert_called_once()
 
-    @patch('agent.transport.http_transmitter.requests.Session.get')
+    @patch('httpx.Client.get')
     def test_authenticate_connection_error(self, mock_get):
         """Test authentication with connection error."""
         # Mock connection error
-        mock_get.side_effect = ConnectionError("Connection failed")
+        mock_get.side_effect = httpx.ConnectError("Connection failed")
         
         result = self.transmitter.authenticate(self.api_key)
         
@@ -173,7 +225,7 @@ class TestHTTPTransmitter:
         mock_get.assert_called_once()
 
     @patch('agent.transport.http_transmitter.time.sleep')
-    @patch('agent.transport.http_transmitter.HTTPTransmitter.send_metrics')
+    @patch('agent.transport.http_transmitter.HTTPTransmitter.send_metrics_bytes')
     def test_send_with_exponential_backoff_success_first_attempt(self, mock_send, mock_sleep):
         """Test exponential backoff with success on first attempt."""
         mock_send.return_value = True
@@ -187,7 +239,7 @@ class TestHTTPTransmitter:
         mock_sleep.assert_not_called()
 
     @patch('agent.transport.http_transmitter.time.sleep')
-    @patch('agent.transport.http_transmitter.HTTPTransmitter.send_metrics')
+    @patch('agent.transport.http_transmitter.HTTPTransmitter.send_metrics_bytes')
     def test_send_with_exponential_backoff_success_second_attempt(self, mock_send, mock_sleep):
         """Test exponential backoff with success on second attempt."""
         mock_send.side_effect = [False, True]  # Fail first, succeed second
@@ -201,7 +253,7 @@ class TestHTTPTransmitter:
         mock_sleep.assert_called_once_with(1.0)  # backoff_factor^0 = 1.5^0 = 1.0
 
     @patch('agent.transport.http_transmitter.time.sleep')
-    @patch('agent.transport.http_transmitter.HTTPTransmitter.send_metrics')
+    @patch('agent.transport.http_transmitter.HTTPTransmitter.send_metrics_bytes')
     def test_send_with_exponential_backoff_all_attempts_fail(self, mock_send, mock_sleep):
         """Test exponential backoff when all attempts fail."""
         mock_send.return_value = False
@@ -219,7 +271,80 @@ class TestHTTPTransmitter:
         actual_calls = [call[0][0] for call in mock_sleep.call_args_list]
         assert actual_calls == expected_calls
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('agent.transport.http_transmitter.time.sleep')
+    @patch('agent.transport.http_transmitter.HTTPTransmitter.send_metrics_bytes')
+    def test_send_with_exponential_backoff_serializes_once(self, mock_send, mock_sleep):
+        """Test that retries reuse the body serialized before the first attempt."""
+        mock_send.return_value = False
+        
+        with patch('agent.transport.http_transmitter._dumps_json',
+                   return_value=b'{}') as mock_dumps:
+            self.transmitter.send_with_exponential_backoff(
+                self.sample_metrics, self.api_key, max_attempts=3
+            )
+        
+        mock_dumps.assert_called_once()
+        assert mock_send.call_count == 3
+        assert all(call[0][0] == b'{}' for call in mock_send.call_args_list)
+
+    @patch('agent.transport.http_transmitter.asyncio.sleep', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_send_metrics_async_retries_without_blocking(self, mock_post, mock_sleep):
+        """Test that async sends back off with asyncio.sleep between attempts."""
+        mock_post.side_effect = [httpx.ConnectError("Connection failed"), Mock(status_code=201)]
+        
+        async def send():
+            try:
+                return await self.transmitter.send_metrics_async(
+                    self.sample_metrics, self.api_key, max_attempts=3
+                )
+            finally:
+                await self.transmitter.aclose()
+        
+        assert asyncio.run(send()) is True
+        assert mock_post.await_count == 2
+        mock_sleep.assert_awaited_once_with(1.0)
+        assert mock_post.call_args[0][0] == f"{self.server_url}/api/v1/metrics"
+
+    @patch('agent.transport.http_transmitter.asyncio.sleep', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_send_metrics_async_rejected_payload_not_retried(self, mock_post, mock_sleep):
+        """Test that a payload rejected with a non-retryable 4xx raises without retrying."""
+        mock_post.return_value = Mock(status_code=422, text="Unprocessable Entity")
+        
+        async def send():
+            try:
+                return await self.transmitter.send_metrics_async(
+                    [self.sample_metrics], self.api_key, max_attempts=3
+                )
+            finally:
+                await self.transmitter.aclose()
+        
+        with pytest.raises(MetricsRejectedError) as exc_info:
+            asyncio.run(send())
+        
+        assert exc_info.value.status_code == 422
+        assert mock_post.await_count == 1
+        mock_sleep.assert_not_awaited()
+
+    @patch('agent.transport.http_transmitter.asyncio.sleep', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_send_metrics_async_retries_request_timeout(self, mock_post, mock_sleep):
+        """Test that 408 is treated as a transient failure and retried."""
+        mock_post.side_effect = [Mock(status_code=408, text="Request Timeout"), Mock(status_code=201)]
+        
+        async def send():
+            try:
+                return await self.transmitter.send_metrics_async(
+                    self.sample_metrics, self.api_key, max_attempts=3
+                )
+            finally:
+                await self.transmitter.aclose()
+        
+        assert asyncio.run(send()) is True
+        assert mock_post.await_count == 2
+
+    @patch('httpx.Client.post')
     def test_register_agent_success(self, mock_post):
         """Test successful agent registration."""
         # Mock successful registration response
@@ -238,7 +363,7 @@ class TestHTTPTransmitter:
         assert call_args[1]['json']['server_id'] == "test-server-001"
         assert call_args[1]['json']['metadata'] == {"os": "linux"}
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
     def test_register_agent_failure(self, mock_post):
         """Test agent registration failure."""
         # Mock registration failure response
@@ -252,7 +377,7 @@ class TestHTTPTransmitter:
         assert result is None
         mock_post.assert_called_once()
 
-    @patch('agent.transport.http_transmitter.requests.Session.post')
+    @patch('httpx.Client.post')
     def test_register_agent_missing_api_key(self, mock_post):
         """Test agent registration with missing API key in response."""
         # Mock response without API key
@@ -284,16 +409,43 @@ class TestHTTPTransmitter:
         
         transmitter.close()
 
-    def test_session_headers(self):
-        """Test that session has correct default headers."""
-        headers = self.transmitter.session.headers
+    def test_client_headers(self):
+        """Test that the client has correct default headers."""
+        headers = self.transmitter.client.headers
         
         assert headers['Content-Type'] == 'application/json'
         assert headers['User-Agent'] == 'LinuxServerMonitor-Agent/1.0'
 
+    def test_keepalive_expiry_applied_to_pool(self):
+        """Test that idle connections are kept long enough to span a collection cycle."""
+        transmitter = HTTPTransmitter(server_url=self.server_url, keepalive_expiry=90)
+        
+        assert transmitter._limits.keepalive_expiry == 90
+        
+        transmitter.close()
+
+    def test_close_closes_client(self):
+        """Test that close releases the pooled client connections."""
+        transmitter = HTTPTransmitter(server_url=self.server_url)
+        
+        transmitter.close()
+        
+        assert transmitter.client.is_closed
+
+    @patch('agent.transport.http_transmitter.orjson', None)
+    @patch('httpx.Client.post')
+    def test_send_metrics_without_orjson(self, mock_post):
+        """Test that the stdlib fallback serializes slotted dataclasses."""
+        mock_post.return_value = Mock(status_code=201)
+        
+        assert self.transmitter.send_metrics(self.sample_metrics, self.api_key) is True
+        
+        parsed_data = json.loads(mock_post.call_args[1]['content'])
+        assert parsed_data['disk_usage'][0]['mountpoint'] == "/"
+
     def test_json_serialization_in_send_metrics(self):
         """Test that metrics are properly serialized to JSON."""
-        with patch('agent.transport.http_transmitter.requests.Session.post') as mock_post:
+        with patch('httpx.Client.post') as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_post.return_value = mock_response
@@ -302,7 +454,7 @@ class TestHTTPTransmitter:
             
             # Verify that the data sent is valid JSON
             call_args = mock_post.call_args
-            sent_data = call_args[1]['data']
+            sent_data = call_args[1]['content']
             
             # Should be able to parse as JSON
             parsed_data = json.loads(sent_data)
@@ -20,7 +20,7 @@ class TestMetricsIntegration:
         # Collect all metrics
         cpu_usage = collector.collect_cpu_usage()
         memory_data = collector.collect_memory_usage()
-        disk_data = collector.collect_disk_usage()
+        disk_usage = collector.collect_disk_usage()
         load_data = collector.collect_load_average()
         uptime = collector.collect_uptime()
         failed_services = monitor.get_failed_services()
@@ -32,16 +32,6 @@ class TestMetricsIntegration:
             percentage=memory_data['percentage']
         )
         
-        disk_usage = [
-            DiskUsage(
-                mountpoint=disk['mountpoint'],
-                total=disk['total'],
-                used=disk['used'],
-                percentage=disk['percentage']
-            )
-            for disk in disk_data
-        ]
-        
         load_average = LoadAverage(
             one_min=load_data['1min'],
             five_min=load_data['5min'],
@@ -3,8 +3,12 @@ Tests for agent metrics collection functionality.
 """
 
 import pytest
+from unittest.mock import Mock, patch
+from agent.metrics import collector as collector_module
 from agent.metrics.collector import MetricsCollector
+from agent.metrics import systemd_monitor as systemd_module
 from agent.metrics.systemd_monitor import SystemdMonitor
+from shared.models import DiskUsage, FailedService
 
 
 class TestMetricsCollector:
@@ -47,21 +51,44 @@ class TestMetricsCollector:
         assert len(disk_usage) > 0  # Should have at least one mounted filesystem
         
         for disk in disk_usage:
-            assert isinstance(disk, dict)
-            assert 'mountpoint' in disk
-            assert 'total' in disk
-            assert 'used' in disk
-            assert 'percentage' in disk
+            assert isinstance(disk, DiskUsage)
             
-            assert isinstance(disk['mountpoint'], str)
-            assert isinstance(disk['total'], int)
-            assert isinstance(disk['used'], int)
-            assert isinstance(disk['percentage'], float)
+            assert isinstance(disk.mountpoint, str)
+            assert isinstance(disk.total, int)
+            assert isinstance(disk.used, int)
+            assert isinstance(disk.percentage, float)
             
-            assert disk['total'] > 0
-            assert disk['used'] >= 0
-            assert 0.0 <= disk['percentage'] <= 100.0
-            assert disk['used'] <= disk['total']
+            assert disk.total > 0
+            assert disk.used >= 0
+            assert 0.0 <= disk.percentage <= 100.0
+            assert disk.used <= disk.total
+
+    def test_disk_partitions_cached_between_collections(self):
+        """Test that the partition table is not re-read on every collection."""
+        partitions = collector_module.psutil.disk_partitions()
+        
+        with patch.object(collector_module, '_partition_cache', (0.0, [])), \
+             patch.object(collector_module.psutil, 'disk_partitions',
+                          return_value=partitions) as mock_partitions:
+            self.collector.collect_disk_usage()
+            self.collector.collect_disk_usage()
+        
+        mock_partitions.assert_called_once()
+
+    def test_collect_disk_usage_skips_pseudo_filesystems(self):
+        """Test that tmpfs/overlay style mounts are not reported."""
+        partitions = [
+            Mock(mountpoint='/', fstype='ext4'),
+            Mock(mountpoint='/run', fstype='tmpfs'),
+            Mock(mountpoint='/snap/core', fstype='squashfs'),
+        ]
+        
+        with patch.object(collector_module, '_partition_cache', (0.0, [])), \
+             patch.object(collector_module.psutil, 'disk_partitions',
+                          return_value=partitions):
+            disk_usage = self.collector.collect_disk_usage()
+        
+        assert [disk.mountpoint for disk in disk_usage] == ['/']
 
     def test_collect_load_average(self):
         """Test load average collection returns valid data structure."""
@@ -95,6 +122,20 @@ class TestSystemdMonitor:
     def setup_method(self):
         """Set up test fixtures."""
         self.monitor = SystemdMonitor()
+        # Exercise the query paths even where the test host lacks systemd
+        self.monitor._has_systemd = True
+
+    def test_get_failed_services_without_systemd(self):
+        """Test that hosts without systemd skip D-Bus and systemctl entirely."""
+        with patch.object(systemd_module.os.path, 'isdir', return_value=False):
+            monitor = SystemdMonitor()
+        
+        with patch.object(systemd_module.subprocess, 'run') as mock_run, \
+             patch.object(monitor, '_get_bus') as mock_bus:
+            assert monitor.get_failed_services() == []
+        
+        mock_run.assert_not_called()
+        mock_bus.assert_not_called()
 
     def test_get_failed_services(self):
         """Test failed services detection returns valid data structure."""
@@ -111,4 +152,144 @@ class TestSystemdMonitor:
             assert isinstance(service.name, str)
             assert isinstance(service.status, str)
             assert len(service.name) > 0
-            assert service.status == 'failed'
\ No newline at end of file
+            assert service.status == 'failed'
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_systemctl_json_output_parsed(self, use_orjson):
+        """Test parsing of systemctl JSON output with and without orjson."""
+        if use_orjson:
+            pytest.importorskip("orjson")
+        
+        output = (
+            '[{"unit":"nginx.service","load":"loaded","active":"failed","sub":"failed"},'
+            '{"unit":"ssh.service","load":"loaded","active":"active","sub":"running"}]'
+        )
+        result = Mock(returncode=0, stdout=output)
+        
+        with patch.object(systemd_module.subprocess, 'run', return_value=result):
+            if use_orjson:
+                failed_services = self.monitor._get_failed_services_systemctl()
+            else:
+                with patch.object(systemd_module, 'orjson', None):
+                    failed_services = self.monitor._get_failed_services_systemctl()
+        
+        assert failed_services == [FailedService(name='nginx.service', status='failed', since=None)]
+
+    def test_systemctl_show_output_parsed(self):
+        """Test parsing of the systemctl show fallback output."""
+        output = (
+            "Id=nginx.service\nActiveState=failed\n\n"
+            "Id=backup.timer\nActiveState=failed\n\n"
+            "Id=ssh.service\nActiveState=active\n"
+        )
+        result = Mock(returncode=0, stdout=output)
+        
+        with patch.object(systemd_module.subprocess, 'run', return_value=result) as mock_run:
+            failed_services = self.monitor._get_failed_services_show()
+        
+        assert mock_run.call_args[0][0][:2] == ['systemctl', 'show']
+        assert [service.name for service in failed_services] == ['nginx.service', 'backup.timer']
+
+    def test_get_failed_services_via_dbus(self):
+        """Test that failed units are read from the systemd D-Bus reply."""
+        jeepney = pytest.importorskip("jeepney")
+        
+        def send_and_get_reply(message, timeout=None):
+            units = [
+                ('nginx.service', 'nginx', 'loaded', 'failed', 'failed', '',
+                 '/org/freedesktop/systemd1/unit/nginx_2eservice', 0, '', '/'),
+            ]
+            return jeepney.new_method_return(message, 'a(ssssssouso)', (units,))
+        
+        self.monitor._bus = Mock()
+        self.monitor._bus.send_and_get_reply.side_effect = send_and_get_reply
+        
+        with patch.object(self.monitor, '_start_watching', return_value=False), \
+             patch.object(self.monitor, '_get_failed_services_systemctl') as mock_systemctl:
+            failed_services = self.monitor.get_failed_services()
+        
+        mock_systemctl.assert_not_called()
+        assert [service.name for service in failed_services] == ['nginx.service']
+        assert failed_services[0].status == 'failed'
+
+    def test_get_failed_services_falls_back_to_systemctl(self):
+        """Test that a broken D-Bus connection falls back to systemctl."""
+        pytest.importorskip("jeepney")
+        
+        broken_bus = Mock()
+        broken_bus.send_and_get_reply.side_effect = ConnectionResetError()
+        self.monitor._bus = broken_bus
+        
+        with patch.object(self.monitor, '_start_watching', return_value=False), \
+             patch.object(systemd_module, 'open_dbus_connection',
+                          side_effect=FileNotFoundError()), \
+             patch.object(self.monitor, '_get_failed_services_systemctl',
+                          return_value=[]) as mock_systemctl:
+            assert self.monitor.get_failed_services() == []
+        
+        broken_bus.close.assert_called_once()
+        mock_systemctl.assert_called_once()
+
+    def test_dbus_connection_reused_and_closed(self):
+        """Test that the D-Bus connection is opened once and closed on demand."""
+        pytest.importorskip("jeepney")
+        
+        mock_bus = Mock()
+        with patch.object(self.monitor, '_start_watching', return_value=False), \
+             patch.object(systemd_module, 'open_dbus_connection',
+                          return_value=mock_bus) as mock_open, \
+             patch.object(self.monitor, '_get_failed_services_dbus', return_value=[]):
+            self.monitor.get_failed_services()
+            self.monitor.get_failed_services()
+        
+        mock_open.assert_called_once_with(bus='SYSTEM')
+        
+        self.monitor.close()
+        mock_bus.close.assert_called_once()
+        assert self.monitor._bus is None
+
+    def test_unit_name_decoded_from_object_path(self):
+        """Test that escaped unit object paths decode to unit names."""
+        path = '/org/freedesktop/systemd1/unit/getty_40tty1_2eservice'
+        
+        assert systemd_module._unit_name_from_path(path) == 'getty@tty1.service'
+
+    def test_unit_signals_update_failed_set(self):
+        """Test that PropertiesChanged/UnitRemoved signals maintain the failed set."""
+        jeepney = pytest.importorskip("jeepney")
+        
+        unit_path = '/org/freedesktop/systemd1/unit/nginx_2eservice'
+        unit = jeepney.DBusAddress(unit_path, interface='org.freedesktop.DBus.Properties')
+        manager = jeepney.DBusAddress('/org/freedesktop/systemd1',
+                                      interface='org.freedesktop.systemd1.Manager')
+        
+        def state_changed(state):
+            return jeepney.new_signal(
+                unit, 'PropertiesChanged', 'sa{sv}as',
+                ('org.freedesktop.systemd1.Unit', {'ActiveState': ('s', state)}, [])
+            )
+        
+        self.monitor._handle_unit_signal(state_changed('failed'))
+        assert list(self.monitor._failed) == ['nginx.service']
+        
+        self.monitor._handle_unit_signal(state_changed('active'))
+        assert self.monitor._failed == {}
+        
+        self.monitor._handle_unit_signal(state_changed('failed'))
+        self.monitor._handle_unit_signal(
+            jeepney.new_signal(manager, 'UnitRemoved', 'so', ('nginx.service', unit_path))
+        )
+        assert self.monitor._failed == {}
+
+    def test_get_failed_services_served_from_watcher(self):
+        """Test that the watched failed set is returned without polling."""
+        self.monitor._failed = {
+            'nginx.service': FailedService(name='nginx.service', status='failed')
+        }
+        
+        with patch.object(self.monitor, '_start_watching', return_value=True), \
+             patch.object(self.monitor, '_get_failed_services_systemctl') as mock_systemctl:
+            failed_services = self.monitor.get_failed_services()
+        
+        mock_systemctl.assert_not_called()
+        assert [service.name for service in failed_services] == ['nginx.service']
@@ -3,15 +3,20 @@ Tests for agent service orchestrator functionality.
 """
 
 import pytest
+import asyncio
 import os
 import tempfile
 import yaml
 import time
 import threading
-from unittest.mock import Mock, patch, MagicMock
+from concurrent.futures import wait
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 
 from agent.service import AgentService
 from agent.config.manager import AgentConfig
+from agent.transport.http_transmitter import MetricsRejectedError
+from shared.models import DiskUsage
 
 
 class TestAgentService:
@@ -97,7 +102,7 @@ class TestAgentService:
         """Test metrics collection and transmission."""
         # Mock the transmitter instance
         mock_transmitter = Mock()
-        mock_transmitter.send_with_exponential_backoff.return_value = True
+        mock_transmitter.send_metrics_async = AsyncMock(return_value=True)
         mock_transmitter_class.return_value = mock_transmitter
         
         service = AgentService()
@@ -107,19 +112,20 @@ class TestAgentService:
              patch.object(service.metrics_collector, 'collect_memory_usage', 
                          return_value={'total': 8589934592, 'used': 4294967296, 'percentage': 50.0}), \
              patch.object(service.metrics_collector, 'collect_disk_usage',
-                         return_value=[{'mountpoint': '/', 'total': 107374182400, 'used': 53687091200, 'percentage': 50.0}]), \
+                         return_value=[DiskUsage(mountpoint='/', total=107374182400, used=53687091200, percentage=50.0)]), \
              patch.object(service.metrics_collector, 'collect_load_average',
                          return_value={'1min': 1.2, '5min': 1.1, '15min': 0.9}), \
              patch.object(service.metrics_collector, 'collect_uptime', return_value=86400), \
              patch.object(service.systemd_monitor, 'get_failed_services', return_value=[]):
             
             result = service.collect_and_send_metrics()
+            wait(list(service._send_queue))
             
             assert result is True
-            mock_transmitter.send_with_exponential_backoff.assert_called_once()
+            mock_transmitter.send_metrics_async.assert_awaited_once()
             
             # Verify the metrics object passed to transmitter
-            call_args = mock_transmitter.send_with_exponential_backoff.call_args
+            call_args = mock_transmitter.send_metrics_async.call_args
             metrics = call_args[0][0]  # First argument
             api_key = call_args[0][1]  # Second argument
             
@@ -129,13 +135,197 @@ class TestAgentService:
             assert metrics.load_average.one_min == 1.2
             assert metrics.uptime == 86400
             assert api_key == 'test-api-key'
+            datetime.strptime(metrics.timestamp, '%Y-%m-%dT%H:%M:%SZ')
+
+    @patch('agent.service.HTTPTransmitter')
+    def test_slow_metrics_collected_every_nth_cycle(self, mock_transmitter_class):
+        """Test that disk usage and failed services reuse cached values between slow ticks."""
+        mock_transmitter = Mock()
+        mock_transmitter.send_metrics_async = AsyncMock(return_value=True)
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        service.config.slow_divisor = 3
+        
+        with patch.object(service.metrics_collector, 'collect_cpu_usage', return_value=45.2), \
+             patch.object(service.metrics_collector, 'collect_memory_usage',
+                         return_value={'total': 100, 'used': 50, 'percentage': 50.0}), \
+             patch.object(service.metrics_collector, 'collect_disk_usage',
+                         return_value=[DiskUsage(mountpoint='/', total=100, used=50, percentage=50.0)]) as mock_disk, \
+             patch.object(service.metrics_collector, 'collect_load_average',
+                         return_value={'1min': 1.2, '5min': 1.1, '15min': 0.9}), \
+             patch.object(service.metrics_collector, 'collect_uptime', return_value=86400), \
+             patch.object(service.systemd_monitor, 'get_failed_services', return_value=[]) as mock_failed:
+            
+            for _ in range(4):
+                assert service.collect_and_send_metrics() is True
+        
+        wait(list(service._send_queue))
+        assert mock_disk.call_count == 2
+        assert mock_failed.call_count == 2
+        
+        # Cached disk usage is still reported on the in-between cycles
+        metrics = mock_transmitter.send_metrics_async.call_args[0][0]
+        assert len(metrics.disk_usage) == 1
+
+    @patch('agent.service.HTTPTransmitter')
+    def test_failed_collectors_handled_per_metric(self, mock_transmitter_class):
+        """Test that one failing collector does not discard the others."""
+        mock_transmitter = Mock()
+        mock_transmitter.send_metrics_async = AsyncMock(return_value=True)
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        service._last_disk = [DiskUsage(mountpoint='/', total=100, used=50, percentage=50.0)]
+        
+        with patch.object(service.metrics_collector, 'collect_cpu_usage', return_value=45.2), \
+             patch.object(service.metrics_collector, 'collect_memory_usage',
+                         return_value={'total': 100, 'used': 50, 'percentage': 50.0}), \
+             patch.object(service.metrics_collector, 'collect_disk_usage',
+                         side_effect=OSError("statvfs failed")), \
+             patch.object(service.metrics_collector, 'collect_load_average',
+                         return_value={'1min': 1.2, '5min': 1.1, '15min': 0.9}), \
+             patch.object(service.metrics_collector, 'collect_uptime', return_value=86400), \
+             patch.object(service.systemd_monitor, 'get_failed_services', return_value=[]):
+            
+            # Disk collection failed, so the cached disk usage is reported
+            assert service.collect_and_send_metrics() is True
+            wait(list(service._send_queue))
+            metrics = mock_transmitter.send_metrics_async.call_args[0][0]
+            assert metrics.disk_usage == service._last_disk
+            
+            # A fast metric failing means there is no sample to send
+            with patch.object(service.metrics_collector, 'collect_cpu_usage',
+                              side_effect=RuntimeError("no cpu stats")):
+                assert service.collect_and_send_metrics() is False
+        
+        mock_transmitter.send_metrics_async.assert_awaited_once()
+
+    @patch('agent.service.HTTPTransmitter')
+    def test_metrics_batched_until_batch_size(self, mock_transmitter_class):
+        """Test that samples are buffered and sent together once the batch is full."""
+        mock_transmitter = Mock()
+        mock_transmitter.send_metrics_async = AsyncMock(return_value=True)
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        service.config.batch_size = 3
+        
+        with patch.object(service.metrics_collector, 'collect_cpu_usage', return_value=45.2), \
+             patch.object(service.metrics_collector, 'collect_memory_usage',
+                         return_value={'total': 100, 'used': 50, 'percentage': 50.0}), \
+             patch.object(service.metrics_collector, 'collect_disk_usage',
+                         return_value=[DiskUsage(mountpoint='/', total=100, used=50, percentage=50.0)]), \
+             patch.object(service.metrics_collector, 'collect_load_average',
+                         return_value={'1min': 1.2, '5min': 1.1, '15min': 0.9}), \
+             patch.object(service.metrics_collector, 'collect_uptime', return_value=86400), \
+             patch.object(service.systemd_monitor, 'get_failed_services', return_value=[]):
+            
+            assert service.collect_and_send_metrics() is True
+            assert service.collect_and_send_metrics() is True
+            mock_transmitter.send_metrics_async.assert_not_called()
+            
+            # Third sample fills the batch; a failed send puts it back
+            mock_transmitter.send_metrics_async.return_value = False
+            assert service.collect_and_send_metrics() is True
+            wait(list(service._send_queue))
+            assert len(service._pending) == 3
+            
+            mock_transmitter.send_metrics_async.return_value = True
+            assert service.collect_and_send_metrics() is True
+            wait(list(service._send_queue))
+        
+        batch = mock_transmitter.send_metrics_async.call_args[0][0]
+        assert len(batch) == 4
+        assert len(service._pending) == 0
+        
+        # Samples between slow ticks share the cached disk usage list
+        assert all(sample.disk_usage is batch[0].disk_usage for sample in batch)
+
+    @patch('agent.service.HTTPTransmitter')
+    def test_batch_flush_does_not_block_collection(self, mock_transmitter_class):
+        """Test that a slow batch send keeps later samples buffered instead of blocking."""
+        release = threading.Event()
+        
+        async def slow_send(*args, **kwargs):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            return True
+        
+        mock_transmitter = Mock()
+        mock_transmitter.send_metrics_async = AsyncMock(side_effect=slow_send)
+        mock_transmitter.aclose = AsyncMock()
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        service.config.batch_size = 2
+        
+        for i in range(4):
+            service._queue_for_batch(Mock(name=f"sample-{i}"))
+        
+        # Only the first batch is in flight; the rest wait for it
+        assert not service._batch_future.done()
+        assert len(service._pending) == 2
+        
+        release.set()
+        wait([service._batch_future])
+        mock_transmitter.send_metrics_async.assert_called_once()
+        service._flush_pending()
+        wait([service._batch_future])
+        
+        assert mock_transmitter.send_metrics_async.call_count == 2
+        assert len(service._pending) == 0
+        service._stop_send_loop()
+
+    @patch('agent.service.HTTPTransmitter')
+    def test_rejected_batch_dropped(self, mock_transmitter_class):
+        """Test that a batch the server permanently rejects is not requeued."""
+        mock_transmitter = Mock()
+        mock_transmitter.send_metrics_async = AsyncMock(side_effect=MetricsRejectedError(422))
+        mock_transmitter.aclose = AsyncMock()
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        service.config.batch_size = 2
+        
+        with patch('agent.service.logger') as mock_logger:
+            for i in range(2):
+                service._queue_for_batch(Mock(name=f"sample-{i}"))
+            wait([service._batch_future])
+        
+        assert service._batch_future.result() is False
+        assert len(service._pending) == 0
+        mock_logger.error.assert_called_once_with(
+            "Dropping batch of 2 metrics samples: Server rejected metrics with status 422"
+        )
+        service._stop_send_loop()
+
+    @patch('agent.service.HTTPTransmitter')
+    @patch('agent.service.MAX_BATCH_SAMPLES', 2)
+    def test_flush_sends_at_most_max_batch_samples(self, mock_transmitter_class):
+        """Test that a flush sends the oldest samples up to the batch endpoint's limit."""
+        mock_transmitter = Mock()
+        mock_transmitter.send_metrics_async = AsyncMock(return_value=True)
+        mock_transmitter.aclose = AsyncMock()
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        samples = [Mock(name=f"sample-{i}") for i in range(3)]
+        service._pending.extend(samples)
+        
+        service._flush_pending()
+        wait([service._batch_future])
+        
+        assert mock_transmitter.send_metrics_async.call_args[0][0] == samples[:2]
+        assert list(service._pending) == samples[2:]
+        service._stop_send_loop()
 
     @patch('agent.service.HTTPTransmitter')
     def test_collect_and_send_metrics_failure(self, mock_transmitter_class):
         """Test metrics collection when transmission fails."""
         # Mock the transmitter instance to fail
         mock_transmitter = Mock()
-        mock_transmitter.send_with_exponential_backoff.return_value = False
+        mock_transmitter.send_metrics_async = AsyncMock(return_value=False)
         mock_transmitter_class.return_value = mock_transmitter
         
         service = AgentService()
@@ -145,16 +335,52 @@ class TestAgentService:
              patch.object(service.metrics_collector, 'collect_memory_usage', 
                          return_value={'total': 8589934592, 'used': 4294967296, 'percentage': 50.0}), \
              patch.object(service.metrics_collector, 'collect_disk_usage',
-                         return_value=[{'mountpoint': '/', 'total': 107374182400, 'used': 53687091200, 'percentage': 50.0}]), \
+                         return_value=[DiskUsage(mountpoint='/', total=107374182400, used=53687091200, percentage=50.0)]), \
              patch.object(service.metrics_collector, 'collect_load_average',
                          return_value={'1min': 1.2, '5min': 1.1, '15min': 0.9}), \
              patch.object(service.metrics_collector, 'collect_uptime', return_value=86400), \
              patch.object(service.systemd_monitor, 'get_failed_services', return_value=[]):
             
-            result = service.collect_and_send_metrics()
+            with patch('agent.service.logger') as mock_logger:
+                # The sample is queued; the failed send is reported by the worker
+                result = service.collect_and_send_metrics()
+                wait(list(service._send_queue))
             
-            assert result is False
-            mock_transmitter.send_with_exponential_backoff.assert_called_once()
+            assert result is True
+            mock_transmitter.send_metrics_async.assert_awaited_once()
+            mock_logger.error.assert_called_once_with("Failed to send metrics after all retry attempts")
+
+    @patch('agent.service.HTTPTransmitter')
+    def test_send_queue_drops_oldest_when_full(self, mock_transmitter_class):
+        """Test that a slow server cannot make outstanding sends grow without bound."""
+        from agent.service import MAX_QUEUED_SENDS
+        
+        async def slow_send(*args):
+            await asyncio.sleep(5)
+            return True
+        
+        mock_transmitter = Mock()
+        mock_transmitter.send_metrics_async = AsyncMock(side_effect=slow_send)
+        mock_transmitter.aclose = AsyncMock()
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        futures = []
+        for i in range(MAX_QUEUED_SENDS + 2):
+            service._submit_send(Mock(name=f"sample-{i}"))
+            futures.append(service._send_queue[-1])
+        
+        # All sends run concurrently on one loop; the two oldest were dropped
+        assert len(service._send_queue) == MAX_QUEUED_SENDS
+        assert futures[0].cancelled() and futures[1].cancelled()
+        assert not any(future.done() for future in futures[2:])
+        
+        with patch('agent.service.SEND_DRAIN_TIMEOUT', 0.1):
+            service._stop_send_loop()
+        
+        assert all(future.cancelled() for future in futures)
+        mock_transmitter.aclose.assert_awaited_once()
+        assert not service._send_thread.is_alive()
 
     @patch('agent.service.HTTPTransmitter')
     def test_start_and_stop_service(self, mock_transmitter_class):
@@ -162,6 +388,7 @@ class TestAgentService:
         # Mock the transmitter instance
         mock_transmitter = Mock()
         mock_transmitter.authenticate.return_value = True
+        mock_transmitter.aclose = AsyncMock()
         mock_transmitter_class.return_value = mock_transmitter
         
         service = AgentService()
@@ -185,6 +412,46 @@ class TestAgentService:
             service._collection_thread.join(timeout=1)
             assert not service._collection_thread.is_alive()
 
+    @patch('agent.service.HTTPTransmitter')
+    def test_signal_handler_only_requests_shutdown(self, mock_transmitter_class):
+        """Test that a signal wakes run(), which then stops the service."""
+        import signal
+        
+        mock_transmitter = Mock()
+        mock_transmitter.authenticate.return_value = True
+        mock_transmitter.aclose = AsyncMock()
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        
+        with patch.object(service, 'collect_and_send_metrics', return_value=True), \
+             patch('agent.service.signal.signal'), \
+             patch.object(service, 'stop', wraps=service.stop) as mock_stop:
+            threading.Timer(0.2, service._signal_handler, args=(signal.SIGTERM, None)).start()
+            service.run()
+        
+        mock_stop.assert_called_once()
+        assert service._running is False
+        assert not service._collection_thread.is_alive()
+
+    @patch('agent.service.HTTPTransmitter')
+    def test_collection_loop_subtracts_collection_time(self, mock_transmitter_class):
+        """Test that the loop waits only for the remainder of the interval."""
+        mock_transmitter_class.return_value = Mock()
+        
+        service = AgentService()
+        service._running = True
+        service._shutdown_event = Mock()
+        service._shutdown_event.is_set.return_value = False
+        service._shutdown_event.wait.return_value = True  # stop after one cycle
+        
+        # Collection starts at t=100 and finishes at t=103
+        with patch.object(service, 'collect_and_send_metrics', return_value=True), \
+             patch('agent.service.time.monotonic', side_effect=[100.0, 103.0]):
+            service._collection_loop()
+        
+        service._shutdown_event.wait.assert_called_once_with(timeout=57.0)
+
     @patch('agent.service.HTTPTransmitter')
     def test_start_with_authentication_failure(self, mock_transmitter_class):
         """Test starting service when authentication fails."""
@@ -201,6 +468,29 @@ class TestAgentService:
         assert "Authentication failed" in str(exc_info.value)
         assert service._running is False
 
+    @patch('agent.service.HTTPTransmitter')
+    def test_stop_without_start_releases_send_loop(self, mock_transmitter_class):
+        """Test that stop() shuts down a send loop even if the service never started."""
+        mock_transmitter = Mock()
+        mock_transmitter.authenticate.return_value = False
+        mock_transmitter.send_metrics_async = AsyncMock(return_value=True)
+        mock_transmitter.aclose = AsyncMock()
+        mock_transmitter_class.return_value = mock_transmitter
+        
+        service = AgentService()
+        
+        # No send has been made, so no thread was started
+        with pytest.raises(RuntimeError):
+            service.start()
+        assert service._send_thread is None
+        
+        service._submit_send(Mock(name="sample"))
+        send_thread = service._send_thread
+        service.stop()
+        
+        assert not send_thread.is_alive()
+        mock_transmitter.aclose.assert_awaited_once()
+
     @patch('agent.service.HTTPTransmitter')
     def test_get_status(self, mock_transmitter_class):
         """Test getting service status information."""
@@ -237,6 +527,19 @@ class TestAgentService:
         assert server_id.startswith('agent-')
         assert len(server_id) > len('agent-')
 
+    @patch('agent.service.HTTPTransmitter')
+    def test_generated_server_id_cached(self, mock_transmitter_class):
+        """Test that the hostname is looked up once, not on every cycle."""
+        mock_transmitter_class.return_value = Mock()
+        
+        with patch('socket.gethostname', return_value='web-01') as mock_hostname:
+            service = AgentService()
+            service.get_status()
+            service.get_status()
+        
+        assert service.get_status()['server_id'] == 'agent-web-01'
+        mock_hostname.assert_called_once()
+
     @patch('agent.service.HTTPTransmitter')
     def test_reload_config(self, mock_transmitter_class):
         """Test configuration reloading."""
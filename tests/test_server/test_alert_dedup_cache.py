@@ -0,0 +1,70 @@
+"""
+Tests for the active alert cache.
+
+Tests expiry, LRU eviction, and updates of the per-server active alert keys
+used for alert deduplication.
+"""
+
+from unittest.mock import patch
+
+from server.alerts.dedup_cache import ActiveAlertCache
+
+
+class TestActiveAlertCache:
+    """Test cases for ActiveAlertCache class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.cache = ActiveAlertCache(ttl=60.0, max_servers=2)
+
+    def test_get_returns_stored_keys(self):
+        """Test that stored keys are returned and counted as hits."""
+        self.cache.store("server-1", {("cpu", None)})
+
+        assert self.cache.get("server-1") == {("cpu", None)}
+        assert self.cache.get("server-2") is None
+        assert self.cache.statistics()["hit_rate"] == 0.5
+
+    def test_entries_expire_after_ttl(self):
+        """Test that entries older than the TTL are treated as missing."""
+        with patch("server.alerts.dedup_cache.time.monotonic", return_value=100.0):
+            self.cache.store("server-1", set())
+        with patch("server.alerts.dedup_cache.time.monotonic", return_value=160.0):
+            assert self.cache.get("server-1") is None
+
+    def test_add_and_invalidate(self):
+        """Test that created alerts are added and invalidation drops the entry."""
+        self.cache.store("server-1", set())
+        self.cache.add("server-1", ("disk", "/var"))
+        self.cache.add("server-2", ("cpu", None))  # Not cached; ignored
+
+        assert self.cache.get("server-1") == {("disk", "/var")}
+        assert self.cache.get("server-2") is None
+
+        self.cache.invalidate("server-1")
+        assert self.cache.get("server-1") is None
+
+    def test_discard_removes_resolved_keys(self):
+        """Test that resolved alerts are removed from the cached entry."""
+        self.cache.store("server-1", {("cpu", None), ("disk", "/"), ("disk", "/var")})
+        self.cache.discard("server-1", {("cpu", None), ("disk", "/var")})
+
+        assert self.cache.get("server-1") == {("disk", "/")}
+
+    def test_least_recently_used_server_is_evicted(self):
+        """Test that the cache holds at most max_servers entries."""
+        self.cache.store("server-1", set())
+        self.cache.store("server-2", set())
+        self.cache.get("server-1")
+        self.cache.store("server-3", set())
+
+        assert self.cache.get("server-2") is None
+        assert self.cache.get("server-1") == set()
+        assert self.cache.get("server-3") == set()
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that a TTL of zero never caches anything."""
+        cache = ActiveAlertCache(ttl=0)
+        cache.store("server-1", {("cpu", None)})
+
+        assert cache.get("server-1") is None
@@ -5,13 +5,22 @@ Tests the alert engine's ability to evaluate metrics, trigger alerts,
 and send notifications according to the requirements.
 """
 
+import json
 import pytest
+import requests
+import time
+from concurrent.futures import Future
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from server.alerts.engine import AlertEngine
-from server.database.models import Alert, Server, Metric
+from server.alerts.engine import AlertEngine, _active_alert_cache, _webhook_breaker
+from server.database.models import Alert, Base, Server, Metric
+from server.database.operations import AlertOperations, HealthStatusOperations
 from shared.models import SystemMetrics, MemoryInfo, DiskUsage, LoadAverage, FailedService
 
 
@@ -20,6 +29,8 @@ class TestAlertEngine:
     
     def setup_method(self):
         """Set up test fixtures."""
+        _active_alert_cache.clear()
+        _webhook_breaker.clear()
         self.mock_session = Mock(spec=Session)
         self.webhook_urls = ["http://webhook1.example.com", "http://webhook2.example.com"]
         self.alert_engine = AlertEngine(self.mock_session, self.webhook_urls)
@@ -85,13 +96,13 @@ class TestAlertEngine:
         metrics = self.create_test_metrics(cpu_usage=95.0)
         
         # Execute
-        with patch.object(self.alert_engine, '_process_alert') as mock_process:
+        with patch.object(self.alert_engine, '_process_alerts') as mock_process:
             alerts = self.alert_engine.evaluate_metrics(metrics)
         
         # Verify
         assert len(alerts) == 1
         mock_create_alert.assert_called_once()
-        mock_process.assert_called_once_with(mock_alert)
+        mock_process.assert_called_once_with([mock_alert])
         
         # Check alert creation parameters
         call_args = mock_create_alert.call_args
@@ -99,7 +110,7 @@ class TestAlertEngine:
         assert call_args[1]['severity'] == 'critical'  # > 95%
         assert call_args[1]['actual_value'] == 95.0
     
-    @patch('server.database.operations.AlertOperations.create_alert')
+    @patch('server.database.operations.AlertOperations.create_alert_if_absent')
     @patch('server.database.operations.AlertOperations.get_active_alerts')
     def test_evaluate_metrics_disk_threshold_exceeded(self, mock_get_alerts, mock_create_alert):
         """Test disk threshold alert triggering."""
@@ -112,13 +123,13 @@ class TestAlertEngine:
         metrics = self.create_test_metrics(disk_percentages=[85.0, 30.0])  # One high, one normal
         
         # Execute
-        with patch.object(self.alert_engine, '_process_alert') as mock_process:
+        with patch.object(self.alert_engine, '_process_alerts') as mock_process:
             alerts = self.alert_engine.evaluate_metrics(metrics)
         
         # Verify
         assert len(alerts) == 1
         mock_create_alert.assert_called_once()
-        mock_process.assert_called_once_with(mock_alert)
+        mock_process.assert_called_once_with([mock_alert])
         
         # Check alert creation parameters
         call_args = mock_create_alert.call_args
@@ -126,6 +137,105 @@ class TestAlertEngine:
         assert call_args[1]['severity'] == 'warning'  # < 90%
         assert call_args[1]['actual_value'] == 85.0
     
+    @patch('server.database.operations.AlertOperations.resolve_alerts_bulk')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_healthy_sample_uses_cache(self, mock_get_alerts, mock_resolve_bulk):
+        """Test that healthy samples of a server without alerts cost one cached lookup."""
+        mock_get_alerts.return_value = []
+        metrics = self.create_test_metrics(cpu_usage=50.0, disk_percentages=[30.0, 80.0])
+        
+        assert self.alert_engine.evaluate_metrics(metrics) == []
+        assert self.alert_engine.evaluate_metrics(metrics) == []
+        
+        mock_get_alerts.assert_called_once()
+        mock_resolve_bulk.assert_not_called()
+        self.mock_session.commit.assert_not_called()
+    
+    @patch('server.database.operations.AlertOperations.resolve_alerts_bulk')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_resolves_recovered_alerts(self, mock_get_alerts, mock_resolve_bulk):
+        """Test that cleared CPU and disk conditions are resolved in one call."""
+        mock_get_alerts.return_value = [
+            Mock(spec=Alert, alert_type='cpu', mountpoint=None),
+            Mock(spec=Alert, alert_type='disk', mountpoint='/disk0'),
+            Mock(spec=Alert, alert_type='disk', mountpoint='/disk1'),
+        ]
+        mock_resolve_bulk.return_value = [1, 2]
+        metrics = self.create_test_metrics(cpu_usage=50.0, disk_percentages=[30.0, 85.0])
+        
+        alerts = self.alert_engine.evaluate_metrics(metrics)
+        
+        assert alerts == []  # /disk1 is still high but already alerted
+        mock_resolve_bulk.assert_called_once_with(
+            self.mock_session, "test-server", alert_types=['cpu'], disk_mountpoints=['/disk0']
+        )
+        self.mock_session.commit.assert_called_once()
+        assert _active_alert_cache.get("test-server") == {('disk', '/disk1')}
+    
+    @patch('server.database.operations.AlertOperations.create_alert')
+    @patch('server.database.operations.AlertOperations.resolve_alerts_bulk')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_commits_once_per_cycle(self, mock_get_alerts, mock_resolve_bulk,
+                                                     mock_create_alert):
+        """Test that resolutions and new alerts of a sample share one commit."""
+        mock_get_alerts.return_value = [Mock(spec=Alert, alert_type='cpu', mountpoint=None)]
+        mock_resolve_bulk.return_value = [1]
+        mock_create_alert.side_effect = lambda *args, **kwargs: Mock(spec=Alert, id=2)
+        metrics = self.create_test_metrics(cpu_usage=50.0, disk_percentages=[85.0, 95.0])
+        
+        with patch.object(self.alert_engine, '_create_webhook_payload'), \
+                patch.object(self.alert_engine, '_queue_webhook_notifications'):
+            alerts = self.alert_engine.evaluate_metrics(metrics)
+        
+        assert len(alerts) == 2
+        self.mock_session.commit.assert_called_once()
+    
+    @patch('server.database.operations.AlertOperations.resolve_alerts_bulk')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_failed_commit_invalidates_cache(self, mock_get_alerts, mock_resolve_bulk):
+        """Test that a failed commit makes the cache reload the server's alerts."""
+        mock_get_alerts.return_value = [Mock(spec=Alert, alert_type='cpu', mountpoint=None)]
+        mock_resolve_bulk.return_value = [1]
+        self.mock_session.commit.side_effect = RuntimeError("database unavailable")
+        
+        with pytest.raises(RuntimeError):
+            self.alert_engine.evaluate_metrics(self.create_test_metrics(cpu_usage=50.0))
+        
+        assert _active_alert_cache.get("test-server") is None
+    
+    @patch('server.database.operations.AlertOperations.create_alert')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_failed_alert_commit_not_cached(self, mock_get_alerts, mock_create_alert):
+        """Test that an alert whose commit failed is raised again by the next sample."""
+        mock_get_alerts.return_value = []
+        mock_create_alert.side_effect = lambda *args, **kwargs: Mock(spec=Alert)
+        metrics = self.create_test_metrics(cpu_usage=95.0)
+        self.mock_session.commit.side_effect = RuntimeError("db down")
+        
+        with pytest.raises(RuntimeError):
+            self.alert_engine.evaluate_metrics(metrics)
+        
+        self.mock_session.commit.side_effect = None
+        alerts = self.alert_engine.evaluate_metrics(metrics)
+        
+        assert len(alerts) == 1
+        assert mock_create_alert.call_count == 2
+        assert _active_alert_cache.get("test-server") == {('cpu', None)}
+    
+    @patch('server.database.operations.AlertOperations.create_alert')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_batch_dedups_same_server(self, mock_get_alerts, mock_create_alert):
+        """Test that an alert raised by one sample is not raised again later in the batch."""
+        mock_get_alerts.return_value = []
+        mock_create_alert.side_effect = lambda *args, **kwargs: Mock(spec=Alert)
+        metrics = self.create_test_metrics(cpu_usage=95.0, disk_percentages=[85.0])
+        
+        with patch.object(self.alert_engine, '_process_alerts'):
+            alerts = self.alert_engine.evaluate_metrics_batch([metrics, metrics])
+        
+        assert len(alerts) == 2
+        assert mock_create_alert.call_count == 2
+    
     @patch('server.database.operations.AlertOperations.get_active_alerts')
     def test_evaluate_metrics_no_alerts_when_existing_active(self, mock_get_alerts):
         """Test that no new alerts are created when active alerts already exist."""
@@ -143,38 +253,90 @@ class TestAlertEngine:
         # Verify - no new alerts created
         assert len(alerts) == 0
     
+    @patch('server.database.operations.AlertOperations.create_alert_if_absent')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_dedups_disk_alerts_by_mountpoint(self, mock_get_alerts, mock_create_alert):
+        """Test that active alerts are fetched once and matched per mountpoint."""
+        existing_alert = Mock(spec=Alert)
+        existing_alert.alert_type = 'disk'
+        existing_alert.mountpoint = '/disk0'
+        mock_get_alerts.return_value = [existing_alert]
+        mock_create_alert.return_value = Mock(spec=Alert)
+
+        metrics = self.create_test_metrics(disk_percentages=[85.0, 95.0])
+
+        with patch.object(self.alert_engine, '_process_alerts'):
+            alerts = self.alert_engine.evaluate_metrics(metrics)
+
+        assert len(alerts) == 1
+        mock_get_alerts.assert_called_once()
+        assert mock_create_alert.call_args[1]['mountpoint'] == '/disk1'
+
+    @patch('server.database.operations.AlertOperations.create_alert_if_absent')
+    @patch('server.database.operations.AlertOperations.get_active_alerts')
+    def test_evaluate_metrics_uses_active_alert_cache(self, mock_get_alerts, mock_create_alert):
+        """Test that repeated samples from a server reuse the cached active alerts."""
+        mock_get_alerts.return_value = []
+        mock_create_alert.return_value = Mock(spec=Alert)
+        metrics = self.create_test_metrics(disk_percentages=[85.0])
+        
+        with patch.object(self.alert_engine, '_process_alerts'):
+            first = self.alert_engine.evaluate_metrics(metrics)
+            second = self.alert_engine.evaluate_metrics(metrics)
+        
+        assert len(first) == 1
+        assert second == []  # The new disk alert is known to the cache
+        mock_get_alerts.assert_called_once()
+        assert self.alert_engine.get_alert_statistics()["dedup_cache"]["hits"] == 1
+    
     @patch('server.database.operations.AlertOperations.create_alert')
     @patch('server.database.operations.AlertOperations.get_active_alerts')
-    @patch('server.database.operations.ServerOperations.get_all_servers')
-    @patch('server.database.operations.HealthStatusOperations.update_health_status')
-    def test_check_offline_servers(self, mock_update_health, mock_get_servers, 
-                                  mock_get_alerts, mock_create_alert):
+    def test_evaluate_metrics_batch_processes_alerts_once(self, mock_get_alerts, mock_create_alert):
+        """Test that alerts from a whole batch are committed and notified together."""
+        mock_get_alerts.return_value = []
+        mock_create_alert.side_effect = lambda *args, **kwargs: Mock(spec=Alert)
+        batch = [
+            self.create_test_metrics(disk_percentages=[85.0], server_id="server-1"),
+            self.create_test_metrics(server_id="server-2"),
+            self.create_test_metrics(disk_percentages=[30.0, 95.0], server_id="server-3"),
+        ]
+        
+        with patch.object(self.alert_engine, '_process_alerts') as mock_process:
+            alerts = self.alert_engine.evaluate_metrics_batch(batch)
+        
+        assert len(alerts) == 2
+        mock_process.assert_called_once_with(alerts)
+        assert [call[1]['server_id'] for call in mock_create_alert.call_args_list] == ["server-1", "server-3"]
+    
+    @patch('server.database.operations.AlertOperations.create_alerts_batch')
+    @patch('server.database.operations.ServerOperations.get_servers_missing_offline_alert')
+    @patch('server.database.operations.HealthStatusOperations.mark_servers_offline')
+    def test_check_offline_servers(self, mock_mark_offline, mock_get_servers, mock_create_alerts):
         """Test offline server detection and alert creation."""
         # Setup
         old_time = datetime.utcnow() - timedelta(seconds=600)  # 10 minutes ago
-        mock_server = Mock(spec=Server)
-        mock_server.server_id = "offline-server"
-        mock_server.last_seen = old_time
-        
-        mock_get_servers.return_value = [mock_server]
-        mock_get_alerts.return_value = []  # No existing alerts
+        mock_get_servers.return_value = [("offline-server", old_time)]
         mock_alert = Mock(spec=Alert)
-        mock_create_alert.return_value = mock_alert
+        mock_alert.server_id = "offline-server"
+        mock_create_alerts.return_value = [mock_alert]
         
         # Execute
-        with patch.object(self.alert_engine, '_process_alert') as mock_process:
+        with patch.object(self.alert_engine, '_process_alerts') as mock_process:
             alerts = self.alert_engine.check_offline_servers()
         
         # Verify
         assert len(alerts) == 1
-        mock_create_alert.assert_called_once()
-        mock_process.assert_called_once_with(mock_alert)
-        mock_update_health.assert_called_once()
+        mock_create_alerts.assert_called_once()
+        mock_process.assert_called_once_with([mock_alert])
+        mock_mark_offline.assert_called_once()
+        assert mock_mark_offline.call_args[0][:2] == (self.mock_session, ["offline-server"])
         
         # Check alert creation parameters
-        call_args = mock_create_alert.call_args
-        assert call_args[1]['alert_type'] == 'offline'
-        assert call_args[1]['severity'] == 'critical'
+        alert_rows = mock_create_alerts.call_args[0][1]
+        assert len(alert_rows) == 1
+        assert alert_rows[0]['alert_type'] == 'offline'
+        assert alert_rows[0]['severity'] == 'critical'
+        assert "offline for 10 minutes" in alert_rows[0]['message']
     
     @patch('server.alerts.engine.logger')
     def test_log_alert(self, mock_logger):
@@ -191,51 +353,215 @@ class TestAlertEngine:
         # Verify
         mock_logger.log.assert_called_once()
         call_args = mock_logger.log.call_args
-        assert call_args[0][1] == "ALERT [CRITICAL] CPU: High CPU usage"
+        assert call_args[0][1] % call_args[0][2:] == "ALERT [CRITICAL] CPU: High CPU usage"
     
-    @patch('requests.post')
-    @patch('server.database.operations.AlertOperations.update_webhook_status')
-    def test_send_webhook_success(self, mock_update_status, mock_post):
-        """Test successful webhook notification."""
-        # Setup
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+    @patch('server.alerts.engine.logger')
+    def test_log_alert_skipped_when_level_disabled(self, mock_logger):
+        """Test that nothing is formatted or logged when the alert level is disabled."""
+        mock_logger.isEnabledFor.return_value = False
+        mock_alert = Mock(spec=Alert)
+        mock_alert.severity = 'warning'
         
-        payload = {"test": "data"}
+        self.alert_engine._log_alert(mock_alert)
         
-        # Execute
-        result = self.alert_engine._send_webhook("http://test.com", payload, 123)
+        mock_logger.log.assert_not_called()
+    
+    @patch('requests.Session.post')
+    def test_post_webhook_success(self, mock_post):
+        """Test successful webhook delivery."""
+        mock_post.return_value = Mock(status_code=200)
         
-        # Verify
-        assert result is True
+        response_code = self.alert_engine._post_webhook("http://test.com", b'{"test":"data"}')
+        
+        assert response_code == 200
         mock_post.assert_called_once()
-        mock_update_status.assert_called_once_with(
-            session=self.mock_session,
-            alert_id=123,
-            response_code=200
-        )
+        assert mock_post.call_args[1]["data"] == b'{"test":"data"}'
     
-    @patch('requests.post')
-    @patch('server.database.operations.AlertOperations.update_webhook_status')
-    def test_send_webhook_failure_with_retry(self, mock_update_status, mock_post):
+    @patch('server.alerts.engine.time.sleep')
+    @patch('requests.Session.post')
+    def test_post_webhook_failure_with_retry(self, mock_post, mock_sleep):
         """Test webhook failure with retry logic."""
-        # Setup - all attempts fail
         mock_post.side_effect = Exception("Connection failed")
         
-        payload = {"test": "data"}
+        response_code = self.alert_engine._post_webhook("http://test.com", b'{}')
         
-        # Execute
-        result = self.alert_engine._send_webhook("http://test.com", payload, 123)
-        
-        # Verify
-        assert result is False
+        assert response_code == 0  # 0 indicates network failure
         assert mock_post.call_count == self.alert_engine.webhook_retry_attempts
-        mock_update_status.assert_called_once_with(
-            session=self.mock_session,
-            alert_id=123,
-            response_code=0  # 0 indicates network failure
+        assert mock_sleep.call_count == self.alert_engine.webhook_retry_attempts - 1
+    
+    @patch('server.alerts.engine.time.sleep')
+    @patch('requests.Session.post')
+    def test_post_webhook_client_error_not_retried(self, mock_post, mock_sleep):
+        """Test that 4xx responses other than 429 end the retry chain."""
+        mock_post.return_value = Mock(status_code=404)
+        
+        response_code = self.alert_engine._post_webhook("http://test.com", b'{}')
+        
+        assert response_code == 404
+        mock_post.assert_called_once()
+        mock_sleep.assert_not_called()
+    
+    @patch('server.alerts.engine.time.sleep')
+    @patch('requests.Session.post')
+    def test_post_webhook_skipped_while_circuit_open(self, mock_post, mock_sleep):
+        """Test that a URL failing repeatedly is skipped without being contacted."""
+        mock_post.side_effect = requests.ConnectionError("Connection refused")
+        
+        for _ in range(_webhook_breaker.failure_threshold):
+            assert self.alert_engine._post_webhook("http://test.com", b'{}') == 0
+        mock_post.reset_mock()
+        
+        response_code = self.alert_engine._post_webhook("http://test.com", b'{}')
+        
+        assert response_code == 0
+        mock_post.assert_not_called()
+        circuits = self.alert_engine.get_alert_statistics()["webhook_circuits"]
+        assert circuits["http://test.com"]["open"] is True
+    
+    def test_post_webhook_unexpected_error_settles_trial(self):
+        """Test that a trial delivery that raises still reopens the circuit."""
+        for _ in range(_webhook_breaker.failure_threshold):
+            _webhook_breaker.record_failure("http://test.com")
+        
+        with patch('server.alerts.circuit_breaker.time.monotonic',
+                   return_value=time.monotonic() + _webhook_breaker.cooldown), \
+                patch.object(self.alert_engine, '_post_webhook_with_retries',
+                             side_effect=ValueError("bad payload")):
+            with pytest.raises(ValueError):
+                self.alert_engine._post_webhook("http://test.com", b'{}')
+            
+            circuits = self.alert_engine.get_alert_statistics()["webhook_circuits"]
+        
+        assert circuits["http://test.com"]["trial"] is False
+        assert circuits["http://test.com"]["open"] is True
+    
+    @patch('server.alerts.engine.time.sleep')
+    @patch('requests.Session.post')
+    def test_post_webhook_rate_limited_retried(self, mock_post, mock_sleep):
+        """Test that a 429 response is retried after backing off."""
+        mock_post.side_effect = [Mock(status_code=429), Mock(status_code=200)]
+        
+        response_code = self.alert_engine._post_webhook("http://test.com", b'{}')
+        
+        assert response_code == 200
+        assert mock_post.call_count == 2
+        mock_sleep.assert_called_once()
+    
+    def test_retry_delay_grows_exponentially_and_is_capped(self):
+        """Test backoff delays with jitter stay within their bounds."""
+        self.alert_engine.webhook_base_delay = 1.0
+        self.alert_engine.webhook_max_delay = 5.0
+        
+        for attempt, base in enumerate([1.0, 2.0, 4.0, 5.0, 5.0]):
+            delay = self.alert_engine._retry_delay(attempt)
+            assert base <= delay <= base * 1.25
+    
+    @patch('server.alerts.engine.time.sleep')
+    @patch('requests.Session.post')
+    @patch('server.database.operations.AlertOperations.update_webhook_status_batch')
+    def test_send_webhook_notifications_to_all_urls(self, mock_update_status, mock_post, mock_sleep):
+        """Test that a batch of alerts is delivered to every webhook URL in one request."""
+        mock_post.side_effect = lambda url, **kwargs: Mock(
+            status_code=200 if "webhook1" in url else 503
         )
+        mock_alerts = [
+            Mock(id=alert_id, server_id="test-server", alert_type="disk", mountpoint=f"/disk{alert_id}",
+                 severity="warning", message="High disk usage", threshold_value=80.0,
+                 actual_value=85.0, triggered_at=datetime.utcnow())
+            for alert_id in (7, 8)
+        ]
+        payload = self.alert_engine._create_webhook_payload(mock_alerts)
+
+        self.alert_engine._send_webhook_notifications(self.mock_session, [7, 8], payload)
+
+        posted_urls = sorted(call.args[0] for call in mock_post.call_args_list)
+        assert posted_urls[0] == "http://webhook1.example.com"
+        assert posted_urls.count("http://webhook2.example.com") == self.alert_engine.webhook_retry_attempts
+        posted_payload = json.loads(mock_post.call_args_list[0].kwargs["data"])
+        assert [alert["alert_id"] for alert in posted_payload["alerts"]] == [7, 8]
+        recorded_codes = sorted(call.kwargs["response_code"] for call in mock_update_status.call_args_list)
+        assert recorded_codes == [200, 503]
+        assert all(call.kwargs["alert_ids"] == [7, 8] for call in mock_update_status.call_args_list)
+
+    def test_process_alerts_commits_before_queueing_webhooks(self):
+        """Test that alerts are committed before their webhook is handed off."""
+        mock_alert = Mock(spec=Alert)
+        mock_alert.id = 9
+        mock_alert.severity = "warning"
+        mock_alert.alert_type = "cpu"
+        mock_alert.triggered_at = datetime.utcnow()
+        calls = []
+        self.mock_session.commit.side_effect = lambda: calls.append("commit")
+        
+        delivered = Future()
+        delivered.set_result(None)
+        
+        with patch('server.alerts.engine._webhook_dispatcher') as mock_dispatcher:
+            mock_dispatcher.submit.side_effect = lambda *args: calls.append("submit") or delivered
+            self.alert_engine._process_alerts([mock_alert])
+        
+        assert calls == ["commit", "submit"]
+        fn, alert_ids, payload = mock_dispatcher.submit.call_args[0]
+        assert fn == self.alert_engine._deliver_webhook_notifications
+        assert alert_ids == [9]
+        assert payload["alerts"][0]["alert_id"] == 9
+    
+    @patch('server.alerts.engine.logger')
+    def test_webhook_queue_overflow_is_dropped(self, mock_logger):
+        """Test that notifications beyond the queue bound are logged and dropped."""
+        with patch('server.alerts.engine._webhook_queue_slots') as mock_slots, \
+             patch('server.alerts.engine._webhook_dispatcher') as mock_dispatcher:
+            mock_slots.acquire.return_value = False
+            self.alert_engine._queue_webhook_notifications([1], {"alerts": []})
+        
+        mock_dispatcher.submit.assert_not_called()
+        mock_logger.error.assert_called_once()
+    
+    def test_webhook_payload_serializes_datetimes(self):
+        """Test that payload datetimes are encoded as ISO 8601 strings."""
+        from server.alerts.engine import _dumps_payload
+        
+        body = _dumps_payload({"timestamp": datetime(2024, 1, 1, 12, 0, 0)})
+        
+        assert json.loads(body) == {"timestamp": "2024-01-01T12:00:00"}
+    
+    def test_webhook_payload_json_fallback_matches_orjson(self):
+        """Test that the stdlib fallback encodes payloads exactly like orjson."""
+        import server.alerts.engine as engine_module
+        orjson = pytest.importorskip("orjson")
+        payload = {
+            "alerts": [{"alert_id": 1, "mountpoint": "/données", "actual_value": 85.5,
+                        "triggered_at": datetime(2024, 1, 1, 12, 0, 0, 123456)}],
+            "batch_id": "abc",
+            "timestamp": datetime(2024, 1, 1, 12, 0, 1)
+        }
+        
+        with patch.object(engine_module, 'orjson', None):
+            fallback = engine_module._dumps_payload(payload)
+        
+        assert fallback == orjson.dumps(payload)
+    
+    def test_webhook_session_reused_per_host(self):
+        """Test that webhooks to the same host share one HTTP session."""
+        from server.alerts.engine import _get_webhook_session
+        
+        first = _get_webhook_session("https://hooks.example.com/a")
+        second = _get_webhook_session("https://hooks.example.com/b")
+        other = _get_webhook_session("https://other.example.com/a")
+        
+        assert first is second
+        assert first is not other
+    
+    def test_webhook_session_configuration(self):
+        """Test that webhook sessions carry default headers and a pool per worker."""
+        from server.alerts.engine import WEBHOOK_MAX_WORKERS, _get_webhook_session
+        
+        session = _get_webhook_session("https://config.example.com/hook")
+        adapter = session.get_adapter("https://config.example.com/hook")
+        
+        assert session.headers["User-Agent"] == "Linux-Server-Monitoring/1.0"
+        assert adapter._pool_maxsize == WEBHOOK_MAX_WORKERS
+        assert adapter.max_retries.total == 0
     
     def test_create_webhook_payload(self):
         """Test webhook payload creation."""
@@ -244,6 +570,7 @@ class TestAlertEngine:
         mock_alert.id = 123
         mock_alert.server_id = "test-server"
         mock_alert.alert_type = "cpu"
+        mock_alert.mountpoint = None
         mock_alert.severity = "warning"
         mock_alert.message = "High CPU usage"
         mock_alert.threshold_value = 90.0
@@ -251,40 +578,34 @@ class TestAlertEngine:
         mock_alert.triggered_at = datetime(2024, 1, 1, 12, 0, 0)
         
         # Execute
-        payload = self.alert_engine._create_webhook_payload(mock_alert)
+        payload = self.alert_engine._create_webhook_payload([mock_alert])
         
         # Verify
-        assert payload["alert_id"] == 123
-        assert payload["server_id"] == "test-server"
-        assert payload["alert_type"] == "cpu"
-        assert payload["severity"] == "warning"
-        assert payload["message"] == "High CPU usage"
-        assert payload["threshold_value"] == 90.0
-        assert payload["actual_value"] == 95.0
+        assert len(payload["alerts"]) == 1
+        alert_payload = payload["alerts"][0]
+        assert alert_payload["alert_id"] == 123
+        assert alert_payload["server_id"] == "test-server"
+        assert alert_payload["alert_type"] == "cpu"
+        assert alert_payload["mountpoint"] is None
+        assert alert_payload["severity"] == "warning"
+        assert alert_payload["message"] == "High CPU usage"
+        assert alert_payload["threshold_value"] == 90.0
+        assert alert_payload["actual_value"] == 95.0
+        assert alert_payload["triggered_at"] == datetime(2024, 1, 1, 12, 0, 0)
+        assert payload["batch_id"]
         assert "timestamp" in payload
     
-    @patch('server.database.operations.AlertOperations.get_active_alerts')
-    @patch('server.database.operations.AlertOperations.resolve_alert')
-    def test_resolve_alerts_for_server(self, mock_resolve, mock_get_alerts):
+    @patch('server.database.operations.AlertOperations.resolve_alerts_bulk')
+    def test_resolve_alerts_for_server(self, mock_resolve_bulk):
         """Test resolving alerts for a server."""
-        # Setup
-        mock_alert1 = Mock(spec=Alert)
-        mock_alert1.id = 1
-        mock_alert1.alert_type = "cpu"
-        
-        mock_alert2 = Mock(spec=Alert)
-        mock_alert2.id = 2
-        mock_alert2.alert_type = "disk"
-        
-        mock_get_alerts.return_value = [mock_alert1, mock_alert2]
-        mock_resolve.return_value = True
+        mock_resolve_bulk.return_value = [1]
         
         # Execute
         resolved_count = self.alert_engine.resolve_alerts_for_server("test-server", ["cpu"])
         
         # Verify
-        assert resolved_count == 1  # Only CPU alert should be resolved
-        mock_resolve.assert_called_once_with(self.mock_session, 1)
+        assert resolved_count == 1
+        mock_resolve_bulk.assert_called_once_with(self.mock_session, "test-server", ["cpu"])
         self.mock_session.commit.assert_called_once()
     
     def test_get_alert_statistics(self):
@@ -296,4 +617,217 @@ class TestAlertEngine:
         assert "thresholds" in stats
         assert "webhook_config" in stats
         assert stats["thresholds"]["cpu_threshold"] == 90.0
-        assert stats["webhook_config"]["webhook_count"] == 2
\ No newline at end of file
+        assert stats["webhook_config"]["webhook_count"] == 2
+
+
+class TestCreateAlertIfAbsent:
+    """Test cases for AlertOperations.create_alert_if_absent."""
+    
+    def setup_method(self):
+        """Set up an in-memory SQLite database with one server."""
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+        self.session.add(Server(server_id="test-server"))
+        self.session.commit()
+    
+    def teardown_method(self):
+        """Close the database session."""
+        self.session.close()
+    
+    def test_creates_alert_once_while_active(self):
+        """Test that a second active alert of the same type is not created."""
+        first = AlertOperations.create_alert_if_absent(
+            self.session, "test-server", "cpu", "warning", "High CPU usage"
+        )
+        second = AlertOperations.create_alert_if_absent(
+            self.session, "test-server", "cpu", "warning", "High CPU usage"
+        )
+        
+        assert first is not None
+        assert second is None
+        assert self.session.query(Alert).count() == 1
+    
+    def test_creates_new_alert_after_resolution(self):
+        """Test that resolving an alert allows a new one of the same type."""
+        first = AlertOperations.create_alert_if_absent(
+            self.session, "test-server", "cpu", "warning", "High CPU usage"
+        )
+        AlertOperations.resolve_alert(self.session, first.id)
+        
+        second = AlertOperations.create_alert_if_absent(
+            self.session, "test-server", "cpu", "warning", "High CPU usage"
+        )
+        
+        assert second is not None
+        assert second.id != first.id
+    
+    def test_disk_alerts_not_unique_per_server(self):
+        """Test that several active disk alerts (one per mountpoint) can coexist."""
+        AlertOperations.create_alert(self.session, "test-server", "disk", "warning", "High disk usage (/)")
+        AlertOperations.create_alert(self.session, "test-server", "disk", "warning", "High disk usage (/var)")
+        self.session.commit()
+        
+        assert len(AlertOperations.get_active_alerts(self.session, "test-server")) == 2
+    
+    def test_creates_disk_alert_once_per_mountpoint(self):
+        """Test that disk alerts are deduplicated by mountpoint rather than by type."""
+        root = AlertOperations.create_alert_if_absent(
+            self.session, "test-server", "disk", "warning", "High disk usage (/)", mountpoint="/"
+        )
+        duplicate = AlertOperations.create_alert_if_absent(
+            self.session, "test-server", "disk", "warning", "High disk usage (/)", mountpoint="/"
+        )
+        var = AlertOperations.create_alert_if_absent(
+            self.session, "test-server", "disk", "warning", "High disk usage (/var)", mountpoint="/var"
+        )
+        
+        assert root is not None
+        assert duplicate is None
+        assert var is not None
+        assert self.session.query(Alert).count() == 2
+    
+    def test_unique_index_rejects_duplicate_active_disk_alert(self):
+        """Test that the database itself refuses a second active alert for a mountpoint."""
+        AlertOperations.create_alert(self.session, "test-server", "disk", "warning",
+                                     "High disk usage (/)", mountpoint="/")
+        
+        with pytest.raises(IntegrityError):
+            AlertOperations.create_alert(self.session, "test-server", "disk", "warning",
+                                         "High disk usage (/)", mountpoint="/")
+    
+    def test_postgresql_uses_on_conflict_do_nothing(self):
+        """Test that PostgreSQL gets a single INSERT ... ON CONFLICT statement."""
+        mock_session = Mock()
+        mock_session.get_bind.return_value.dialect.name = "postgresql"
+        
+        with patch.object(AlertOperations, 'get_active_alerts') as mock_get_alerts:
+            AlertOperations.create_alert_if_absent(
+                mock_session, "test-server", "cpu", "warning", "High CPU usage"
+            )
+        
+        mock_get_alerts.assert_not_called()
+        stmt = mock_session.scalars.call_args[0][0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (server_id, alert_type) WHERE" in sql
+        assert "DO NOTHING" in sql
+    
+    def test_postgresql_disk_alert_conflicts_on_mountpoint(self):
+        """Test that disk alerts target the per-mountpoint unique index on PostgreSQL."""
+        mock_session = Mock()
+        mock_session.get_bind.return_value.dialect.name = "postgresql"
+        
+        AlertOperations.create_alert_if_absent(
+            mock_session, "test-server", "disk", "warning", "High disk usage (/)", mountpoint="/"
+        )
+        
+        stmt = mock_session.scalars.call_args[0][0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (server_id, mountpoint) WHERE" in sql
+        assert "alert_type = 'disk'" in sql
+
+
+class TestResolveAlertsBulk:
+    """Test cases for AlertOperations.resolve_alerts_bulk."""
+    
+    def setup_method(self):
+        """Set up an in-memory SQLite database with a few active alerts."""
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+        self.session.add_all([Server(server_id="test-server"), Server(server_id="other-server")])
+        self.session.flush()
+        self.cpu = AlertOperations.create_alert(self.session, "test-server", "cpu", "warning", "High CPU usage")
+        self.root = AlertOperations.create_alert(self.session, "test-server", "disk", "warning",
+                                                 "High disk usage (/)", mountpoint="/")
+        self.var = AlertOperations.create_alert(self.session, "test-server", "disk", "warning",
+                                                "High disk usage (/var)", mountpoint="/var")
+        self.other = AlertOperations.create_alert(self.session, "other-server", "cpu", "warning", "High CPU usage")
+        self.session.commit()
+    
+    def teardown_method(self):
+        """Close the database session."""
+        self.session.close()
+    
+    def active_ids(self):
+        """Get the IDs of all active alerts."""
+        return {alert.id for alert in self.session.query(Alert).filter(Alert.is_resolved == False)}
+    
+    def test_resolves_types_and_mountpoints(self):
+        """Test that only the requested types and disk mountpoints are resolved."""
+        resolved = AlertOperations.resolve_alerts_bulk(
+            self.session, "test-server", alert_types=["cpu"], disk_mountpoints=["/var"]
+        )
+        self.session.commit()
+        
+        assert sorted(resolved) == sorted([self.cpu.id, self.var.id])
+        assert self.active_ids() == {self.root.id, self.other.id}
+        assert self.session.get(Alert, self.cpu.id).resolved_at is not None
+    
+    def test_resolves_all_types_by_default(self):
+        """Test that every active alert of the server is resolved without filters."""
+        resolved = AlertOperations.resolve_alerts_bulk(self.session, "test-server")
+        
+        assert len(resolved) == 3
+        assert self.active_ids() == {self.other.id}
+    
+    def test_empty_filters_resolve_nothing(self):
+        """Test that empty filters do not touch any alert."""
+        assert AlertOperations.resolve_alerts_bulk(self.session, "test-server", alert_types=[]) == []
+        assert len(self.active_ids()) == 4
+
+
+class TestCheckOfflineServers:
+    """Test cases for the batched offline server check against a real database."""
+    
+    def setup_method(self):
+        """Set up an in-memory SQLite database with online and offline servers."""
+        # One shared connection so background webhook threads see the same database
+        engine = create_engine("sqlite://", poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+        old_time = datetime.utcnow() - timedelta(hours=1)
+        self.session.add_all([
+            Server(server_id="online-server", last_seen=datetime.utcnow()),
+            Server(server_id="offline-server", last_seen=old_time),
+            Server(server_id="alerted-server", last_seen=old_time),
+            Server(server_id="retired-server", last_seen=old_time, is_active=False),
+        ])
+        self.session.add(Alert(server_id="alerted-server", alert_type="offline",
+                               severity="critical", message="Server alerted-server is offline"))
+        self.session.commit()
+        _active_alert_cache.clear()
+        _webhook_breaker.clear()
+        self.alert_engine = AlertEngine(self.session)
+    
+    def teardown_method(self):
+        """Close the database session."""
+        self.session.close()
+    
+    def test_only_new_offline_servers_are_alerted(self):
+        """Test that one alert is raised per offline server without an active one."""
+        alerts = self.alert_engine.check_offline_servers()
+        
+        assert [alert.server_id for alert in alerts] == ["offline-server"]
+        assert HealthStatusOperations.get_health_status(self.session, "offline-server").status == 'down'
+        assert HealthStatusOperations.get_health_status(self.session, "online-server") is None
+        
+        # The new alert is committed, so a second check finds nothing to do
+        assert self.alert_engine.check_offline_servers() == []
+
+    @patch('requests.Session.post')
+    def test_background_delivery_records_webhook_status(self, mock_post):
+        """Test that queued webhooks are delivered and recorded on a separate session."""
+        from server.alerts.engine import wait_for_pending_webhooks
+        mock_post.return_value = Mock(status_code=204)
+        self.alert_engine.webhook_urls = ["http://hooks.example.com/alerts"]
+        
+        alerts = self.alert_engine.check_offline_servers()
+        
+        assert wait_for_pending_webhooks(timeout=10)
+        mock_post.assert_called_once()
+        self.session.expire_all()
+        alert = self.session.get(Alert, alerts[0].id)
+        assert alert.webhook_sent is True
+        assert alert.webhook_response_code == 204
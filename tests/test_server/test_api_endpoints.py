@@ -7,6 +7,7 @@ and input validation.
 """
 
 import pytest
+import asyncio
 import json
 from datetime import datetime
 from unittest.mock import Mock, patch
@@ -129,6 +130,30 @@ class TestMetricsAPI:
             assert data["server_id"] == valid_metrics_data["server_id"]
             assert "timestamp" in data
 
+    def test_submit_metrics_batch_success(self, valid_metrics_data, valid_api_key):
+        """Test successful submission of a metrics batch."""
+        from server.api.metrics import MetricsBatchRequestModel, metrics_api
+        
+        batch = MetricsBatchRequestModel(metrics=[valid_metrics_data, valid_metrics_data])
+        credentials = Mock(credentials=valid_api_key)
+        
+        with patch('server.api.metrics.AuthenticationService') as mock_auth_service, \
+             patch.object(metrics_api, 'db_manager') as mock_db_manager:
+            
+            mock_auth_service.return_value.validate_api_key.return_value = Mock(spec=ApiKey)
+            mock_db_manager.ensure_server_exists.return_value = Mock(spec=Server)
+            mock_db_manager.store_metrics_batch.return_value = True
+            
+            data = asyncio.run(metrics_api._submit_metrics_batch(batch, credentials, Mock()))
+            
+            assert data["status"] == "success"
+            assert data["count"] == 2
+            assert data["server_ids"] == [valid_metrics_data["server_id"]]
+            mock_db_manager.store_metrics_batch.assert_called_once()
+            assert len(mock_db_manager.store_metrics_batch.call_args[0][0]) == 2
+            mock_db_manager.store_metrics.assert_not_called()
+            mock_db_manager.ensure_server_exists.assert_called_once()
+
     def test_submit_metrics_invalid_api_key(self, api_client, valid_metrics_data):
         """Test metrics submission with invalid API key."""
         with patch('server.api.metrics.get_db_session') as mock_get_session, \
@@ -8,7 +8,7 @@ from unittest.mock import Mock, patch
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from server.database.models import Base, ApiKey, Server
-from server.auth.service import AuthenticationService
+from server.auth.service import AuthenticationService, LegacyKeyFallback, _legacy_fallback
 
 
 @pytest.fixture
@@ -23,6 +23,7 @@ def in_memory_db():
 @pytest.fixture
 def auth_service(in_memory_db):
     """Create an AuthenticationService instance with test database."""
+    _legacy_fallback.reset()
     return AuthenticationService(in_memory_db)
 
 
@@ -273,21 +274,76 @@ class TestAuthenticationService:
         assert len(keys) == 10
     
     def test_hash_security(self, auth_service):
-        """Test that API key hashing is secure."""
+        """Test that API key hashing is deterministic and does not leak the key."""
         raw_key = "test-key-123"
         
-        # Hash the same key multiple times
         hash1 = auth_service._hash_api_key(raw_key)
         hash2 = auth_service._hash_api_key(raw_key)
         
-        # Hashes should be different due to salt
-        assert hash1 != hash2
-        assert hash1 != raw_key
-        assert hash2 != raw_key
+        # Same key always maps to the same indexable digest
+        assert hash1 == hash2
+        assert len(hash1) == 64
+        assert raw_key not in hash1
         
-        # But both should verify correctly
-        assert auth_service._verify_key_hash(raw_key, hash1)
-        assert auth_service._verify_key_hash(raw_key, hash2)
+        # Different keys get different digests
+        assert auth_service._hash_api_key("wrong-key") != hash1
+    
+    def add_legacy_key(self, auth_service):
+        """Store a key with the legacy salted PBKDF2 hash and return (raw_key, hash, record)."""
+        import hashlib
+        import secrets
+        
+        raw_key = secrets.token_urlsafe(32)
+        salt = secrets.token_bytes(32)
+        legacy_hash = (salt + hashlib.pbkdf2_hmac(
+            'sha256', raw_key.encode('utf-8'), salt, auth_service.LEGACY_PBKDF2_ITERATIONS
+        )).hex()
+        record = ApiKey(key_hash=legacy_hash, created_at=datetime.utcnow(), is_active=True)
+        auth_service.db_session.add(record)
+        auth_service.db_session.commit()
+        return raw_key, legacy_hash, record
+    
+    def test_validate_legacy_hashed_key_upgrades_hash(self, auth_service):
+        """Test that keys stored with the legacy salted hash still validate and get rehashed."""
+        raw_key, legacy_hash, record = self.add_legacy_key(auth_service)
+        
+        assert auth_service.validate_api_key("wrong-key") is None
+        
+        validated_key = auth_service.validate_api_key(raw_key)
+        
+        assert validated_key is not None
+        assert validated_key.id == record.id
+        assert validated_key.key_hash == auth_service._hash_api_key(raw_key)
+        assert auth_service._verify_legacy_key_hash(raw_key, legacy_hash)
+    
+    def test_legacy_fallback_retires_once_no_legacy_keys_remain(self, auth_service):
+        """Test that unknown keys stop scanning once every legacy key is rehashed."""
+        raw_key, _, _ = self.add_legacy_key(auth_service)
+        assert auth_service.validate_api_key(raw_key) is not None
+        
+        with patch.object(auth_service, '_verify_legacy_key_hash') as mock_verify:
+            assert auth_service.validate_api_key("unknown-key") is None
+            assert _legacy_fallback.retired
+            
+            with patch.object(auth_service, 'list_legacy_api_keys') as mock_list:
+                assert auth_service.validate_api_key("another-unknown-key") is None
+                mock_list.assert_not_called()
+            mock_verify.assert_not_called()
+    
+    def test_legacy_fallback_rate_limited(self, auth_service):
+        """Test that unknown keys cannot trigger unbounded PBKDF2 scans."""
+        self.add_legacy_key(auth_service)
+        
+        with patch('server.auth.service._legacy_fallback', LegacyKeyFallback(max_per_minute=2)), \
+             patch.object(auth_service, '_verify_legacy_key_hash', return_value=False) as mock_verify:
+            for i in range(5):
+                assert auth_service.validate_api_key(f"unknown-key-{i}") is None
+        
+        assert mock_verify.call_count == 2
+    
+    def test_legacy_fallback_disabled(self, auth_service):
+        """Test that a limit of 0 turns the legacy fallback off."""
+        raw_key, _, _ = self.add_legacy_key(auth_service)
         
-        # Wrong key should not verify
-        assert not auth_service._verify_key_hash("wrong-key", hash1)
\ No newline at end of file
+        with patch('server.auth.service._legacy_fallback', LegacyKeyFallback(max_per_minute=0)):
+            assert auth_service.validate_api_key(raw_key) is None
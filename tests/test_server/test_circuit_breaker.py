@@ -0,0 +1,90 @@
+"""
+Tests for the webhook circuit breaker.
+
+Tests opening after consecutive failures, the cooldown, the half-open trial,
+and closing on success.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from server.alerts.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.breaker = CircuitBreaker(failure_threshold=3, cooldown=60.0)
+
+    def record_failures(self, url, count, now=100.0):
+        """Record several failures for a URL at a fixed time."""
+        with patch("server.alerts.circuit_breaker.time.monotonic", return_value=now):
+            for _ in range(count):
+                self.breaker.record_failure(url)
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that a circuit opens at the threshold and only for its URL."""
+        self.record_failures("http://down.example.com", 2)
+        assert self.breaker.allow("http://down.example.com")
+
+        self.record_failures("http://down.example.com", 1)
+        with patch("server.alerts.circuit_breaker.time.monotonic", return_value=110.0):
+            assert not self.breaker.allow("http://down.example.com")
+            assert self.breaker.allow("http://up.example.com")
+            stats = self.breaker.statistics()
+
+        assert stats["http://down.example.com"] == {"failures": 3, "open": True, "trial": False, "retry_in": 50.0}
+
+    def test_success_resets_failures(self):
+        """Test that a success in between failures keeps the circuit closed."""
+        self.record_failures("http://flaky.example.com", 2)
+        self.breaker.record_success("http://flaky.example.com")
+        self.record_failures("http://flaky.example.com", 2)
+
+        with patch("server.alerts.circuit_breaker.time.monotonic", return_value=100.0):
+            assert self.breaker.allow("http://flaky.example.com")
+
+    def test_retried_after_cooldown(self):
+        """Test that one delivery is let through after the cooldown."""
+        self.record_failures("http://down.example.com", 3)
+
+        with patch("server.alerts.circuit_breaker.time.monotonic", return_value=160.0):
+            assert self.breaker.allow("http://down.example.com")
+            # Only the trial goes through while it is in flight
+            assert not self.breaker.allow("http://down.example.com")
+            assert self.breaker.statistics()["http://down.example.com"]["trial"]
+
+        # A failed trial reopens the circuit; a successful one closes it
+        self.record_failures("http://down.example.com", 1, now=160.0)
+        with patch("server.alerts.circuit_breaker.time.monotonic", return_value=170.0):
+            assert not self.breaker.allow("http://down.example.com")
+
+        self.breaker.record_success("http://down.example.com")
+        assert self.breaker.allow("http://down.example.com")
+        assert self.breaker.statistics() == {}
+
+    def test_single_trial_among_concurrent_callers(self):
+        """Test that exactly one of many concurrent callers gets the trial delivery."""
+        self.record_failures("http://down.example.com", 3)
+
+        with patch("server.alerts.circuit_breaker.time.monotonic", return_value=160.0), \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            allowed = list(executor.map(self.breaker.allow, ["http://down.example.com"] * 32))
+
+        assert allowed.count(True) == 1
+
+        # Settling the trial with a failure starts a new cooldown and a new trial after it
+        self.record_failures("http://down.example.com", 1, now=160.0)
+        with patch("server.alerts.circuit_breaker.time.monotonic", return_value=220.0):
+            assert self.breaker.allow("http://down.example.com")
+            assert not self.breaker.allow("http://down.example.com")
+
+    def test_zero_threshold_disables_breaker(self):
+        """Test that a threshold of 0 never opens a circuit."""
+        breaker = CircuitBreaker(failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure("http://down.example.com")
+
+        assert breaker.allow("http://down.example.com")
@@ -0,0 +1,103 @@
+"""
+Tests for the gzip request decompression middleware.
+
+This module tests that compressed request bodies are inflated before
+reaching endpoint handlers and that malformed bodies are rejected.
+"""
+
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from server.middleware.compression import GzipRequestMiddleware
+
+
+class TestGzipRequestMiddleware:
+    """Test cases for gzip request decompression."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Create a test client for an app that echoes the request body."""
+        app = FastAPI()
+        app.add_middleware(GzipRequestMiddleware, max_size=1024)
+
+        @app.post("/echo")
+        async def echo(request: Request):
+            body = await request.body()
+            return {
+                "body": body.decode("utf-8"),
+                "content_encoding": request.headers.get("content-encoding"),
+                "content_length": request.headers.get("content-length"),
+            }
+
+        return TestClient(app)
+
+    def test_gzip_body_is_decompressed(self, api_client):
+        """Test that gzip bodies reach the handler decompressed."""
+        payload = json.dumps({"server_id": "test-server", "cpu_usage": 45.2})
+        response = api_client.post(
+            "/echo",
+            content=gzip.compress(payload.encode("utf-8")),
+            headers={"Content-Encoding": "gzip", "Content-Type": "application/json"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["body"] == payload
+        assert data["content_encoding"] is None
+        assert data["content_length"] == str(len(payload))
+
+    def test_uncompressed_body_passes_through(self, api_client):
+        """Test that requests without content encoding are untouched."""
+        response = api_client.post("/echo", content=b'{"a": 1}')
+
+        assert response.status_code == 200
+        assert response.json()["body"] == '{"a": 1}'
+
+    def test_invalid_gzip_body_rejected(self, api_client):
+        """Test that malformed gzip bodies are rejected with 400."""
+        response = api_client.post(
+            "/echo",
+            content=b"not gzip data",
+            headers={"Content-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 400
+
+    def test_oversized_body_rejected(self, api_client):
+        """Test that bodies inflating past the size limit are rejected."""
+        response = api_client.post(
+            "/echo",
+            content=gzip.compress(b"A" * 4096),
+            headers={"Content-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 400
+
+    def test_zstd_body_is_decompressed(self, api_client):
+        """Test that zstd bodies reach the handler decompressed."""
+        zstandard = pytest.importorskip("zstandard")
+        payload = json.dumps({"server_id": "test-server", "cpu_usage": 45.2})
+        response = api_client.post(
+            "/echo",
+            content=zstandard.ZstdCompressor().compress(payload.encode("utf-8")),
+            headers={"Content-Encoding": "zstd"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["body"] == payload
+
+    def test_zstd_body_refused_without_zstandard(self, api_client):
+        """Test that zstd bodies get 415 when zstandard is not installed."""
+        with patch("server.middleware.compression.zstandard", None):
+            response = api_client.post(
+                "/echo",
+                content=b"zstd data",
+                headers={"Content-Encoding": "zstd"}
+            )
+
+        assert response.status_code == 415
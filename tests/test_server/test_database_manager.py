@@ -58,6 +58,28 @@ class TestDatabaseManager:
         # Verify the result is False on failure
         assert result is False
     
+    def test_store_metrics_batch_uses_one_session(self, sample_system_metrics):
+        """Test that a batch is stored through a single session."""
+        mock_connection_manager = Mock()
+        mock_session = Mock()
+        
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        mock_connection_manager.get_session.return_value = mock_context
+        
+        db_manager = DatabaseManager(mock_connection_manager)
+        batch = [sample_system_metrics, sample_system_metrics]
+        
+        with patch('server.database.manager.MetricOperations.store_metrics_batch') as mock_store:
+            mock_store.return_value = 2
+            
+            result = db_manager.store_metrics_batch(batch)
+            
+            assert result is True
+            mock_connection_manager.get_session.assert_called_once()
+            mock_store.assert_called_once_with(mock_session, batch)
+    
     def test_get_server_status_success(self):
         """Test successful server status retrieval."""
         # Mock the connection manager and session
@@ -0,0 +1,157 @@
+"""
+Tests for the metrics aggregation service.
+
+Runs the aggregation queries against an in-memory SQLite database.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from server.database.models import Base, Metric, Server
+from server.services.metrics_aggregation import MetricsAggregationService
+
+
+class TestMetricsAggregationService:
+    """Test cases for MetricsAggregationService."""
+    
+    def setup_method(self):
+        """Set up an in-memory database with one server."""
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+        self.session.add(Server(server_id="test-server"))
+        self.session.commit()
+        self.service = MetricsAggregationService(self.session)
+        self.start = datetime(2024, 12, 15, 10, 0, 0)
+    
+    def teardown_method(self):
+        """Close the database session."""
+        self.session.close()
+    
+    def add_metric(self, minutes, cpu_usage, disk_percentage=50.0):
+        """Store a metric sample taken the given number of minutes after start."""
+        self.session.add(Metric(
+            server_id="test-server",
+            timestamp=self.start + timedelta(minutes=minutes),
+            cpu_usage=cpu_usage,
+            memory_total=1000,
+            memory_used=500,
+            memory_percentage=50.0,
+            disk_usage=[{"mountpoint": "/", "percentage": disk_percentage}],
+            load_1min=1.0,
+            load_5min=2.0,
+            load_15min=3.0,
+            uptime=3600,
+            failed_services=[]
+        ))
+        self.session.commit()
+    
+    def test_get_metrics_for_time_range_buckets_by_interval(self):
+        """Test that samples are averaged per interval and empty intervals skipped."""
+        self.add_metric(0, 10.0, disk_percentage=40.0)
+        self.add_metric(2, 30.0, disk_percentage=60.0)
+        self.add_metric(11, 50.0)
+        
+        data = self.service.get_metrics_for_time_range(
+            "test-server", self.start, self.start + timedelta(minutes=15), interval_minutes=5
+        )
+        
+        assert [point["timestamp"] for point in data] == [
+            "2024-12-15T10:00:00Z", "2024-12-15T10:10:00Z"
+        ]
+        assert data[0]["cpu_usage"] == 20.0
+        assert data[0]["max_disk_usage"] == 50.0
+        assert data[0]["load_15min"] == 3.0
+        assert data[0]["data_points"] == 2
+        assert data[1]["cpu_usage"] == 50.0
+    
+    def test_get_metrics_for_time_range_excludes_sample_at_end(self):
+        """Test that a sample exactly at the range end starts no new interval."""
+        self.add_metric(0, 10.0)
+        self.add_metric(10, 90.0)
+        
+        data = self.service.get_metrics_for_time_range(
+            "test-server", self.start, self.start + timedelta(minutes=10), interval_minutes=5
+        )
+        
+        assert len(data) == 1
+        assert data[0]["cpu_usage"] == 10.0
+    
+    def test_get_metrics_for_time_range_no_data(self):
+        """Test that an empty range yields no data points."""
+        data = self.service.get_metrics_for_time_range(
+            "test-server", self.start, self.start + timedelta(hours=1)
+        )
+        
+        assert data == []
+    
+    def test_get_metrics_for_time_range_aggregates_in_postgresql(self):
+        """Test that PostgreSQL aggregates intervals in the query."""
+        mock_session = Mock()
+        mock_session.get_bind.return_value.dialect.name = "postgresql"
+        row = dict(cpu_usage=20.0, memory_percentage=50.0, max_disk_usage=None, load_1min=1.0,
+                   load_5min=2.0, load_15min=3.0, failed_services_count=Decimal("0.5"), data_points=2)
+        mock_session.execute.return_value = [
+            SimpleNamespace(bucket=Decimal(0), **row),
+            SimpleNamespace(bucket=Decimal(2), **row),  # Starts at the range end
+        ]
+        service = MetricsAggregationService(mock_session)
+        
+        data = service.get_metrics_for_time_range(
+            "test-server", self.start, self.start + timedelta(minutes=10), interval_minutes=5
+        )
+        
+        sql = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "GROUP BY floor(EXTRACT(epoch FROM metrics.timestamp" in sql
+        assert "jsonb_array_elements(metrics.disk_usage)" in sql
+        assert data == [{
+            "timestamp": "2024-12-15T10:00:00Z",
+            "cpu_usage": 20.0,
+            "memory_percentage": 50.0,
+            "max_disk_usage": 0,
+            "load_1min": 1.0,
+            "load_5min": 2.0,
+            "load_15min": 3.0,
+            "failed_services_count": 0.5,
+            "data_points": 2
+        }]
+
+
+class TestServersOverviewCache:
+    """Test cases for the dashboard's shared servers overview."""
+    
+    def setup_method(self):
+        """Start every test with an empty overview cache."""
+        import server.api.dashboard as dashboard
+        self.dashboard = dashboard
+        dashboard._servers_overview_cache = None
+    
+    def test_overview_shared_within_ttl(self):
+        """Test that requests within the TTL reuse one aggregation."""
+        with patch.object(self.dashboard, 'OVERVIEW_CACHE_TTL', 5.0), \
+             patch.object(self.dashboard, 'MetricsAggregationService') as mock_service:
+            mock_service.return_value.get_server_metrics_overview.return_value = [{"server_id": "a"}]
+            
+            first = self.dashboard._get_servers_overview(Mock())
+            second = self.dashboard._get_servers_overview(Mock())
+        
+        assert first == second == [{"server_id": "a"}]
+        mock_service.return_value.get_server_metrics_overview.assert_called_once()
+    
+    def test_overview_uncached_skips_lock(self):
+        """Test that a TTL of 0 aggregates per request without taking the shared lock."""
+        with patch.object(self.dashboard, 'OVERVIEW_CACHE_TTL', 0.0), \
+             patch.object(self.dashboard, '_servers_overview_lock') as mock_lock, \
+             patch.object(self.dashboard, 'MetricsAggregationService') as mock_service:
+            self.dashboard._get_servers_overview(Mock())
+            self.dashboard._get_servers_overview(Mock())
+        
+        assert mock_service.return_value.get_server_metrics_overview.call_count == 2
+        mock_lock.__enter__.assert_not_called()
+        assert self.dashboard._servers_overview_cache is None